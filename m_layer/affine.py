@@ -0,0 +1,178 @@
+"""
+Most conversions in the register have an affine form, ``y = a*x + b``.
+An :class:`Affine` holds the coefficients of such a conversion, so it
+can be inspected, inverted and combined with other conversions, as
+well as called like the function it replaces.
+
+Register entries are recognised by their function text. The coefficients
+are the evaluated parameters, so they are exact (e.g., ``Fraction``)
+when the register provides exact values. Functions of any other form
+are compiled as before (see :func:`~ml_eval.ml_function`).
+
+"""
+from fractions import Fraction
+from numbers import Rational
+
+from m_layer.ml_math import is_array, coefficient
+
+__all__ = (
+    'Affine',
+    'affine_form',
+    'compose',
+)
+
+# ---------------------------------------------------------------------------
+def _mul(p,q):
+    # `None` stands for a factor of 1
+    if p is None: return q
+    if q is None: return p
+    return p*q
+
+def _add(p,q):
+    # `None` stands for a term of 0
+    if p is None: return q
+    if q is None: return p
+    return p + q
+
+# ---------------------------------------------------------------------------
+class Affine(object):
+
+    """
+    An affine conversion ``y = a*x + b``
+
+    Args:
+        a: the scale factor, or ``None`` when there is no factor
+        b: the offset, or ``None`` when there is no offset
+
+    A coefficient that is ``None`` is omitted when the conversion is
+    evaluated, so ``Affine(a)`` evaluates ``a*x``, like
+    :func:`~ml_math.ratio_convert`, and ``Affine(a,b)`` evaluates
+    ``a*x + b``, like :func:`~ml_math.interval_convert`.
+
+    """
+
+    __slots__ = ('a','b')
+
+    def __init__(self,a=None,b=None):
+        self.a = a
+        self.b = b
+
+    def __call__(self,x):
+        if is_array(x):
+            # Exact coefficients are not used with arrays
+            if self.a is not None: x = coefficient(self.a,x)*x
+            if self.b is not None: x = x + coefficient(self.b,x)
+            return x
+            
+        if self.a is not None: x = self.a*x
+        if self.b is not None: x = x + self.b
+        return x
+
+    def __repr__(self):
+        return "Affine({!r},{!r})".format(self.a,self.b)
+
+    def __eq__(self,other):
+        return (
+            isinstance(other,Affine)
+        and
+            self.a == other.a
+        and
+            self.b == other.b
+        )
+
+    def __hash__(self):
+        return hash( (self.a,self.b) )
+
+    @property
+    def is_identity(self):
+        "``True`` when the conversion does not change a value"
+        return self.a in (None,1) and self.b in (None,0)
+
+    def then(self,other):
+        """
+        Return the conversion that applies ``self`` and then ``other``
+
+        Args:
+            other (:class:`Affine`)
+
+        """
+        b = self.b
+        if b is not None: b = _mul(other.a,b)
+
+        return Affine( _mul(other.a,self.a), _add(b,other.b) )
+
+    def inverse(self):
+        """
+        Return the conversion that reverses this one
+        """
+        a = self.a
+        if a is not None:
+            # Keep exact coefficients exact
+            a = Fraction(1,a) if isinstance(a,Rational) else 1.0/a
+
+        b = self.b
+        if b is not None:
+            b = -_mul(a,b)
+
+        return Affine(a,b)
+
+IDENTITY = Affine()
+
+# ---------------------------------------------------------------------------
+# The function texts that are recognised, without white space,
+# and the parameter names that they use
+_forms = {
+    "lambdax:x": (),
+    "lambdax:ml_math.ratio_convert(x,a)": ('a',),
+    "lambdax:a*x": ('a',),
+    "lambdax:ml_math.interval_convert(x,a,b)": ('a','b'),
+    "lambdax:x+b": ('b',),
+}
+
+def affine_form(txt,parameters):
+    """
+    Return an :class:`Affine` equivalent to the function ``txt``
+    with ``parameters``, or ``None`` if ``txt`` is not affine
+
+    Args:
+        txt (str): the function text, e.g., "lambda x: ml_math.ratio_convert(x,a)"
+        parameters (dict): evaluated parameter values
+
+    """
+    try:
+        names = _forms[ "".join( txt.split() ) ]
+    except KeyError:
+        return None
+
+    if set(names) != set(parameters):
+        return None
+    elif not names:
+        return IDENTITY
+    else:
+        return Affine( parameters.get('a'), parameters.get('b') )
+
+# ---------------------------------------------------------------------------
+def compose(fns):
+    """
+    Return one function that applies each of ``fns`` in turn
+
+    Consecutive :class:`Affine` conversions are folded into one,
+    so the result is an :class:`Affine` when all of ``fns`` are.
+
+    """
+    steps = []
+    for fn in fns:
+        if steps and isinstance(fn,Affine) and isinstance(steps[-1],Affine):
+            steps[-1] = steps[-1].then(fn)
+        else:
+            steps.append(fn)
+
+    if len(steps) == 1:
+        return steps[0]
+
+    def fn(x):
+        for f_i in steps:
+            x = f_i(x)
+        return x
+
+    return fn
@@ -4,16 +4,24 @@ from m_layer.lib import (
 
 from m_layer.expression import (
     expr, 
+    expr_array,
     token, value,
     convert, 
     cast,
+    convert_batch,
+    converter,
+    caster,
 )
 
 __all__ = (
     'expr', 
+    'expr_array',
     'token', 'value',
     'convert', 
     'cast',
+    'convert_batch',
+    'converter',
+    'caster',
     'Aspect', 
     'Scale',
     'ScaleAspect',
@@ -4,8 +4,8 @@ Casting can change the type of scale and aspect of an expression.
 Legitimate castings are recorded in a :class:`~.casting_register.CastingRegister`.
 
 """
-from m_layer.ml_eval import ml_eval   
 from m_layer.uid import UID
+from m_layer.register import FunctionTable
     
 # ---------------------------------------------------------------------------
 class CastingRegister(object):
@@ -13,11 +13,13 @@ class CastingRegister(object):
     """
     A ``CastingRegister`` maps scale-aspect pairs 
     to a function that will convert tokens. 
+    
+    Functions are compiled when they are first requested.
     """
     
     def __init__(self,context):
         self._context = context 
-        self._table = {}
+        self._table = FunctionTable()
                 
     def __contains__(self,item):
         return item in self._table 
@@ -35,14 +37,26 @@ class CastingRegister(object):
         """
         return self._table.get( uid_pair, default ) 
         
+    def validate(self):
+        """
+        Compile all casting functions
+        
+        Returns:
+            a list of (uid_pair, exception) pairs 
+            for functions that could not be compiled
+            
+        """
+        return self._table.validate()
+        
     # Extract an scale-aspect pair for the entry and then a function
     # to cast from one value to the another for the expression.
-    def set(self,entry):
+    def set(self,entry,parameters=None):
         """
         Create an entry for a casting function
         
         Args:
             entry: the M-layer record for a casting
+            parameters (dict, optional): evaluated function parameters
         
         """
         # The JSON format is an array containing a 
@@ -63,14 +77,5 @@ class CastingRegister(object):
                 "existing cast entry: {}".format(uid_pair)
             )            
                                        
-        # Parameter values are stored as strings in a dictionary
-        # E.g., { "a": "1", "b": "+273.15" }
-        # They may take the form of arithmetic expressions
-        # E.g., { "c": "si.h*si.c/si.e/si.nano" }
-        parameters_dict = { 
-            k : ml_eval(v) 
-                for (k,v) in entry['parameters'].items() 
-        }
-                
-        # Set the casting function
-        self._table[uid_pair] = ml_eval(entry['function'],parameters_dict)
+        # The function is compiled when it is first requested
+        self._table.set(uid_pair,entry,parameters)
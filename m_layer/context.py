@@ -5,11 +5,16 @@ The Context is not intended to be used directly in applications.
 import json 
 import glob
 import os.path
+import threading
 
 from m_layer import register 
 from m_layer import conversion_register
 from m_layer import casting_register
 from m_layer import scales_for_aspect_register
+from m_layer import json_reader
+from m_layer import snapshot
+from m_layer.profile import Profile
+from m_layer.conversion_graph import ConversionGraph
 
 from m_layer.uid import UID 
 
@@ -26,6 +31,38 @@ def uid_as_str(uid,short=True):
     return "{}...".format(s[:6]) if short else s 
           
 
+# ---------------------------------------------------------------------------
+def systematic_dimensions(scales,references):
+    """
+    Return a mapping of dimension keys to the UIDs of 
+    systematically named scales
+    
+    Args:
+        scales: a sequence of scale UID and record pairs
+        references: a mapping of reference UIDs to records
+        
+    """
+    index = {}
+    for src_scale_uid, json_scale in scales:
+    
+        if json_scale.systematic:   
+        
+            json_ref = references[ json_scale.reference ]
+            key = json_ref.system.key()
+
+            if key not in index:
+                assert isinstance(src_scale_uid,UID), type(src_scale_uid)
+                index[key] = src_scale_uid
+                
+            assert index[key] == src_scale_uid,\
+                "systematic scales: {} and {} both refer to {}".format(
+                    src_scale_uid,
+                    index[key],
+                    json_ref.uid
+                )
+                
+    return index
+    
 # ---------------------------------------------------------------------------
 class Context(object):
     
@@ -43,13 +80,35 @@ class Context(object):
             conversion_reg = None,
             casting_reg = None,
             scales_for_aspect_reg = None,
-            system_reg = None
+            system_reg = None,
+            transitive = False
             
         ):       
         
         self.locale = locale 
+        
+        # When True, conversions may be composed from several 
+        # registered conversions (see `conversion_graph`)
+        self.transitive = transitive
+        self._conversion_graph = None
         # self.value_fmt = value_fmt
         self.dimension_conversion_reg={}
+        
+        # Attributes whose loading has been postponed (see `defer`),
+        # and those being loaded. The lock is re-entrant, because 
+        # loaders may refer to other deferred attributes.
+        self._deferred = {}
+        self._loading = {}
+        self._lock = threading.RLock()
+        
+        # Functions already resolved, indexed by scale and aspect UIDs
+        # (see `conversion_from_scale_aspect`)
+        self._conversions = {}
+        self._casts = {}
+        
+        # Conversions between compound scales, indexed by 
+        # the source and destination compound UIDs
+        self._compound_conversions = {}
 
         
         if scale_reg is None:
@@ -86,10 +145,95 @@ class Context(object):
         if system_reg is None:
             self.system_reg = register.Register(self)
         else:
-            self.system_reg = reference_reg
+            self.system_reg = system_reg
 
-    def _load_entity(self,entity):
+        # Registers created before the context may need a reference to it
+        for reg_i in (
+            scale_reg, reference_reg, aspect_reg, conversion_reg,
+            casting_reg, scales_for_aspect_reg, system_reg
+        ):
+            if reg_i is not None and getattr(reg_i,'_context',False) is None:
+                reg_i._context = self 
+
+    def defer(self,name,loader):
+        """
+        Postpone loading the attribute ``name`` until it is first used
+        
+        Args:
+            name (str): the attribute, e.g., 'scale_reg'
+            loader: a callable that will be passed this context, 
+                which is called before ``name`` is returned for 
+                the first time
+        
+        Several loaders may be deferred for the same attribute.
+        They are called in the order they were given.
+        
+        Deferred attributes may be used by several threads. An 
+        attribute is not visible to other threads until its loaders, 
+        and those of any attributes they use, have finished. If a 
+        loader raises an exception, the attributes remain deferred.
+        
+        """
+        with self._lock:
+            if name in self._deferred:
+                self._deferred[name][1].append(loader)
+            else:
+                self._deferred[name] = ( self.__dict__.pop(name), [loader] )
+            
+    def __getattr__(self,name):
+        # Only called when ordinary attribute look-up fails,
+        # which is the case for attributes that have been deferred. 
+        try:
+            lock = self.__dict__['_lock']
+        except KeyError:
+            raise AttributeError(name) from None
+            
+        with lock:
+            # Another thread may have loaded the attribute  
+            # while this one was waiting 
+            if name in self.__dict__:
+                return self.__dict__[name]
+                
+            # Loaders will usually refer to the attribute being 
+            # loaded (perhaps indirectly), from this thread
+            loading = self._loading
+            if name in loading:
+                return loading[name][0]
+                
+            try:
+                obj, loaders = self._deferred.pop(name)
+            except KeyError:
+                raise AttributeError(name) from None
+                
+            outer = not loading 
+            loading[name] = (obj,loaders)
+            try:
+                for loader in loaders:
+                    loader(self)
+            except BaseException:
+                # Nothing is published when a loader fails. The 
+                # attributes are deferred again, so the next access 
+                # will call the loaders that did not finish. 
+                if outer:
+                    self._deferred.update(loading)
+                    loading.clear()
+                raise
+            
+            loading[name] = (obj,[])
+            
+            # Attributes restored during loading are 
+            # published together, when loading is complete
+            if outer:
+                for k,(v,_) in loading.items(): 
+                    setattr(self,k,v)
+                loading.clear()
+            
+        return obj
+        
+    def _load_entity(self,entity,parameters=None):
         # Handle one JSON object
+        # `parameters` may hold the function parameters 
+        # of a transformation entry, already evaluated.
         
         entity_type = entity['__entry__']
         
@@ -100,11 +244,11 @@ class Context(object):
         elif entity_type == "Scale":
             self.scale_reg.set(entity)
         elif entity_type == "Conversion":
-            self.conversion_reg.set(entity)
+            self.conversion_reg.set(entity,parameters)
         elif entity_type == "Cast":
-            self.casting_reg.set(entity)
+            self.casting_reg.set(entity,parameters)
         elif entity_type == "ScalesForAspect":
-            self.scales_for_aspect_reg.set(entity)
+            self.scales_for_aspect_reg.set(entity,parameters)
         elif entity_type == "UnitSystem":
             self.system_reg.set(entity)
         else:
@@ -122,26 +266,206 @@ class Context(object):
             self._load_entity(data)
             
     def load_json(self,file_path,**kwargs):
-        with open(file_path,'r') as f:
-            data = json.load(f,**kwargs)        
-        self._loader(data)
+        """
+        Load the M-layer records in one file
+        
+        Args:
+            file_path (str): a JSON, or JSON Lines (``.jsonl``), file 
+            **kwargs: keyword arguments passed to 
+                :func:`~json_reader.iter_entities`
+                
+        Records are entered one at a time as the file is read.
+            
+        """
+        for entity in json_reader.iter_entities(file_path,**kwargs):
+            self._load_entity(entity)
  
-    def load(self,path,**kwargs):
+    def load(self,path,parallel=None,max_workers=None,**kwargs):
         """
         Called to initialise internal M-layer records
         
         Args:
-            path: an expression to glob M-layer JSON files 
-            **kwargs: keyword arguments passed to glob
+            path: an expression to glob M-layer JSON, or 
+                JSON Lines (``.jsonl``), files 
+            parallel (str, optional): 'thread' or 'process', to 
+                read files concurrently in a pool of workers 
+            max_workers (int, optional): the number of workers 
+            **kwargs: keyword arguments passed to the JSON decoder, 
+                as for ``json.load``
+            
+        When files are read in parallel, the records are entered 
+        in the registers in the sorted order of file names. 
             
         """
-        for f_json in glob.glob( path ):
-            try:
-                self.load_json( f_json, **kwargs )
-            except json.decoder.JSONDecodeError as e:
-                # Report errors but do not stop execution
-                print("json.decoder.JSONDecodeError",e, 'in:',f_json)
+        if parallel is None:
+            for f_json in glob.glob( path ):
+                try:
+                    self.load_json( f_json, **kwargs )
+                except json.decoder.JSONDecodeError as e:
+                    # Report errors but do not stop execution
+                    print("json.decoder.JSONDecodeError",e, 'in:',f_json)
+        else:
+            self._load_parallel( 
+                sorted( glob.glob( path ) ), 
+                parallel, 
+                max_workers, 
+                **kwargs 
+            )
+            
+    def _load_parallel(self,file_paths,parallel,max_workers,**kwargs):
+        # Files are read and function parameters evaluated by workers.
+        # The records are entered here, in order, so that registers 
+        # are the same as for sequential loading and the checks for 
+        # duplicate entries still apply.
+        from concurrent import futures 
+        
+        if parallel == 'thread':
+            Executor = futures.ThreadPoolExecutor
+        elif parallel == 'process':
+            Executor = futures.ProcessPoolExecutor
+        else:
+            raise RuntimeError(
+                "unknown parallel option: {!r}".format(parallel)
+            )
+            
+        with Executor(max_workers) as executor:
+            jobs = [
+                executor.submit(json_reader.read_records,f_json,**kwargs)
+                    for f_json in file_paths
+            ]
+            for f_json,job in zip(file_paths,jobs):
+                try:
+                    records = job.result()
+                except json.decoder.JSONDecodeError as e:
+                    # Report errors but do not stop execution
+                    print("json.decoder.JSONDecodeError",e, 'in:',f_json)
+                    continue
+                    
+                for entity,parameters in records:
+                    self._load_entity(entity,parameters)
  
+    def load_profile(self,profile,paths):
+        """
+        Load only the M-layer records needed for a profile
+        
+        Args:
+            profile (:class:`~profile.Profile`): the aspects,
+                unit systems and scales required 
+            paths: a sequence of expressions to glob M-layer JSON files 
+            
+        The register is read once. It is restored from a snapshot, 
+        when snapshots are enabled (see :mod:`snapshot`), and the 
+        records needed by the profile are then copied.
+            
+        """
+        if snapshot.enabled():
+            full = Context()
+            snapshot.load_context(full,paths)
+            entities = list( full._entities() )
+        else:
+            entities = [
+                (entity,None)
+                    for path in paths
+                        for f_json in glob.glob( path )
+                            for entity in json_reader.iter_entities(f_json)
+            ]
+            
+        selection = profile.selection( e_i for e_i,_ in entities )
+        
+        for entity,parameters in entities:
+            if entity in selection:
+                self._load_entity(entity,parameters)
+                        
+    def _entities(self):
+        # The (record, parameters) pairs held in the in-memory registers,
+        # ordered so that they can be loaded into another context 
+        for reg in (
+            self.reference_reg, self.scale_reg, 
+            self.aspect_reg, self.system_reg
+        ):
+            for entry in reg._objects.values():
+                yield entry, None
+                
+        tables = [ self.conversion_reg._table, self.casting_reg._table ]
+        tables.extend( self.scales_for_aspect_reg._table.values() )
+        for table in tables:
+            for fn in table._functions.values():
+                yield fn.entry, fn._parameters
+                
+    @property 
+    def conversion_graph(self):
+        """
+        The :class:`~conversion_graph.ConversionGraph` for this context
+        """
+        if self._conversion_graph is None:
+            self._conversion_graph = ConversionGraph(self)
+        return self._conversion_graph
+        
+    def _discard_paths(self):
+        # Called when a conversion is registered. 
+        # Composed conversions may no longer be needed, 
+        # or there may now be a shorter path.
+        self._compound_conversions.clear()
+        
+        if self._conversion_graph is not None:
+            for key in self._conversion_graph.clear():
+                self._conversions.pop(key,None)
+                
+    def _discard_resolved(self,aspect_uid,scale_uid_pair):
+        # Called when an aspect-specific conversion is registered.
+        # It takes precedence over any generic conversion 
+        # already resolved for these scales and aspect.
+        self._discard_paths()
+        
+        src_scale_uid, dst_scale_uid = scale_uid_pair
+        self._conversions.pop( 
+            (src_scale_uid,aspect_uid,dst_scale_uid), None 
+        )
+        self._casts.pop( 
+            (src_scale_uid,aspect_uid,dst_scale_uid,aspect_uid), None 
+        )
+        
+    def validate(self):
+        """
+        Compile all the conversion and casting functions 
+        
+        Functions are normally compiled when they are first used. 
+        This method raises ``RuntimeError`` if any register entry 
+        cannot be compiled. 
+        
+        """
+        errors = (
+            self.conversion_reg.validate()
+        +   self.casting_reg.validate()
+        +   self.scales_for_aspect_reg.validate()
+        )
+        if errors:
+            raise RuntimeError(
+                "invalid functions:\n{}".format(
+                    "\n".join(
+                        "{}: {!r}".format(key,e) for key,e in errors
+                    )
+                )
+            )
+            
+    def systematic_dimensions(self):
+        """
+        Return a mapping of dimension keys to the 
+        UIDs of systematically named scales
+        
+        A key is a tuple of the system UID, the tuple of 
+        dimensional exponents and the prefix (as a ``Fraction``).
+        
+        """
+        try:
+            return self._systematic_dimensions
+        except AttributeError:
+            self._systematic_dimensions = systematic_dimensions(
+                self.scale_reg.items(),
+                self.reference_reg
+            )
+            return self._systematic_dimensions
+            
     @property
     def locale(self):
         return self._locale 
@@ -163,6 +487,9 @@ class Context(object):
         if src_scale_uid == dst_scale_uid:
             return True
             
+        if (src_scale_uid,src_aspect_uid,dst_scale_uid) in self._conversions:
+            return True
+            
         scale_pair = (src_scale_uid,dst_scale_uid)
         
         if( 
@@ -175,6 +502,13 @@ class Context(object):
                 
         # Default aspect conversions are possible
         if scale_pair in self.conversion_reg: return True
+        
+        if self.transitive and self.conversion_graph.path(
+            src_scale_uid,
+            src_aspect_uid,
+            dst_scale_uid
+        ) is not None: 
+            return True
                         
         # This is a failure
         if src_aspect_uid == self.no_aspect_uid:
@@ -212,7 +546,31 @@ class Context(object):
         Returns:
             A Python function 
             
+        The function is found once and then held in an index 
+        of conversions, so later calls need just one look-up.
+            
         """ 
+        key = (src_scale_uid,src_aspect_uid,dst_scale_uid)
+        try:
+            return self._conversions[key]
+        except KeyError:
+            pass
+            
+        fn = self._conversions[key] = self._resolve_conversion(
+            src_scale_uid,
+            src_aspect_uid,
+            dst_scale_uid
+        )
+        return fn
+        
+    def _resolve_conversion(
+        self,
+        src_scale_uid,
+        src_aspect_uid,
+        dst_scale_uid
+    ):
+        # The result is retained by `conversion_from_scale_aspect`,
+        # so this is only called once for each set of arguments
         assert isinstance(src_scale_uid,UID), repr(src_scale_uid)
         assert isinstance(src_aspect_uid,UID), repr(src_aspect_uid)
         assert isinstance(dst_scale_uid,UID), repr(dst_scale_uid)
@@ -245,6 +603,15 @@ class Context(object):
         except KeyError:
             pass
                         
+        # A sequence of registered conversions may be used 
+        if self.transitive:
+            fn = self.conversion_graph.function(
+                src_scale_uid,
+                src_aspect_uid,
+                dst_scale_uid
+            )
+            if fn is not None: return fn
+            
         # This is a failure 
         if src_aspect_uid == self.no_aspect_uid:
             raise RuntimeError(
@@ -315,7 +682,29 @@ class Context(object):
         Returns:
             A Python function 
             
+        The function is found once and then held in an index 
+        of casts, so later calls need just one look-up.
+            
         """ 
+        key = (src_scale_uid,src_aspect_uid,dst_scale_uid,dst_aspect_uid)
+        try:
+            return self._casts[key]
+        except KeyError:
+            pass
+            
+        fn = self._casts[key] = self._resolve_cast(
+            src_scale_uid, src_aspect_uid,
+            dst_scale_uid, dst_aspect_uid
+        )
+        return fn
+        
+    def _resolve_cast(
+        self,
+        src_scale_uid, src_aspect_uid,
+        dst_scale_uid, dst_aspect_uid
+    ):
+        # The result is retained by `casting_from_scale_aspect`,
+        # so this is only called once for each set of arguments
         dst_pair = dst_scale_uid, dst_aspect_uid
         src_pair = src_scale_uid, src_aspect_uid    
         
@@ -394,22 +783,91 @@ class Context(object):
 # ---------------------------------------------------------------------------
 # Configure the global context object 
 #
+# The JSON records are normally restored from a binary snapshot, which 
+# is rebuilt whenever the content of the JSON files changes. 
+# Set the environment variable M_LAYER_SNAPSHOT=0 to read the JSON files 
+# directly, or M_LAYER_CACHE_DIR to change where snapshots are kept.
+#
+# When the environment variable M_LAYER_LAZY=1 is set, registers are 
+# not loaded until they are first used.
+#
+# When M_LAYER_PROFILE is set to a comma-separated list of names of 
+# aspects, unit systems or scales, only the records needed for  
+# that profile are loaded (see `m_layer.profile`).
+#
+# When M_LAYER_REGISTER_DIR is set to a directory of register files
+# (see `m_layer.mapped_register.write_files`), the global context 
+# uses memory-mapped registers, so nothing is loaded and processes 
+# share one copy of the register data. The other options are ignored.
+#
 _dir = os.path.dirname(__file__)
 
-global_context = Context()
+_register_dir = os.environ.get('M_LAYER_REGISTER_DIR')
+
+if _register_dir:
+    from m_layer.mapped_register import mapped_registers
+    global_context = Context( **mapped_registers(_register_dir) )
+else:
+    global_context = Context()
 """The Context object used during a Python session"""
 
-for p_i in (
-        r'json/references', 
-        r'json/scales',
-        r'json/conversion',
-        r'json/casting',
-        r'json/aspects',
-        r'json/scales_for',
-        r'json/systems'
-    ):
-    path = os.path.join(_dir,p_i, r'*.json')
-    global_context.load(path)
+_json_registers = (
+    ('reference_reg', r'json/references'), 
+    ('scale_reg', r'json/scales'),
+    ('conversion_reg', r'json/conversion'),
+    ('casting_reg', r'json/casting'),
+    ('aspect_reg', r'json/aspects'),
+    ('scales_for_aspect_reg', r'json/scales_for'),
+    ('system_reg', r'json/systems'),
+)
+
+_json_paths = tuple(
+    os.path.join(_dir,p_i, r'*.json')
+        for _,p_i in _json_registers
+)
+
+_profile = os.environ.get('M_LAYER_PROFILE')
+
+_registers_started = False
+_registers_lock = threading.RLock()
+
+def _load_registers(cxt):
+    # All registers are loaded together, from one snapshot 
+    # or for one profile, when the first of them is needed.
+    # Other threads wait for the lock, while loading is in progress, 
+    # but a nested call from the loading thread returns at once.
+    global _registers_started
+    with _registers_lock:
+        if _registers_started: return
+        _registers_started = True
+        
+        try:
+            if _profile:
+                cxt.load_profile( 
+                    Profile( *( n_i.strip() for n_i in _profile.split(',') ) ),
+                    _json_paths
+                )
+            else:
+                snapshot.load_context(cxt,_json_paths)
+        except BaseException:
+            # The next access will try again
+            _registers_started = False
+            raise
+        
+# Register files do not need to be loaded
+for (name,_), path in zip(_json_registers,_json_paths):
+
+    if _register_dir: break
+    
+    if _profile or snapshot.enabled():
+        loader = _load_registers
+    else:
+        loader = lambda cxt, path=path: cxt.load(path)
+        
+    if os.environ.get('M_LAYER_LAZY','0') == '1':
+        global_context.defer(name,loader)
+    else:
+        loader(global_context)
 
 # The `no_aspect` entry is special, we need the uid
 file_path = os.path.join( _dir, r'json/aspects/no_aspect.json' )
@@ -418,4 +876,4 @@ file_path = os.path.join( _dir, r'json/aspects/no_aspect.json' )
 with open(file_path,'r') as f:
     data = json.load(f)        
 
-global_context.no_aspect_uid = UID( data[0]['uid'] )   
\ No newline at end of file
+global_context.no_aspect_uid = UID( data[0]['uid'] )   
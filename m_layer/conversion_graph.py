@@ -0,0 +1,165 @@
+"""
+The conversions in a :class:`~context.Context` can be treated as the edges
+of a graph, with scales at the nodes. A :class:`ConversionGraph` finds a
+sequence of registered conversions between scales that are not directly
+connected and composes them into a single function.
+
+The edges for an aspect are the generic conversions together with the
+conversions that are specific to that aspect, which take precedence.
+Only generic conversions are used when there is no aspect.
+
+Consecutive affine steps are folded into a single :class:`~affine.Affine`
+conversion. A context only uses the graph when its ``transitive`` attribute
+is ``True``, because composed conversions may not round in the same way as
+the separate steps.
+
+"""
+from collections import deque
+
+from m_layer.affine import compose
+
+__all__ = (
+    'ConversionGraph',
+)
+
+# ---------------------------------------------------------------------------
+class ConversionGraph(object):
+
+    """
+    A ``ConversionGraph`` finds paths between scales in the
+    conversion registers of a :class:`~context.Context`
+
+    Paths and composed functions are retained once found.
+    """
+
+    def __init__(self,context):
+        self._context = context
+        self.clear()
+
+    def clear(self):
+        """
+        Discard the paths found
+
+        Returns:
+            the (src_scale_uid, aspect_uid, dst_scale_uid)
+            keys of the functions that had been composed
+
+        """
+        try:
+            keys = list( self._functions.keys() )
+        except AttributeError:
+            keys = []
+
+        self._edges = {}        # aspect -> {src: [dst, ...]}
+        self._paths = {}        # aspect -> {src: {dst: path}}
+        self._functions = {}    # (src, aspect, dst) -> function
+
+        return keys
+
+    def _adjacency(self,aspect_uid):
+        try:
+            return self._edges[aspect_uid]
+        except KeyError:
+            pass
+
+        cxt = self._context
+        edges = {}
+        pairs = list( cxt.conversion_reg.keys() )
+        if(
+            aspect_uid != cxt.no_aspect_uid
+        and
+            aspect_uid in cxt.scales_for_aspect_reg
+        ):
+            pairs.extend( cxt.scales_for_aspect_reg[aspect_uid].keys() )
+
+        for src,dst in pairs:
+            dsts = edges.setdefault(src,[])
+            if dst not in dsts: dsts.append(dst)
+
+        self._edges[aspect_uid] = edges
+        return edges
+
+    def _search(self,src_scale_uid,aspect_uid):
+        # Breadth-first search for the shortest paths
+        # to every scale that can be reached from `src_scale_uid`
+        paths = self._paths.setdefault(aspect_uid,{})
+        try:
+            return paths[src_scale_uid]
+        except KeyError:
+            pass
+
+        edges = self._adjacency(aspect_uid)
+        found = { src_scale_uid: (src_scale_uid,) }
+        queue = deque( [src_scale_uid] )
+        while queue:
+            node = queue.popleft()
+            for dst in edges.get(node,()):
+                if dst not in found:
+                    found[dst] = found[node] + (dst,)
+                    queue.append(dst)
+
+        paths[src_scale_uid] = found
+        return found
+
+    def path(self,src_scale_uid,aspect_uid,dst_scale_uid):
+        """
+        Return the shortest sequence of scale UIDs, from ``src_scale_uid``
+        to ``dst_scale_uid``, or ``None`` if there is no path
+
+        Args:
+            src_scale_uid: initial scale
+            aspect_uid: the aspect
+            dst_scale_uid: final scale
+
+        """
+        return self._search(src_scale_uid,aspect_uid).get(dst_scale_uid)
+
+    def function(self,src_scale_uid,aspect_uid,dst_scale_uid):
+        """
+        Return a function that applies the conversions on the shortest
+        path between scales, or ``None`` if there is no path
+
+        Args:
+            src_scale_uid: initial scale
+            aspect_uid: the aspect
+            dst_scale_uid: final scale
+
+        """
+        key = (src_scale_uid,aspect_uid,dst_scale_uid)
+        try:
+            return self._functions[key]
+        except KeyError:
+            pass
+
+        path = self.path(src_scale_uid,aspect_uid,dst_scale_uid)
+        if path is None:
+            return None
+
+        # Each step is a direct conversion, with
+        # aspect-specific conversions taking precedence
+        fn = self._functions[key] = compose( [
+            self._context._resolve_conversion(src,aspect_uid,dst)
+                for src,dst in zip(path[:-1],path[1:])
+        ] )
+        return fn
+
+    def closure(self,aspect_uid):
+        """
+        Find the paths between all pairs of scales for an aspect
+
+        Args:
+            aspect_uid: the aspect
+
+        Returns:
+            a mapping of (src_scale_uid, dst_scale_uid) pairs to paths
+
+        After this, looking up a path for the aspect
+        does not need a search.
+
+        """
+        return {
+            (src,dst): path
+                for src in list( self._adjacency(aspect_uid) )
+                    for dst,path in self._search(src,aspect_uid).items()
+                        if dst != src
+        }
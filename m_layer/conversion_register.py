@@ -4,10 +4,9 @@ Conversion changes the scale of an expression but leaves the type of scale and a
 Legitimate conversions are recorded in a :class:`ConversionRegister`
 
 """
-from m_layer.ml_eval import ml_eval
-
 from m_layer import ml_math        
 from m_layer.uid import UID
+from m_layer.register import FunctionTable
  
 # ---------------------------------------------------------------------------
 class ConversionRegister(object):
@@ -15,11 +14,13 @@ class ConversionRegister(object):
     """
     A ``ConversionRegister`` maps scale pairs 
     to a function that will convert tokens between scales. 
+    
+    Functions are compiled when they are first requested.
     """
     
     def __init__(self,context):
         self._context = context 
-        self._table = {}
+        self._table = FunctionTable()
                 
     def __contains__(self,item):
         return item in self._table 
@@ -27,6 +28,12 @@ class ConversionRegister(object):
     def __getitem__(self,uid_pair):
         return self._table[ uid_pair ]
         
+    def keys(self):
+        """
+        Return an iterable of the scale pairs registered
+        """
+        return self._table.keys()
+        
     def get(self,uid_pair,default=None):
         """
         Return a conversion function 
@@ -37,9 +44,20 @@ class ConversionRegister(object):
         """        
         return self._table.get( uid_pair, default ) 
         
+    def validate(self):
+        """
+        Compile all conversion functions
+        
+        Returns:
+            a list of (uid_pair, exception) pairs 
+            for functions that could not be compiled
+            
+        """
+        return self._table.validate()
+        
     # Extract a uid pair for the entry and then a conversion function
     # from one M-layer reference to the other.
-    def set(self,entry):
+    def set(self,entry,parameters=None):
         """
         Create an entry for a conversion function
         The type of the source and destination scales
@@ -48,6 +66,7 @@ class ConversionRegister(object):
         
         Args:
             entry: the M-layer record for a conversion
+            parameters (dict, optional): evaluated function parameters
         
         """
         uid_ml_ref_src = UID( entry['src'] )        
@@ -55,10 +74,10 @@ class ConversionRegister(object):
             
         uid_pair = (uid_ml_ref_src,uid_ml_ref_dst)
         
-        self._set_conversion_fn(entry,self._table,uid_pair)
+        self._set_conversion_fn(entry,self._table,uid_pair,parameters)
 
     # ---------------------------------------------------------------------------
-    def _set_conversion_fn(self,entry,_tbl, uid_pair):
+    def _set_conversion_fn(self,entry,_tbl,uid_pair,parameters=None):
         """
         
         """
@@ -71,15 +90,8 @@ class ConversionRegister(object):
         src_type = _scales[ uid_pair[0] ]['scale_type']
         dst_type = _scales[ uid_pair[1] ]['scale_type']
            
-        # Parameter values are stored as strings in a dictionary
-        # E.g., { "a": "1", "b": "+273.15" }
-        # They may take the form of arithmetic expressions
-        # E.g., { "c": "si.h*si.c/si.e/si.nano" }
-        parameters_dict = { 
-            k : ml_eval(v) 
-                for (k,v) in entry['parameters'].items() 
-        }
-                
-        # Set the casting function
-        self._table[uid_pair] = ml_eval(entry['function'],parameters_dict)
- 
\ No newline at end of file
+        # The function is compiled when it is first requested
+        self._table.set(uid_pair,entry,parameters)
+        
+        # The context may have composed a longer conversion
+        self._context._discard_paths()
@@ -29,7 +29,7 @@ class CompoundDimension(object):
     of :class:`Dimension` objects
     """
 
-    __slots__ = ('prefactor','factors','_stack')
+    __slots__ = ('prefactor','factors','_stack','_simplify')
 
     def __init__(self,stack):
     
@@ -73,7 +73,7 @@ class CompoundDimension(object):
 
     def __hash__(self):
         return hash( (
-            self.factors.items(),
+            frozenset( self.factors.items() ),
             self.prefactor
         ) )
  
@@ -89,7 +89,7 @@ class CompoundDimension(object):
         else:
             return "{{ factors = {{ {} }}, prefactor = {} }}".format(
                 factors,
-                self.c
+                self.prefactor
             )
         
     def __repr__(self):
@@ -100,11 +100,18 @@ class CompoundDimension(object):
         """
         Return the combination of the exponentiated factors
         
+        The combination is found once, then retained.
         """
+        try:
+            return self._simplify
+        except AttributeError:
+            pass
+            
         x = 1
         for k,v in self.factors.items():
             x *= k**sum(v)
             
+        self._simplify = x
         return x
  
     def commensurate(self,other):
@@ -115,6 +122,54 @@ class CompoundDimension(object):
         else:
             return NotImplementedError( repr(other) )
  
+# ---------------------------------------------------------------------------
+# The exponents of a Dimension are packed into one integer, with a field 
+# of _BITS bits for each exponent. A field holds the exponent plus _BIAS.
+# Exponents are restricted to the range [-_LIMIT,_LIMIT), so the fields 
+# of a product or quotient do not overflow into each other and 
+# exponent vectors can be added and subtracted as integers.
+# 8-bit fields allow exponents from -64 to 63, which is ample for 
+# physical quantities, and the 7 base dimensions of the SI fit in 
+# 56 bits.
+#
+_BITS = 8
+_MASK = (1 << _BITS) - 1
+_BIAS = 1 << (_BITS - 1)
+_LIMIT = 1 << (_BITS - 2)
+
+_fields = {}    # n -> (bias in each field, limit in each field)
+
+def _field_constants(n):
+    try:
+        return _fields[n]
+    except KeyError:
+        bias = sum( _BIAS << (_BITS*i) for i in range(n) )
+        limit = sum( _LIMIT << (_BITS*i) for i in range(n) )
+        _fields[n] = (bias,limit)
+        return _fields[n]
+        
+def _pack(dim):
+    packed = 0
+    for i,x in enumerate(dim):
+        if not -_LIMIT <= x < _LIMIT:
+            raise RuntimeError(
+                "dimensional exponent out of range: {}".format(x)
+            )
+        packed |= (x + _BIAS) << (_BITS*i)
+    return packed
+        
+def _unpack(packed,n):
+    return tuple(
+        ( (packed >> (_BITS*i)) & _MASK ) - _BIAS 
+            for i in range(n) 
+    )
+    
+def _in_range(packed,n):
+    # True when every exponent is in [-_LIMIT,_LIMIT), i.e., when 
+    # adding _LIMIT to each field sets its top bit without a carry 
+    bias, limit = _field_constants(n)
+    return (packed + limit) & bias == bias 
+    
 # ---------------------------------------------------------------------------
 class Dimension(object):
 
@@ -123,15 +178,35 @@ class Dimension(object):
     """
     
     __slots__ = (
-        '_system', '_dim', '_prefix'
+        '_system', '_n', '_packed', '_prefix', '_hash'
     )
     
     def __init__(self,system,dim,prefix=1):
     
         self._system = system 
-        self._dim = tuple(dim)
+        dim = tuple(dim)
+        self._n = len(dim)
+        self._packed = _pack(dim)
         self._prefix = Fraction( *prefix ) if isinstance(
             prefix,abc.Iterable) else Fraction( prefix )
+        self._hash = None
+        
+    @classmethod
+    def _make(cls,system,n,packed,prefix):
+        # `packed` and `prefix` are already in the internal form
+        if not _in_range(packed,n):
+            raise RuntimeError(
+                "dimensional exponent out of range: {}".format(
+                    _unpack(packed,n)
+                )
+            )
+        d = cls.__new__(cls)
+        d._system = system 
+        d._n = n 
+        d._packed = packed
+        d._prefix = prefix
+        d._hash = None
+        return d 
         
     @property 
     def system(self):
@@ -141,7 +216,7 @@ class Dimension(object):
     @property 
     def dim(self):
         "The tuple of dimensions"
-        return self._dim
+        return _unpack(self._packed,self._n)
         
     @property 
     def prefix(self):
@@ -149,12 +224,14 @@ class Dimension(object):
         return self._prefix
 
     def __hash__(self):
-        return hash( (
-            self._system, 
-            self._dim, 
-            # Fraction(1,10) <=> Fraction(10,100), etc.
-            self._prefix   
-        ) )
+        if self._hash is None:
+            self._hash = hash( (
+                self._system, 
+                self._packed, 
+                # Fraction(1,10) <=> Fraction(10,100), etc.
+                self._prefix   
+            ) )
+        return self._hash
         
     def __eq__(self,other):
         return (
@@ -172,10 +249,12 @@ class Dimension(object):
         """
         return (
             isinstance(other,Dimension)
+        and
+            self._packed == other._packed
+        and
+            self._n == other._n
         and
             self.system == other.system
-        and 
-            self.dim == other.dim
         )
       
     def __repr__(self):
@@ -214,9 +293,10 @@ class Dimension(object):
     def __rmul__(self,x):
         # a numerical scale factor 
         assert isinstance(x,numbers.Integral)
-        return Dimension(
+        return Dimension._make(
             self.system,
-            self.dim,
+            self._n,
+            self._packed,
             self.prefix
         )
         
@@ -224,10 +304,12 @@ class Dimension(object):
             
         assert self.system == rhs.system,\
             "different systems: '{}', '{}'".format(self.system, rhs.system)
-            
-        return Dimension(
+        
+        # Adding the packed fields adds the exponents and the biases
+        return Dimension._make(
             self.system,
-            tuple( i + j for (i,j) in zip(self.dim,rhs.dim) ),
+            self._n,
+            self._packed + rhs._packed - _field_constants(self._n)[0],
             self.prefix*rhs.prefix
         )
             
@@ -237,9 +319,10 @@ class Dimension(object):
         assert self.system == rhs.system,\
             "different systems: '{}', '{}'".format(self.system, rhs.system)
             
-        return Dimension(
+        return Dimension._make(
             self.system,
-            tuple( i - j for (i,j) in zip(self.dim,rhs.dim) ),
+            self._n,
+            self._packed - rhs._packed + _field_constants(self._n)[0],
             self.prefix/rhs.prefix
         )
     
@@ -254,6 +337,57 @@ class Dimension(object):
             self.prefix**n
         )
     
+# ---------------------------------------------------------------------------
+def _simplified(obj):
+    # The Dimension of `obj`, or None when it has no single Dimension 
+    d = obj if isinstance(obj,(Dimension,CompoundDimension)) else obj.dimension
+    if isinstance(d,CompoundDimension): 
+        d = d.simplify
+    return d if isinstance(d,Dimension) else None
+    
+def commensurate(objects,target):
+    """
+    Return a list with an element for each of ``objects``, which is 
+    ``True`` when the object's dimensions are commensurate with ``target``
+    
+    Args:
+        objects: a sequence of scales, scale-aspects, compound  
+            objects, or dimensions
+        target: a scale, scale-aspect, compound object, or dimension
+        
+    Objects without dimensions, like scales that do not belong 
+    to a unit system, are not commensurate with ``target``. 
+    Repeated objects are only examined once. 
+    
+    """
+    d = _simplified(target)
+    if d is None:
+        raise RuntimeError( 
+            "no dimensions for {!r}".format(target) 
+        )
+    key = (d._system,d._n,d._packed)
+    
+    # The packed exponents are compared as one integer 
+    seen = {}   # id -> (object, result) 
+    result = []
+    for obj in objects:
+        try:
+            result.append( seen[ id(obj) ][1] )
+            continue
+        except KeyError:
+            pass
+            
+        try:
+            d = _simplified(obj)
+        except RuntimeError:
+            d = None
+            
+        r = d is not None and (d._system,d._n,d._packed) == key
+        seen[ id(obj) ] = (obj,r)
+        result.append(r)
+        
+    return result
+    
 # ===========================================================================
 if __name__ == '__main__':
 
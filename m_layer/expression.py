@@ -2,18 +2,29 @@
 import numbers
 import math 
 
+from array import array
 from fractions import Fraction
 
 from m_layer.lib import *
 from m_layer.context import global_context as cxt
 from m_layer.stack import normal_form
+from m_layer.affine import Affine
+from m_layer.ml_math import numpy_module, is_array
 
 __all__ = (
     'expr', 
+    'expr_array',
     'token', 'value',
     'convert', 
     'cast',
     'scale_aspect',
+    'concatenate',
+    'convert_batch',
+    'converter',
+    'caster',
+    'Converter',
+    'Expression',
+    'ExpressionArray',
 )
 
 # ---------------------------------------------------------------------------
@@ -116,229 +127,10 @@ class Expression(object):
         
         
         """
-        if (
-            isinstance(dst,ScaleAspect) 
-        and isinstance(self.scale_aspect,ScaleAspect)
-        ):
-            # The source and destination aspects must match
-            if self.scale_aspect.aspect != dst.aspect:          
-                raise RuntimeError(
-                    "incompatible aspects: {!r} and {!r}".format( 
-                        self.scale_aspect.aspect, 
-                        dst.aspect 
-                    )
-                )
-                
-            else:
-                dst_scale_aspect = dst 
-                
-                new_token = cxt.conversion_from_scale_aspect( 
-                    self.scale_aspect.scale.uid,
-                    self.scale_aspect.aspect.uid,
-                    dst_scale_aspect.scale.uid 
-                )(self._token)
-
-        elif (
-            isinstance(dst,Scale) 
-        and isinstance(self.scale_aspect,ScaleAspect)
-        ): 
-            # The source aspect will be applied to the result.
-            # Create a ScaleAspect return object with the initial aspect 
-            # Again, the aspect can be `no_aspect`.
-            dst_scale_aspect = dst.to_scale_aspect( 
-                self.scale_aspect.aspect 
-            ) 
-            
-            new_token = cxt.conversion_from_scale_aspect( 
-                self.scale_aspect.scale.uid,
-                self.scale_aspect.aspect.uid,
-                dst_scale_aspect.scale.uid 
-            )(self._token)
-            
-        elif ( 
-            isinstance(dst,(CompoundScale,CompoundScaleAspect) ) 
-        and isinstance(self.scale_aspect,CompoundScaleAspect)
-        ):
-            # Conversion from a compound expression.
-            # The expressions must be arithmetically equivalent,  
-            # so that pairs of source-destination scale-aspects  
-            # can be found in the register. 
-            # If the destination is just a CompoundScale, then 
-            # the current aspects are copied into the result.
-                        
-            # Step 1: convert to products of powers
-            src_pops = normal_form(self.scale_aspect.stack)
-            
-            if isinstance(dst,CompoundScale):
-                # Copy the various src aspects to a new CompoundScaleAspect.
-                dst_scale_aspect = dst.to_compound_scale_aspect( 
-                    self.scale_aspect
-                ) 
-            
-            else:    
-                dst_scale_aspect = dst                
-                
-            dst_pops = normal_form(dst_scale_aspect.stack)
-            
-            # Step 2: take into account any stand-alone numerical factors
-            conversion_factor = src_pops.prefactor/dst_pops.prefactor
-            
-            # Step 3: step through the scale-aspect terms,
-            # obtaining a conversion factor for each
-            src_factors = src_pops.factors
-            dst_factors = dst_pops.factors
-            for src_i,dst_i in zip(src_factors.keys(),dst_factors.keys()):
-            
-                # Each term also has an exponent
-                src_exp = src_factors[src_i]
-                assert src_exp == dst_factors[dst_i],\
-                    "{} != {}".format(src_exp,dst_factors[dst_i])
-
-                src_s_uid,src_a_uid = src_i.uid
-                dst_s_uid, dst_a_uid = dst_i.uid
-                
-                # Aspects must match
-                if src_a_uid != dst_a_uid:
-                    raise RuntimeError(
-                        "aspects do not match: {} != {}".format(
-                            src_a_uid,dst_a_uid
-                        )
-                    )
-
-                c = cxt.conversion_from_scale_aspect( 
-                        src_s_uid,src_a_uid,dst_s_uid                     
-                )(1.0) 
-                conversion_factor *= c**src_exp
-            
-            new_token = conversion_factor*self._token
-
-        elif ( 
-            isinstance(dst,CompoundScale ) 
-        and isinstance(self.scale_aspect,CompoundScale)
-        ):
-            # This is the generic case, where no aspect is available
-            
-            # Conversion from one compound expression to another.
-            # The expressions must be arithmetically equivalent,  
-            # so that pairs of source-destination scale-aspects  
-            # can be found in the register. 
-                        
-            # Step 1: convert to products of powers
-            src_pops = normal_form(self.scale_aspect.stack)            
-            dst_pops = normal_form(dst.stack)         
-            
-            # Step 2: take into account any stand-alone numerical factors
-            conversion_factor = src_pops.prefactor/dst_pops.prefactor
-            
-            # Step 3: step through the scale terms,
-            # obtaining a conversion factor for each
-            src_factors = src_pops.factors
-            dst_factors = dst_pops.factors
-            for src_i,dst_i in zip(src_factors.keys(),dst_factors.keys()):
-            
-                # Each term also has an exponent
-                src_exp = src_factors[src_i]
-                assert src_exp == dst_factors[dst_i],\
-                    "{} != {}".format(src_exp,dst_factors[dst_i])
-
-                src_s_uid = src_i.uid
-                dst_s_uid = dst_i.uid
-                src_a_uid = no_aspect.uid
-
-                c = cxt.conversion_from_scale_aspect( 
-                        src_s_uid,src_a_uid,dst_s_uid                     
-                )(1.0) 
-                conversion_factor *= c**src_exp
-            
-            new_token = conversion_factor*self._token
- 
-            # Set the aspect component of the new CompoundScaleAspect
-            # to the default value.
-            dst_scale_aspect = dst.to_compound_scale_aspect() 
- 
-        elif ( 
-            isinstance(dst,(Scale,ScaleAspect) ) 
-        and isinstance(self.scale_aspect,CompoundScale)
-        ):
-            # To convert from a compound scale, to a specific one,
-            # the compound scale must be dimensionally equivalent 
-            # to the final scale, which must not have an aspect. 
-            
-            if isinstance(dst,Scale):            
-                dst_scale_aspect = dst.to_scale_aspect(no_aspect)
-                
-            elif isinstance(dst,ScaleAspect):
-                if dst.aspect is not no_aspect:
-                    raise RuntimeError(
-                        "conversion cannot change from ``no_aspect`` "
-                        "to {!r}".format(dst.aspect)
-                    ) 
-                else:
-                    dst_scale_aspect = dst 
-            else:
-                assert False, repr(dst) 
-                
-            src_dim = self.scale_aspect.dimension.simplify     
-            if src_dim != dst_scale_aspect.dimension:
-                raise RuntimeError(
-                    "dimensions must match: {}, {}".format(
-                        src_dim,
-                        dst_scale_aspect.dimension
-                    )
-                )           
-                        
-            new_token = cxt.conversion_from_compound_scale_dim( 
-                src_dim,
-                dst_scale_aspect.scale.uid 
-            )(self._token)
-            
-        elif ( 
-            isinstance(dst,(Scale,ScaleAspect) ) 
-        and isinstance(self.scale_aspect,CompoundScaleAspect)
-        ):
-            # Conversion from a compound scale-aspect to a specific one.
-            # Since the result must have a single aspect, we are limited
-            # to just the generic no_aspect. So this function must 
-            # fail if there are any non-trivial aspects in the expression.
-            if not self.scale_aspect.to_compound_scales_and_aspects()[1].no_aspect: 
-                raise RuntimeError(
-                    "conversion would loose aspect information {}".format(
-                        self.scale_aspect
-                    )
-                )
-            if isinstance(dst,Scale):            
-                dst_scale_aspect = dst.to_scale_aspect(no_aspect)
-                
-            elif isinstance(dst,ScaleAspect):
-                if dst.aspect is not no_aspect:
-                    # A cast would be required to change the aspect
-                    raise RuntimeError(
-                        "cannot change aspect: {!r}".format(dst)
-                    ) 
-                else:
-                    dst_scale_aspect = dst 
-            else:
-                assert False, repr(dst) 
-                
-            src_dim = self.scale_aspect.dimension.simplify     
-            if src_dim != dst_scale_aspect.dimension:
-                raise RuntimeError(
-                    "dimensions must match: {}, {}".format(
-                        src_dim,
-                        dst_scale_aspect.dimension
-                    )
-                )           
-                        
-            new_token = cxt.conversion_from_compound_scale_dim( 
-                src_dim,
-                dst_scale_aspect.scale.uid 
-            )(self._token)
-
-        else:
-            assert False
-            
+        fn, dst_scale_aspect = _conversion(self.scale_aspect,dst)
+        
         return Expression(
-            new_token,
+            fn(self._token),
             dst_scale_aspect
         )
 
@@ -360,87 +152,670 @@ class Expression(object):
         iii) the aspect of the initial expression                 
             
         """        
-        if isinstance(self.scale_aspect,ScaleAspect):
+        fn, dst_scale_aspect = _cast(self.scale_aspect,dst,aspect)
         
-            if isinstance(dst,Scale):            
-                if aspect is no_aspect:
-                    # carry forward the initial aspect
-                    dst_scale_aspect = dst.to_scale_aspect(
-                        self.scale_aspect.aspect
-                    )
-                else:
-                    dst_scale_aspect = dst.to_scale_aspect(aspect)
-                     
-            elif isinstance(dst,ScaleAspect):
-                if dst.aspect is no_aspect: 
-                    if aspect is no_aspect:
-                        # carry forward the initial aspect
-                        dst_scale_aspect = ScaleAspect(
-                            dst.scale,
-                            self.scale_aspect.aspect
-                        )  
-                    else:
-                        dst_scale_aspect = ScaleAspect(
-                            dst.scale,
-                            aspect
-                        )
-                else:
-                    dst_scale_aspect = dst
+        return Expression(
+            fn( self._token ),
+            dst_scale_aspect
+        )
+
+# ---------------------------------------------------------------------------
+def _buffer(values):
+    # A contiguous buffer of floats
+    numpy = numpy_module()
+    if numpy is not None:
+        return numpy.array(values,dtype=float)
+    else:
+        return array('d',values)
+        
+def _apply(fn,values):
+    # Apply `fn` to the buffer in one pass 
+    if is_array(values):
+        y = numpy_module().asarray( fn(values), dtype=float )
+        # An identity function returns the same buffer
+        return y.copy() if y is values else y
+    else:
+        return array( 'd', map(fn,values) )
+        
+def _take(values,index):
+    # Select from an ``array.array`` with a 
+    # boolean mask or a sequence of indices 
+    index = index.tolist() if is_array(index) else list(index)
+    if index and all( isinstance(k,bool) for k in index ):
+        if len(index) != len(values):
+            raise IndexError(
+                "mask of length {} for {} values".format(
+                    len(index),len(values)
+                )
+            )
+        return array( 'd', ( x for x,k in zip(values,index) if k ) )
+    else:
+        return array( 'd', ( values[k] for k in index ) )
+        
+def _same(x,y):
+    # True when the scale-aspect objects `x` and `y` are equivalent 
+    if isinstance(x,ScaleAspect):
+        return x == y
+    else:
+        return type(x) is type(y) and x.uid == y.uid
+    
+# ---------------------------------------------------------------------------
+class ExpressionArray(object):
+    
+    """
+    An ``ExpressionArray`` holds a sequence of numbers expressed 
+    in terms of one scale-aspect pair (which may be a compound). 
+    
+    The numbers are held in a NumPy array of floats, when NumPy is 
+    available, otherwise in an ``array.array``. A conversion or cast 
+    is resolved once and then applied to all the numbers. 
+    """
+    
+    __slots__ = ("_values","_scale_aspect")
+    
+    def __init__(self,values,mdata):
+        self._values = _buffer(values) 
+        
+        if isinstance(mdata,(ScaleAspect,CompoundScale,CompoundScaleAspect)):
+            self._scale_aspect = mdata
+        else:
+            assert False, repr(mdata)
+            
+    @classmethod
+    def _from_buffer(cls,values,mdata):
+        # `values` is already a buffer 
+        xa = cls.__new__(cls)
+        xa._values = values 
+        xa._scale_aspect = mdata 
+        return xa 
+      
+    def __str__(self):
+        if isinstance(self._scale_aspect,ScaleAspect):
+            return "{} {}".format( 
+                self._values.tolist(), 
+                self.scale_aspect.scale 
+            )
+        else:
+            return "{} {}".format( 
+                self._values.tolist(), 
+                self.scale_aspect 
+            )
+        
+    def __repr__(self):
+        return "ExpressionArray({},{!r})".format( 
+            self._values.tolist(), 
+            self.scale_aspect 
+        )
+        
+    def __len__(self):
+        return len(self._values)
+        
+    def __iter__(self):
+        for x in self._values:
+            yield Expression(float(x),self._scale_aspect)
+            
+    def __getitem__(self,i):
+        if isinstance(i,numbers.Integral):
+            return Expression(float(self._values[i]),self._scale_aspect)
+        elif isinstance(i,slice) or is_array(self._values):
+            # NumPy also handles boolean masks and index arrays
+            values = self._values[i]
+        else:
+            values = _take(self._values,i)
+            
+        return ExpressionArray._from_buffer(values,self._scale_aspect)
+            
+    @property
+    def values(self):
+        "The buffer of numbers"
+        return self._values
+        
+    # Aliases, like Expression 
+    token = values 
+    value = values 
+        
+    @property 
+    def scale_aspect(self):
+        "The scale-aspect shared by the numbers"
+        return self._scale_aspect
+        
+    def convert(self,dst):
+        """Return a new array in terms of ``dst``
+        
+        Args:
+            dst (:class:`~lib.CompoundScaleAspect` or
+            :class:`~lib.CompoundScale`
+            :class:`~lib.ScaleAspect` or 
+            :class:`~lib.Scale`) 
+        
+        Returns:
+            :class:`~expression.ExpressionArray` 
+            
+        See :meth:`Expression.convert`
+        
+        """
+        fn, dst_scale_aspect = _conversion(self.scale_aspect,dst)
+        
+        return ExpressionArray._from_buffer(
+            _apply(fn,self._values),
+            dst_scale_aspect
+        )
+        
+    def cast(self,dst,aspect=no_aspect):
+        """Return a new array in terms of ``dst``
+        
+        Args:
+            dst(:class:`~lib.ScaleAspect` or :class:`~lib.Scale`)
+            aspect(:class:`~lib.Aspect`, optional)
+            
+        Returns:
+            :class:`~expression.ExpressionArray` 
+            
+        See :meth:`Expression.cast`
+        
+        """
+        fn, dst_scale_aspect = _cast(self.scale_aspect,dst,aspect)
+        
+        return ExpressionArray._from_buffer(
+            _apply(fn,self._values),
+            dst_scale_aspect
+        )
+        
+    # Reductions return an Expression. 
+    # NumPy arrays are reduced by NumPy methods.
+    def sum(self):
+        "Return the sum of the numbers as an :class:`Expression`"
+        values = self._values
+        x = values.sum() if is_array(values) else sum(values)
+        return Expression( float(x), self._scale_aspect )
+        
+    def mean(self):
+        "Return the mean of the numbers as an :class:`Expression`"
+        values = self._values
+        if is_array(values):
+            x = values.mean()
+        else:
+            x = float( sum(values) )/len(values)
+        return Expression( float(x), self._scale_aspect )
+        
+    def min(self):
+        "Return the smallest number as an :class:`Expression`"
+        values = self._values
+        x = values.min() if is_array(values) else min(values)
+        return Expression( float(x), self._scale_aspect )
+        
+    def max(self):
+        "Return the largest number as an :class:`Expression`"
+        values = self._values
+        x = values.max() if is_array(values) else max(values)
+        return Expression( float(x), self._scale_aspect )
+
+# ---------------------------------------------------------------------------
+def _convertible(src_s_uid,src_a_uid,dst_s_uid):
+    try:
+        return cxt.convertible(src_s_uid,src_a_uid,dst_s_uid)
+    except RuntimeError:
+        return False
+        
+def _pair_terms(src_factors,dst_factors,uids):
+    # Match the terms of two products of powers, regardless of order.
+    # `uids(term)` returns the (scale uid, aspect uid) for a term.
+    # Each source term is paired with a destination term with the same 
+    # exponent, preferring the same scale, then a scale that it can be 
+    # converted to with the same aspect. Returns a list of 
+    # (src_term, dst_term, exponent) triplets. 
+    unused = [ 
+        (dst_i,dst_exp) 
+            for dst_i,dst_exp in dst_factors.items() 
+                if dst_exp != 0 
+    ]
+    
+    pairs = []
+    for src_i,src_exp in src_factors.items():
+        if src_exp == 0: continue
+        
+        candidates = [ 
+            j for j,(dst_i,dst_exp) in enumerate(unused) 
+                if dst_exp == src_exp 
+        ]
+        if not candidates:
+            raise RuntimeError(
+                "no term matching {!s} with exponent {}".format(src_i,src_exp)
+            )
+            
+        src_s_uid, src_a_uid = uids(src_i)
+        ranked = [] 
+        for j in candidates:
+            dst_s_uid, dst_a_uid = uids( unused[j][0] )
+            if dst_s_uid == src_s_uid and dst_a_uid == src_a_uid:
+                rank = 0
+            elif dst_a_uid == src_a_uid and _convertible(
+                src_s_uid,src_a_uid,dst_s_uid
+            ):
+                rank = 1
             else:
-                assert False, repr(dst)
-                
-            fn = cxt.casting_from_scale_aspect(
-                self.scale_aspect.scale.uid,
-                self.scale_aspect.aspect.uid,
-                dst_scale_aspect.scale.uid,
-                dst_scale_aspect.aspect.uid 
+                rank = 2
+            ranked.append( (rank,j) )
+            
+        # Otherwise, the first candidate will report the problem
+        j = min(ranked)[1]
+        pairs.append( (src_i,unused.pop(j)[0],src_exp) )
+        
+    if unused:
+        raise RuntimeError(
+            "no term matching {!s} with exponent {}".format(*unused[0])
+        )
+        
+    return pairs
+    
+# ---------------------------------------------------------------------------
+def _conversion(src,dst):
+    # Return the function that converts tokens expressed in terms 
+    # of `src` to tokens in terms of `dst`, and the scale-aspect 
+    # of the result. 
+    # `src` is a ScaleAspect, CompoundScale or CompoundScaleAspect. 
+    if (
+        isinstance(dst,ScaleAspect) 
+    and isinstance(src,ScaleAspect)
+    ):
+        # The source and destination aspects must match
+        if src.aspect != dst.aspect:          
+            raise RuntimeError(
+                "incompatible aspects: {!r} and {!r}".format( 
+                    src.aspect, 
+                    dst.aspect 
+                )
+            )
+            
+        else:
+            dst_scale_aspect = dst 
+            
+            fn = cxt.conversion_from_scale_aspect( 
+                src.scale.uid,
+                src.aspect.uid,
+                dst_scale_aspect.scale.uid 
             )
 
-        elif isinstance(
-            self.scale_aspect,(CompoundScale,CompoundScaleAspect)
+    elif (
+        isinstance(dst,Scale) 
+    and isinstance(src,ScaleAspect)
+    ): 
+        # The source aspect will be applied to the result.
+        # Create a ScaleAspect return object with the initial aspect 
+        # Again, the aspect can be `no_aspect`.
+        dst_scale_aspect = dst.to_scale_aspect( 
+            src.aspect 
+        ) 
+        
+        fn = cxt.conversion_from_scale_aspect( 
+            src.scale.uid,
+            src.aspect.uid,
+            dst_scale_aspect.scale.uid 
+        )
+        
+    elif ( 
+        isinstance(dst,(CompoundScale,CompoundScaleAspect) ) 
+    and isinstance(src,CompoundScaleAspect)
+    ):
+        # Conversion from a compound expression.
+        # The expressions must be arithmetically equivalent,  
+        # so that pairs of source-destination scale-aspects  
+        # can be found in the register. 
+        # If the destination is just a CompoundScale, then 
+        # the current aspects are copied into the result.
+                    
+        if isinstance(dst,CompoundScale):
+            # Copy the various src aspects to a new CompoundScaleAspect.
+            dst_scale_aspect = dst.to_compound_scale_aspect( 
+                src
+            ) 
+        
+        else:    
+            dst_scale_aspect = dst                
+            
+        # The conversion factor is held, so a repeated conversion 
+        # is just a look-up. The identifiers keep every term, 
+        # with its role and exponent.
+        key = (src.uid,dst_scale_aspect.uid)
+        try:
+            return cxt._compound_conversions[key], dst_scale_aspect
+        except KeyError:
+            pass
+            
+        # Step 1: convert to products of powers
+        src_pops = normal_form(src.stack)
+        dst_pops = normal_form(dst_scale_aspect.stack)
+        
+        # Step 2: take into account any stand-alone numerical factors
+        conversion_factor = src_pops.prefactor/dst_pops.prefactor
+        
+        # Step 3: step through the scale-aspect terms,
+        # obtaining a conversion factor for each
+        for src_i,dst_i,src_exp in _pair_terms(
+            src_pops.factors,
+            dst_pops.factors,
+            lambda i: i.uid
         ):
-            src_dim = self.scale_aspect.dimension.simplify
+            src_s_uid,src_a_uid = src_i.uid
+            dst_s_uid, dst_a_uid = dst_i.uid
             
-            if src_dim != dst.dimension:
+            # Aspects must match
+            if src_a_uid != dst_a_uid:
                 raise RuntimeError(
-                    "dimensions must match: {}, {}".format(
-                        src_dim,
-                        dst_scale_aspect.dimension
+                    "aspects do not match: {} != {}".format(
+                        src_a_uid,dst_a_uid
                     )
-                )           
+                )
+
+            c = cxt.conversion_from_scale_aspect( 
+                    src_s_uid,src_a_uid,dst_s_uid                     
+            )(1.0) 
+            conversion_factor *= c**src_exp
+        
+        fn = cxt._compound_conversions[key] = Affine(conversion_factor)
+
+    elif ( 
+        isinstance(dst,CompoundScale ) 
+    and isinstance(src,CompoundScale)
+    ):
+        # This is the generic case, where no aspect is available
+        
+        # Conversion from one compound expression to another.
+        # The expressions must be arithmetically equivalent,  
+        # so that pairs of source-destination scale-aspects  
+        # can be found in the register. 
+        
+        # Set the aspect component of the new CompoundScaleAspect
+        # to the default value.
+        dst_scale_aspect = dst.to_compound_scale_aspect() 
+        
+        key = (src.uid,dst.uid)
+        try:
+            return cxt._compound_conversions[key], dst_scale_aspect
+        except KeyError:
+            pass
+                    
+        # Step 1: convert to products of powers
+        src_pops = normal_form(src.stack)            
+        dst_pops = normal_form(dst.stack)         
+        
+        # Step 2: take into account any stand-alone numerical factors
+        conversion_factor = src_pops.prefactor/dst_pops.prefactor
+        
+        # Step 3: step through the scale terms,
+        # obtaining a conversion factor for each
+        for src_i,dst_i,src_exp in _pair_terms(
+            src_pops.factors,
+            dst_pops.factors,
+            lambda i: (i.uid,no_aspect.uid)
+        ):
+            src_s_uid = src_i.uid
+            dst_s_uid = dst_i.uid
+            src_a_uid = no_aspect.uid
+
+            c = cxt.conversion_from_scale_aspect( 
+                    src_s_uid,src_a_uid,dst_s_uid                     
+            )(1.0) 
+            conversion_factor *= c**src_exp
+        
+        fn = cxt._compound_conversions[key] = Affine(conversion_factor)
+ 
+    elif ( 
+        isinstance(dst,(Scale,ScaleAspect) ) 
+    and isinstance(src,CompoundScale)
+    ):
+        # To convert from a compound scale, to a specific one,
+        # the compound scale must be dimensionally equivalent 
+        # to the final scale, which must not have an aspect. 
+        
+        if isinstance(dst,Scale):            
+            dst_scale_aspect = dst.to_scale_aspect(no_aspect)
+            
+        elif isinstance(dst,ScaleAspect):
+            if dst.aspect is not no_aspect:
+                raise RuntimeError(
+                    "conversion cannot change from ``no_aspect`` "
+                    "to {!r}".format(dst.aspect)
+                ) 
+            else:
+                dst_scale_aspect = dst 
+        else:
+            assert False, repr(dst) 
+            
+        src_dim = src.dimension.simplify     
+        if src_dim != dst_scale_aspect.dimension:
+            raise RuntimeError(
+                "dimensions must match: {}, {}".format(
+                    src_dim,
+                    dst_scale_aspect.dimension
+                )
+            )           
+                    
+        fn = cxt.conversion_from_compound_scale_dim( 
+            src_dim,
+            dst_scale_aspect.scale.uid 
+        )
+        
+    elif ( 
+        isinstance(dst,(Scale,ScaleAspect) ) 
+    and isinstance(src,CompoundScaleAspect)
+    ):
+        # Conversion from a compound scale-aspect to a specific one.
+        # Since the result must have a single aspect, we are limited
+        # to just the generic no_aspect. So this function must 
+        # fail if there are any non-trivial aspects in the expression.
+        if not src.to_compound_scales_and_aspects()[1].no_aspect: 
+            raise RuntimeError(
+                "conversion would loose aspect information {}".format(
+                    src
+                )
+            )
+        if isinstance(dst,Scale):            
+            dst_scale_aspect = dst.to_scale_aspect(no_aspect)
+            
+        elif isinstance(dst,ScaleAspect):
+            if dst.aspect is not no_aspect:
+                # A cast would be required to change the aspect
+                raise RuntimeError(
+                    "cannot change aspect: {!r}".format(dst)
+                ) 
+            else:
+                dst_scale_aspect = dst 
+        else:
+            assert False, repr(dst) 
+            
+        src_dim = src.dimension.simplify     
+        if src_dim != dst_scale_aspect.dimension:
+            raise RuntimeError(
+                "dimensions must match: {}, {}".format(
+                    src_dim,
+                    dst_scale_aspect.dimension
+                )
+            )           
+                    
+        fn = cxt.conversion_from_compound_scale_dim( 
+            src_dim,
+            dst_scale_aspect.scale.uid 
+        )
+
+    else:
+        assert False
             
-            if isinstance(dst,Scale):            
+    return fn, dst_scale_aspect
+
+# ---------------------------------------------------------------------------
+def _cast(src,dst,aspect):
+    # Return the function that casts tokens expressed in terms 
+    # of `src` to tokens in terms of `dst`, and the scale-aspect 
+    # of the result (see `Expression.cast`). 
+    if isinstance(src,ScaleAspect):
+    
+        if isinstance(dst,Scale):            
+            if aspect is no_aspect:
+                # carry forward the initial aspect
+                dst_scale_aspect = dst.to_scale_aspect(
+                    src.aspect
+                )
+            else:
+                dst_scale_aspect = dst.to_scale_aspect(aspect)
+                 
+        elif isinstance(dst,ScaleAspect):
+            if dst.aspect is no_aspect: 
                 if aspect is no_aspect:
-                    # cannot carry forward an initial aspect,
-                    # so use no_aspect
-                    dst_scale_aspect = dst.to_scale_aspect(no_aspect)
+                    # carry forward the initial aspect
+                    dst_scale_aspect = ScaleAspect(
+                        dst.scale,
+                        src.aspect
+                    )  
                 else:
-                    dst_scale_aspect = dst.to_scale_aspect(aspect)
-
-            elif isinstance(dst,ScaleAspect):
-                if dst.aspect is no_aspect:
-                    # Note `aspect` may just be `no_aspect` anyway
                     dst_scale_aspect = ScaleAspect(
                         dst.scale,
                         aspect
-                    ) 
-                else:
-                    dst_scale_aspect = dst                
-                
+                    )
             else:
-                assert False, repr(dst)
-                
-            fn = cxt.casting_from_compound_scale_dim(
-                src_dim,
-                dst_scale_aspect.scale.uid,
-                dst_scale_aspect.aspect.uid 
-            )
-           
-        return Expression(
-            fn( self._token ),
-            dst_scale_aspect
+                dst_scale_aspect = dst
+        else:
+            assert False, repr(dst)
+            
+        fn = cxt.casting_from_scale_aspect(
+            src.scale.uid,
+            src.aspect.uid,
+            dst_scale_aspect.scale.uid,
+            dst_scale_aspect.aspect.uid 
         )
 
+    elif isinstance(
+        src,(CompoundScale,CompoundScaleAspect)
+    ):
+        src_dim = src.dimension.simplify
+        
+        if src_dim != dst.dimension:
+            raise RuntimeError(
+                "dimensions must match: {}, {}".format(
+                    src_dim,
+                    dst_scale_aspect.dimension
+                )
+            )           
+        
+        if isinstance(dst,Scale):            
+            if aspect is no_aspect:
+                # cannot carry forward an initial aspect,
+                # so use no_aspect
+                dst_scale_aspect = dst.to_scale_aspect(no_aspect)
+            else:
+                dst_scale_aspect = dst.to_scale_aspect(aspect)
+
+        elif isinstance(dst,ScaleAspect):
+            if dst.aspect is no_aspect:
+                # Note `aspect` may just be `no_aspect` anyway
+                dst_scale_aspect = ScaleAspect(
+                    dst.scale,
+                    aspect
+                ) 
+            else:
+                dst_scale_aspect = dst                
+            
+        else:
+            assert False, repr(dst)
+            
+        fn = cxt.casting_from_compound_scale_dim(
+            src_dim,
+            dst_scale_aspect.scale.uid,
+            dst_scale_aspect.aspect.uid 
+        )
+            
+    return fn, dst_scale_aspect
+
+# ---------------------------------------------------------------------------
+class Converter(object):
+    
+    """
+    A ``Converter`` maps tokens expressed in one scale-aspect 
+    to tokens expressed in another. 
+    
+    The conversion or cast is resolved when the ``Converter`` is 
+    created (see :func:`converter` and :func:`caster`), so calling 
+    it only evaluates the function. 
+    """
+    
+    __slots__ = ("_fn","_scale_aspect")
+    
+    def __init__(self,fn,mdata):
+        self._fn = fn 
+        self._scale_aspect = mdata
+        
+    def __call__(self,token):
+        return self._fn(token)
+        
+    def __repr__(self):
+        return "Converter({!r},{!r})".format(
+            self._fn,
+            self._scale_aspect 
+        )
+        
+    @property
+    def function(self):
+        "The function applied to tokens"
+        return self._fn 
+        
+    @property 
+    def scale_aspect(self):
+        "The scale-aspect of the tokens returned"
+        return self._scale_aspect
+        
+    def expression(self,xp):
+        """Return ``xp`` converted to a new :class:`Expression`
+        
+        Args:
+            xp (:class:`~expression.Expression`): an expression in terms 
+                of the source scale-aspect, which is not checked 
+                
+        """
+        return Expression( self._fn(xp._token), self._scale_aspect )
+
+def _source(s,a=no_aspect):
+    # The scale-aspect for a source `s`, which may just be a scale
+    if isinstance(s,(ScaleAspect,CompoundScale,CompoundScaleAspect)):
+        return s
+    elif isinstance(s,Scale):
+        return s.to_scale_aspect(a)
+    else:
+        assert False, "unexpected: {!r}, {!r}".format(s,a)
+        
+def converter(src,dst):
+    """Return a :class:`Converter` from ``src`` to ``dst``
+    
+    Args:
+        src (:class:`~lib.ScaleAspect`, :class:`~lib.Scale` 
+            or a compound): the initial scale-aspect 
+        dst (:class:`~lib.ScaleAspect`, :class:`~lib.Scale` 
+            or a compound): the final scale-aspect
+            
+    Returns:
+        :class:`~expression.Converter`
+        
+    The checks made by :meth:`Expression.convert` are made once, here. 
+    
+    """
+    return Converter( *_conversion( _source(src), dst ) )
+    
+def caster(src,dst,aspect=no_aspect):
+    """Return a :class:`Converter` that casts ``src`` to ``dst``
+    
+    Args:
+        src (:class:`~lib.ScaleAspect`, :class:`~lib.Scale` 
+            or a compound): the initial scale-aspect 
+        dst (:class:`~lib.ScaleAspect` or :class:`~lib.Scale`)
+        aspect(:class:`~lib.Aspect`, optional)
+            
+    Returns:
+        :class:`~expression.Converter`
+        
+    The checks made by :meth:`Expression.cast` are made once, here. 
+    
+    """
+    return Converter( *_cast( _source(src), dst, aspect ) )
+    
 # ---------------------------------------------------------------------------
 # Unbound functions and aliases corresponding to ``Expression`` operations
 #
@@ -518,11 +893,127 @@ def expr(v,s,a=no_aspect):
     
     """
     # `s` may be a scale-aspect pair or just a scale 
-    if isinstance(s,(ScaleAspect,CompoundScale,CompoundScaleAspect)):
-        return Expression(v,s)
-    elif isinstance(s,Scale):
-        return Expression(v, s.to_scale_aspect(a) )
+    return Expression( v, _source(s,a) )
+
+# ---------------------------------------------------------------------------
+def expr_array(v,s,a=no_aspect):
+    """Create a new expression array
+    
+    Args:
+        v: a sequence of numbers
+        s (:class:`~lib.ScaleAspect`, :class:`~lib.Scale`): the scale
+        a (:class:`~lib.Aspect`, optional): the aspect 
+        
+    Returns:
+        :class:`~expression.ExpressionArray`  
+    
+    """
+    return ExpressionArray( v, _source(s,a) )
+        
+# ---------------------------------------------------------------------------
+def concatenate(arrays):
+    """Return an expression array that joins ``arrays`` 
+    
+    Args:
+        arrays: a sequence of :class:`~expression.ExpressionArray` 
+            objects with the same scale-aspect 
+            
+    Returns:
+        :class:`~expression.ExpressionArray`  
+    
+    """
+    arrays = list(arrays)
+    mdata = arrays[0].scale_aspect 
+    for xa in arrays[1:]:
+        if not _same(mdata,xa.scale_aspect):
+            raise RuntimeError(
+                "different scale-aspects: {!r} and {!r}".format(
+                    mdata, xa.scale_aspect
+                )
+            )
+            
+    numpy = numpy_module()
+    if numpy is not None:
+        values = numpy.concatenate( [ xa.values for xa in arrays ] )
     else:
-        assert False, "unexpected: {!r}, {!r}".format(s,a)
+        values = array('d')
+        for xa in arrays: values.extend( xa.values )
+        
+    return ExpressionArray._from_buffer(values,mdata)
+        
+# ---------------------------------------------------------------------------
+def convert_batch(values,scales,dst,aspect=no_aspect):
+    """Convert numbers expressed in a mixture of scales to ``dst``
     
+    Args:
+        values: a sequence of numbers
+        scales: a sequence, parallel to ``values``, of  
+            :class:`~lib.Scale`, :class:`~lib.ScaleAspect` 
+            or compound objects
+        dst (:class:`~lib.CompoundScaleAspect` or
+            :class:`~lib.CompoundScale`
+            :class:`~lib.ScaleAspect` or 
+            :class:`~lib.Scale`) 
+        aspect (:class:`~lib.Aspect`, optional): the aspect of 
+            elements of ``scales`` that are just a :class:`~lib.Scale`
         
+    Returns:
+        :class:`~expression.ExpressionArray` 
+        
+    The rows are grouped by scale-aspect, so each conversion is 
+    resolved once, and the results are returned in the original order.
+    Every group must convert to the same scale-aspect. 
+    
+    """
+    values = _buffer(values)
+    
+    # Group row indices by scale-aspect. Objects are first identified 
+    # by `id`, because the same scale object is usually repeated. 
+    by_id = {}      # id(s) -> row indices
+    by_uid = {}     # uid -> (scale-aspect, row indices)
+    n = 0
+    for i,s in enumerate(scales):
+        n += 1
+        try:
+            by_id[ id(s) ][1].append(i)
+        except KeyError:
+            mdata = _source(s,aspect)
+            group = by_uid.setdefault( mdata.uid, (mdata,[]) )
+            by_id[ id(s) ] = (s,group[1])
+            group[1].append(i)
+            
+    if n != len(values):
+        raise RuntimeError(
+            "{} values and {} scales".format(len(values),n)
+        )
+        
+    result = _buffer( [0.0]*n )
+    dst_scale_aspect = None 
+    for src,rows in by_uid.values():
+        fn, mdata = _conversion(src,dst)
+        
+        if dst_scale_aspect is None:
+            dst_scale_aspect = mdata
+        elif not _same(dst_scale_aspect,mdata):
+            raise RuntimeError(
+                "different scale-aspects: {!r} and {!r}".format(
+                    dst_scale_aspect, mdata
+                )
+            )
+            
+        if is_array(values):
+            rows = numpy_module().array(rows,dtype=int)
+            result[rows] = _apply( fn, values[rows] )
+        else:
+            y = _apply( fn, array('d',( values[i] for i in rows )) )
+            for i,y_i in zip(rows,y):
+                result[i] = y_i
+                
+    if dst_scale_aspect is None:
+        # There were no rows 
+        if isinstance(dst,Scale):
+            dst_scale_aspect = dst.to_scale_aspect(aspect)
+        else:
+            dst_scale_aspect = dst 
+    
+    return ExpressionArray._from_buffer(result,dst_scale_aspect)
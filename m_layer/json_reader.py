@@ -0,0 +1,171 @@
+"""
+Functions that read M-layer records from JSON files.
+
+These functions do not alter a :class:`~context.Context`, so
+they may be used to prepare records in other threads or processes.
+
+A register file may hold a single JSON object, a JSON array of objects,
+or, when the file name ends in ``.jsonl``, one JSON object on each
+line (JSON Lines). Arrays are read one element at a time, so a large
+file is never held in memory as a whole.
+
+"""
+import json
+import re
+
+from m_layer.ml_eval import ml_parameters
+
+__all__ = (
+    'iter_entities',
+    'iter_records',
+    'read_records',
+)
+
+# Characters read from a file at once
+CHUNK_SIZE = 65536
+
+_whitespace = re.compile(r'[ \t\n\r]*')
+
+# ---------------------------------------------------------------------------
+def _decoder(kwargs):
+    # The decoder that `json.load` would use with these arguments
+    cls = kwargs.pop('cls',None) or json.JSONDecoder
+    return cls(**kwargs)
+
+# ---------------------------------------------------------------------------
+def _iter_lines(f,decoder):
+    for line in f:
+        if line.strip():
+            yield decoder.decode(line)
+
+# ---------------------------------------------------------------------------
+def _iter_array(f,decoder,chunk_size):
+    # Decode the elements of a top-level JSON array one by one.
+    # Only the unread part of the buffer is retained, so memory use
+    # depends on the largest element, not on the size of the file.
+    buf = ''
+    pos = 0
+    eof = False
+
+    def more():
+        # Read more text, discarding what has been decoded
+        nonlocal buf, pos, eof
+        if eof: return False
+
+        # Read at least as much as is held, so that a
+        # large element is only decoded a few times
+        chunk = f.read( max(chunk_size,len(buf) - pos) )
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def next_char():
+        # The next character that is not whitespace, or ''
+        nonlocal pos
+        while True:
+            pos = _whitespace.match(buf,pos).end()
+            if pos < len(buf): return buf[pos]
+            if not more(): return ''
+
+    if next_char() != '[':
+        # A single object
+        yield decoder.decode( buf[pos:] + f.read() )
+        return
+
+    pos += 1
+    if next_char() == ']':
+        pos += 1
+    else:
+        while True:
+            while True:
+                try:
+                    obj, end = decoder.raw_decode(buf,pos)
+                except json.decoder.JSONDecodeError:
+                    # The element may be incomplete
+                    if more(): continue
+                    raise
+
+                # A number at the end of the buffer may be incomplete
+                if end == len(buf) and more(): continue
+                break
+
+            pos = end
+            yield obj
+
+            c = next_char()
+            if c == ',':
+                pos += 1
+                next_char()
+            elif c == ']':
+                pos += 1
+                break
+            else:
+                raise json.decoder.JSONDecodeError(
+                    "Expecting ',' delimiter",buf,pos
+                )
+
+    if next_char():
+        raise json.decoder.JSONDecodeError("Extra data",buf,pos)
+
+# ---------------------------------------------------------------------------
+def iter_entities(file_path,chunk_size=CHUNK_SIZE,**kwargs):
+    """
+    Return an iterator over the JSON objects in a register file
+
+    Args:
+        file_path (str): the JSON file
+        chunk_size (int): the number of characters read at once
+        **kwargs: keyword arguments passed to the JSON decoder,
+            as for ``json.load``
+
+    Objects are decoded as the iterator advances, so the objects
+    preceding a JSON error will already have been returned.
+
+    """
+    decoder = _decoder(kwargs)
+    with open(file_path,'r') as f:
+        if file_path.endswith('.jsonl'):
+            yield from _iter_lines(f,decoder)
+        else:
+            yield from _iter_array(f,decoder,chunk_size)
+
+# ---------------------------------------------------------------------------
+def iter_records(file_path,**kwargs):
+    """
+    Return an iterator over the records in a register file
+
+    Args:
+        file_path (str): the JSON file
+        **kwargs: keyword arguments passed to :func:`iter_entities`
+
+    Returns:
+        an iterator over (entity, parameters) pairs, where
+        ``parameters`` holds the evaluated function parameters
+        of a transformation entity, or is ``None``
+
+    """
+    for entity in iter_entities(file_path,**kwargs):
+        if 'parameters' in entity:
+            yield entity, ml_parameters( entity['parameters'] )
+        else:
+            yield entity, None
+
+# ---------------------------------------------------------------------------
+def read_records(file_path,**kwargs):
+    """
+    Return a list of records held in a JSON file
+
+    Args:
+        file_path (str): the JSON file
+        **kwargs: keyword arguments passed to :func:`iter_entities`
+
+    Returns:
+        a list of (entity, parameters) pairs, where ``parameters``
+        holds the evaluated function parameters of a transformation
+        entity, or is ``None``
+
+    """
+    return list( iter_records(file_path,**kwargs) )
@@ -7,6 +7,7 @@ from m_layer.context import global_context as cxt
 from m_layer.dimension import Dimension, CompoundDimension
 from m_layer.stack import Stack, normal_form
 from m_layer.uid import UID, CompoundUID 
+from m_layer.records import UnitSystemTerm
 
 __all__ = (
     'Reference',
@@ -58,7 +59,17 @@ class CompoundAspect(object):
         
         """
         return no_aspect.uid in self.uid
+
+    def __eq__(self,other):
+        """
+        True when both expressions have the same canonical form,
+        regardless of the order of terms (see :class:`~uid.CompoundUID`)
+        """
+        return isinstance(other,self.__class__) and self.uid == other.uid
         
+    def __hash__(self):
+        return hash(self.uid)
+
     def __mul__(self,y):
         return CompoundAspect(
             self.stack.push(y).mul()
@@ -87,22 +98,35 @@ class Aspect(object):
     """
     Aspect objects provide a lightweight wrapper around the 
     unique identifier for an M-layer aspect.  
+    
+    There is one Aspect object for each M-layer identifier.
     """
 
     __slots__ = (
-        '_aspect_uid',
+        '_aspect_uid','_hash'
     )
     
-    def __init__(self,aspect_uid):  
-        self._aspect_uid = UID(aspect_uid)
+    _interned = {}
+    
+    def __new__(cls,aspect_uid):  
+        uid = UID(aspect_uid)
+        try:
+            return cls._interned[uid]
+        except KeyError:
+            pass
+            
+        self = object.__new__(cls)
+        self._aspect_uid = uid
+        self._hash = hash(uid)
+        return cls._interned.setdefault(uid,self)
+        
+    def __reduce__(self):
+        return ( Aspect, ( self._aspect_uid._m_layer_uuid, ) )
 
     def _from_json(self,locale=None,short=False):
-        aspect_json = cxt.aspect_reg[self._aspect_uid] 
-
-        locale_key = 'symbol' if short else 'name'
         if locale is None: locale = cxt.locale 
             
-        return aspect_json['locale'][locale][locale_key]
+        return cxt.aspect_reg[self._aspect_uid].text(locale,short)
 
     @property 
     def uid(self):
@@ -110,14 +134,16 @@ class Aspect(object):
         return self._aspect_uid
         
     def __hash__(self):
-        return id(self)
+        return self._hash
         
     def __eq__(self,other):
         """
         True when both objects have the same uid
 
         """
-        return isinstance(other,Aspect) and self.uid == other.uid 
+        return self is other or (
+            isinstance(other,Aspect) and self.uid == other.uid 
+        )
 
     def __mul__(self,y):
         return CompoundAspect(
@@ -156,27 +182,43 @@ from collections import namedtuple
 
 class System(object):
 
+    """
+    There is one System object for each M-layer identifier.
+    """
+    
     __slots__ = (
         '_uid',
         '_name',
         '_basis'
     )
 
-    def __init__(self,uid):
+    _interned = {}
     
-        self._uid = uid = UID( uid )  
+    def __new__(cls,uid):
+        uid = UID( uid )  
+        try:
+            return cls._interned[uid]
+        except KeyError:
+            pass
+            
+        self = object.__new__(cls)
+        self._uid = uid
         
-        self._name = cxt.system_reg[uid]['name']
+        system = cxt.system_reg[uid]
+        self._name = system.name
         
         # The basis is a sequence of M-layer reference uids
-        basis = [ UID( tuple(s_i) ) for s_i in cxt.system_reg[uid]['basis'] ] 
-        names = [ cxt.reference_reg[ uid_i ]['locale']['default']['symbol'] 
-            for uid_i in basis
+        names = [ cxt.reference_reg[ uid_i ].symbol 
+            for uid_i in system.basis
         ]
         # A namedtuple keeps the order of base units and allows 
         # the reference uids to be indexed or accessed by attribute  
         # using the reference symbol
-        self._basis = namedtuple(self._name,names)._make(basis)
+        self._basis = namedtuple(self._name,names)._make(system.basis)
+        return cls._interned.setdefault(uid,self)
+        
+    def __reduce__(self):
+        return ( System, ( self._uid._m_layer_uuid, ) )
                     
     @property
     def uid(self):
@@ -197,7 +239,7 @@ class System(object):
         return "{}".format(self.name)
    
     def __eq__(self,other):
-        return (
+        return self is other or (
             isinstance(other,System)
         and
             self.uid == other.uid
@@ -207,23 +249,19 @@ class System(object):
         return hash(self._uid)
         
 # ---------------------------------------------------------------------------
-from ast import literal_eval
-
-def _sys_to_dimension(json_sys):
-    """
+def _sys_to_dimension(term):
     """
-    # The JSON prefix is a pair of string-formatted
-    # integers for the numerator and denominator
-    to_prefix_tuple = lambda x: tuple( 
-        int( literal_eval(i) ) for i in x 
-    )
-
-    to_dim_tuple = lambda x: tuple( literal_eval(x) )
+    Return a Dimension for the :class:`~records.UnitSystemTerm` of a reference 
     
+    The JSON ``system`` part of a reference entry may also be used.
+    """
+    if not isinstance(term,UnitSystemTerm):
+        term = UnitSystemTerm(term)
+        
     return Dimension( 
-        System( UID( json_sys['uid'] ) ),
-        to_dim_tuple( json_sys['dimensions'] ),
-        to_prefix_tuple( json_sys['prefix'] )
+        System( term.system_uid ),
+        term.dimensions,
+        term.prefix
     )       
         
 # ---------------------------------------------------------------------------
@@ -235,13 +273,24 @@ class Reference(object):
 
     """
 
-    slots = ( '_uid', '_json_entry', '_dimension'  )
+    __slots__ = ( '_uid', '_record', '_dimension'  )
     
-    def __init__(self,json_uid):
+    _interned = {}
     
-        self._uid = UID(json_uid)
-        self._json_entry = cxt.reference_reg[self.uid]
+    def __new__(cls,json_uid):
+        uid = UID(json_uid)
+        try:
+            return cls._interned[uid]
+        except KeyError:
+            pass
+            
+        self = object.__new__(cls)
+        self._uid = uid
+        self._record = cxt.reference_reg[uid]
+        return cls._interned.setdefault(uid,self)
 
+    def __reduce__(self):
+        return ( Reference, ( self._uid._m_layer_uuid, ) )
 
     def __hash__(self):
         return hash(self.uid)
@@ -250,9 +299,7 @@ class Reference(object):
         return "Reference({})".format(self.uid)
     
     def __str__(self):    
-        return "{}".format(
-            self._json_entry['locale']['default']['symbol'] 
-        )
+        return "{}".format( self._record.symbol )
         
     @property
     def uid(self): 
@@ -263,11 +310,11 @@ class Reference(object):
         try:
             return self._dimension
         except AttributeError:
-            if "system" in self._json_entry:
-                self._dimension = _sys_to_dimension(self._json_entry["system"])
+            if self._record.system is not None:
+                self._dimension = _sys_to_dimension(self._record.system)
             else:
                 raise RuntimeError("no unit system for {!r}".format(
-                        UID( self._json_entry["uid"] )
+                        self._record.uid
                     )
                 )
                 
@@ -287,8 +334,19 @@ class CompoundScaleAspect(object):
         assert isinstance(scale_aspect_stack,Stack), repr(scale_aspect_stack)       
         self._stack = scale_aspect_stack
         
-        self._str = self._pop_to_str(scale_aspect_stack)
+    @property
+    def label(self):
+        """
+        A label for the expression as a product of powers, e.g., "s-1.m2"
         
+        The label is created when it is first used.
+        """
+        try:
+            return self._str
+        except AttributeError:
+            self._str = self._pop_to_str(self._stack)
+            return self._str
+            
     def _pop_to_str(self,scale_aspect_stack):
         
         # The keys in pop.factors are Scale objects.
@@ -313,7 +371,7 @@ class CompoundScaleAspect(object):
                 else:
                     s += "{}{}.".format(k,i) 
                     
-        return s[:-1] if s[-1] == "." else s
+        return s[:-1] if s.endswith(".") else s
         
     @property 
     def composable(self): return True
@@ -369,10 +427,16 @@ class CompoundScaleAspect(object):
         except AttributeError:
             self._uid = CompoundUID(self.stack)
             return self._uid
-            
-    # Equality (`==` method) could be based on the equivalence of expressions
-    # without simplification (indifferent to ordering of terms).
-    # Explicit function names like `commensurate` might be better. 
+
+    def __eq__(self,other):
+        """
+        True when both expressions have the same canonical form,
+        regardless of the order of terms (see :class:`~uid.CompoundUID`)
+        """
+        return isinstance(other,self.__class__) and self.uid == other.uid
+        
+    def __hash__(self):
+        return hash(self.uid)
 
     def to_compound_scales_and_aspects(self):
         """
@@ -407,16 +471,31 @@ class ScaleAspect(object):
 
     """
     A wrapper around a scale and aspect pair.
+    
+    There is one ScaleAspect object for each pair.
     """
 
-    __slots__ = ("_scale","_aspect","_dimension")
+    __slots__ = ("_scale","_aspect","_dimension","_hash")
 
-    def __init__(self,scale,aspect=no_aspect):
+    _interned = {}
+    
+    def __new__(cls,scale,aspect=no_aspect):
+        try:
+            return cls._interned[ (scale,aspect) ]
+        except KeyError:
+            pass
+            
         assert isinstance(scale,Scale), repr(scale)
         assert isinstance(aspect,Aspect), repr(aspect)
         
+        self = object.__new__(cls)
         self._scale = scale
         self._aspect = aspect
+        self._hash = hash( (scale,aspect) )
+        return cls._interned.setdefault( (scale,aspect), self )
+
+    def __reduce__(self):
+        return ( ScaleAspect, ( self._scale, self._aspect ) )
 
     @property
     def scale(self):
@@ -425,6 +504,11 @@ class ScaleAspect(object):
     @property 
     def aspect(self):
         return self._aspect
+        
+    @property 
+    def role(self):
+        "The role of the scale, or ``None``"
+        return self._scale.role
             
     # Alias
     kind_of_quantity = aspect 
@@ -488,7 +572,7 @@ class ScaleAspect(object):
         
     def __eq__(self,other):
         "True when the M-layer identifiers of both objects match"
-        return (
+        return self is other or (
             isinstance(other,self.__class__)
         and 
             self.scale == other.scale
@@ -497,7 +581,7 @@ class ScaleAspect(object):
         )
         
     def __hash__(self):
-        return id(self)
+        return self._hash
         
     def __str__(self):
         if self.aspect is no_aspect:
@@ -531,8 +615,19 @@ class CompoundScale(object):
         assert isinstance(scale_stack,Stack)
         self._stack = scale_stack
         
-        self._str = self._pop_to_str(scale_stack)
+    @property
+    def label(self):
+        """
+        A label for the expression as a product of powers, e.g., "s-1.m2"
         
+        The label is created when it is first used.
+        """
+        try:
+            return self._str
+        except AttributeError:
+            self._str = self._pop_to_str(self._stack)
+            return self._str
+            
     def _pop_to_str(self,scale_stack):
         
         # The keys in pop.factors are Scale objects.
@@ -557,7 +652,7 @@ class CompoundScale(object):
                 else:
                     s += "{}{}.".format(k,i) 
                     
-        return s[:-1] if s[-1] == "." else s
+        return s[:-1] if s.endswith(".") else s
             
     
     def __str__(self):
@@ -575,6 +670,16 @@ class CompoundScale(object):
             self._uid = CompoundUID(self.stack)
             return self._uid
 
+    def __eq__(self,other):
+        """
+        True when both expressions have the same canonical form,
+        regardless of the order of terms (see :class:`~uid.CompoundUID`)
+        """
+        return isinstance(other,self.__class__) and self.uid == other.uid
+        
+    def __hash__(self):
+        return hash(self.uid)
+
     @property
     def dimension(self):
         "The dimensions of the component scales"
@@ -694,18 +799,37 @@ class Scale(object):
 
     """
     A Scale encapsulates a unique identifier for an M-layer scale.  
+    
+    There is one Scale object for each M-layer identifier. When the 
+    same scale has different roles in an expression (e.g., the metres 
+    in metres per second per metre of height), a ``role`` label may be 
+    given to obtain a distinct object. 
     """
 
     __slots__ = (
-        '_scale_uid','_scale_type', '_reference'
+        '_scale_uid','_scale_type', '_reference', '_role', '_hash'
     )
     
-    def __init__(self,scale_uid):    
-        self._scale_uid = UID(scale_uid)
-        self._scale_type = cxt.scale_reg[self._scale_uid]['scale_type']
-        self._reference = Reference(
-            cxt.scale_reg[self._scale_uid]['reference']
-        ) 
+    _interned = {}
+    
+    def __new__(cls,scale_uid,role=None):    
+        uid = UID(scale_uid)
+        try:
+            return cls._interned[ (uid,role) ]
+        except KeyError:
+            pass
+            
+        self = object.__new__(cls)
+        self._scale_uid = uid
+        scale = cxt.scale_reg[uid]
+        self._scale_type = scale.scale_type
+        self._reference = Reference( scale.reference ) 
+        self._role = role 
+        self._hash = hash( (uid,role) )
+        return cls._interned.setdefault( (uid,role), self )
+        
+    def __reduce__(self):
+        return ( Scale, ( self._scale_uid._m_layer_uuid, self._role ) )
         
     @property 
     def composable(self):
@@ -718,6 +842,11 @@ class Scale(object):
     @property 
     def scale_type(self):
         return self._scale_type
+        
+    @property 
+    def role(self):
+        "A label for the role of the scale, or ``None``"
+        return self._role
      
     @property 
     def dimension(self):
@@ -730,11 +859,17 @@ class Scale(object):
         return self._reference.dimension
             
     def __eq__(self,other):
-        "True when both objects have the same uids"
-        return isinstance(other,Scale) and self.uid == other.uid 
+        "True when both objects have the same uids and roles"
+        return self is other or (
+            isinstance(other,Scale) 
+        and 
+            self.uid == other.uid 
+        and 
+            self._role == other._role
+        )
  
     def __hash__(self):
-        return id(self)
+        return self._hash
         
     def __rmul__(self,x):
         # a numerical scale factor on the left 
@@ -767,7 +902,10 @@ class Scale(object):
         return str(self._reference)
         
     def __repr__(self):
-        return "Scale( {!s} )".format( self.uid )
+        if self._role is None:
+            return "Scale( {!s} )".format( self.uid )
+        else:
+            return "Scale( {!s}, role={!r} )".format( self.uid, self._role )
 
     def to_scale_aspect(self,aspect=no_aspect):
         """
@@ -781,27 +919,14 @@ class Scale(object):
 # Further configuration of `cxt` requiring some classes defined above.
 # 
 # Map the M-layer dimensions of systematically named scales to 
-# their scale UID.
+# their scale UID. This is done when `dimension_conversion_reg` is first used.
 #
-for src_scale_uid in cxt.scale_reg._objects.keys(): 
+def _load_dimension_conversions(cxt):
 
-    json_scale = cxt.scale_reg[src_scale_uid]   
-    
-    if "systematic" in json_scale:   
-    
-        ref_uid = UID( json_scale['reference'] )
-        json_ref = cxt.reference_reg[ ref_uid ]
-        
-        dim = _sys_to_dimension( json_ref["system"] )
-        
-        if dim not in cxt.dimension_conversion_reg:
-            assert isinstance(src_scale_uid,UID), type(src_scale_uid)
-            cxt.dimension_conversion_reg[dim] = src_scale_uid
-            
-        assert cxt.dimension_conversion_reg[dim] == src_scale_uid,\
-            "systematic scales: {} and {} both refer to {}".format(
-                src_scale_uid,
-                cxt.dimension_conversion_reg[dim],
-                json_ref["uid"]
-            )
-             
+    for (system_uid,dim,prefix), src_scale_uid in cxt.systematic_dimensions().items(): 
+
+        cxt.dimension_conversion_reg[ 
+            Dimension( System(system_uid), dim, prefix ) 
+        ] = src_scale_uid
+
+cxt.defer('dimension_conversion_reg',_load_dimension_conversions)
@@ -0,0 +1,386 @@
+"""
+Read-only registers that resolve M-layer records from memory-mapped files.
+
+A register file is written once, from the M-layer JSON records, and may
+then be opened by any number of processes. Entries are found by a
+binary search of the file, which is mapped into memory, so the
+operating system holds one copy of the register data for all processes.
+Only the entries and functions that a process actually uses are decoded.
+For example, ::
+
+    write_files( 'registers', _json_paths )
+
+    # in each worker process
+    cxt = mapped_context( 'registers' )
+
+The environment variable ``M_LAYER_REGISTER_DIR`` may be set to a 
+directory of register files, so that the global context uses them.
+
+A register file has three parts:
+
+    * a header, holding the format version, the number of UIDs in the
+      register key and the number of records
+    * fixed-length records, sorted by the 128-bit UUIDs of the key, each
+      holding the UUIDs and the offsets of the UID names and the entry
+    * a table of UTF-8 strings, holding the UID names and the JSON text
+      of each entry
+
+"""
+import glob
+import json
+import mmap
+import os
+import struct
+
+from m_layer.uid import UID
+from m_layer.register import (
+    LRUCache, TableRegister, TableConversionRegister, 
+    TableCastingRegister, TableScalesForAspectRegister
+)
+from m_layer.json_reader import iter_entities
+
+__all__ = (
+    'MappedRegister',
+    'MappedConversionRegister',
+    'MappedCastingRegister',
+    'MappedScalesForAspectRegister',
+    'write_files',
+    'mapped_registers',
+    'mapped_context',
+)
+
+MAGIC = b'MLAYREG\x00'
+
+# Change this when the layout of register files changes
+FORMAT = 1
+
+# magic, format, UIDs per key, number of records (padded to 24 bytes)
+_header = struct.Struct('<8sHHQ4x')
+
+# ---------------------------------------------------------------------------
+def _uuid_bytes(uids):
+    return b''.join( uid.uuid.to_bytes(16,'big') for uid in uids )
+
+# ---------------------------------------------------------------------------
+class _MappedTable(object):
+
+    # A memory-mapped file of JSON entries indexed by a sequence
+    # of `n` UIDs. Each record holds the UUIDs, as 16-byte big-endian
+    # integers, followed by the offset and length of each UID name
+    # and of the entry in the string table.
+
+    def __init__(self,path,n):
+        with open(path,'rb') as f:
+            self._map = mmap.mmap( f.fileno(), 0, access=mmap.ACCESS_READ )
+
+        magic, version, m, count = _header.unpack_from(self._map,0)
+        if magic != MAGIC or version != FORMAT or m != n:
+            self._map.close()
+            raise RuntimeError(
+                "not an M-layer register file: {}".format(path)
+            )
+
+        self._n = n
+        self._count = count
+        self._record = self._struct(n)
+        self._key_size = 16*n
+        self._strings = _header.size + count*self._record.size
+
+    @staticmethod
+    def _struct(n):
+        return struct.Struct( '<{}s{}QI'.format(16*n,'II'*n) )
+
+    def close(self):
+        self._map.close()
+
+    def count(self):
+        return self._count
+
+    def _unpack(self,i):
+        return self._record.unpack_from(
+            self._map, _header.size + i*self._record.size
+        )
+
+    def _key_bytes(self,i):
+        start = _header.size + i*self._record.size
+        return self._map[start:start + self._key_size]
+
+    def _string(self,offset,length):
+        start = self._strings + offset
+        return self._map[start:start + length]
+
+    def _uids(self,record):
+        key = record[0]
+        return tuple(
+            UID( (
+                self._string( record[1+2*j], record[2+2*j] ).decode('utf-8'),
+                int.from_bytes( key[16*j:16*(j+1)], 'big' )
+            ) )
+                for j in range(self._n)
+        )
+
+    def _lower_bound(self,key):
+        # The first record with UUIDs that are not less than `key`,
+        # which may be the first few UUIDs of a record key
+        size = len(key)
+        start = _header.size
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = start + mid*self._record.size
+            if self._map[offset:offset + size] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        return lo
+
+    def _matches(self,uids):
+        # The records whose key begins with `uids`
+        key = _uuid_bytes(uids)
+        size = len(key)
+        i = self._lower_bound(key)
+        while i < self._count and self._key_bytes(i)[:size] == key:
+            record = self._unpack(i)
+            if self._uids(record)[:len(uids)] == tuple(uids):
+                yield record
+            i += 1
+
+    def get(self,uids):
+        for record in self._matches(uids):
+            n = self._n
+            return json.loads(
+                self._string( record[1+2*n], record[2+2*n] ).decode('utf-8')
+            )
+
+        return None
+
+    def contains(self,uids):
+        # `uids` may be the first elements of a key
+        for record in self._matches(uids):
+            return True
+
+        return False
+
+    def keys(self,uids=()):
+        # All keys, or those beginning with `uids`
+        if uids:
+            records = self._matches(uids)
+        else:
+            records = ( self._unpack(i) for i in range(self._count) )
+
+        for record in records:
+            yield self._uids(record)
+
+    @classmethod
+    def write(cls,path,n,items):
+        # `items` is a sequence of (uids, entry) pairs
+        items = sorted(
+            items,
+            key = lambda item: (
+                _uuid_bytes( item[0] ), tuple( uid.name for uid in item[0] )
+            )
+        )
+        for i in range(1,len(items)):
+            if items[i-1][0] == items[i][0]:
+                raise RuntimeError(
+                    "existing register entry: {}".format(items[i][0])
+                )
+
+        strings = bytearray()
+        offsets = {}
+
+        def _add(text):
+            # Names are repeated in many records, so they are only stored once
+            try:
+                return offsets[text]
+            except KeyError:
+                data = text.encode('utf-8')
+                offsets[text] = (len(strings),len(data))
+                strings.extend(data)
+                return offsets[text]
+
+        record = cls._struct(n)
+        records = bytearray()
+        for uids,entry in items:
+            values = [ _uuid_bytes(uids) ]
+            for uid in uids:
+                values.extend( _add(uid.name) )
+            values.extend( _add( json.dumps(entry) ) )
+            records.extend( record.pack(*values) )
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path,'wb') as f:
+            f.write( _header.pack(MAGIC,FORMAT,n,len(items)) )
+            f.write(records)
+            f.write(strings)
+        os.replace(tmp_path,path)
+
+# ---------------------------------------------------------------------------
+class _MappedFile(object):
+
+    # Common behaviour of registers that are read from a register file.
+    # The UIDs of the table key are given by `_n` and `_entry_uids`.
+
+    def __init__(self,path,context=None):
+        self._context = context
+        self._table = _MappedTable(path,self._n)
+        self._cache = LRUCache()
+
+    @classmethod
+    def write(cls,path,entries):
+        """
+        Create a register file
+
+        Args:
+            path (str): the register file
+            entries: a sequence of M-layer records
+
+        """
+        _MappedTable.write(
+            path, cls._n,
+            ( (cls._entry_uids(entry), entry) for entry in entries )
+        )
+
+    def close(self):
+        "Release the register file"
+        self._table.close()
+
+    def set(self,entry,parameters=None):
+        raise RuntimeError("register files are read-only")
+
+# ---------------------------------------------------------------------------
+class MappedRegister(_MappedFile,TableRegister):
+
+    """
+    A read-only, memory-mapped alternative to :class:`~register.Register`
+
+    Args:
+        path (str): the register file
+        context (:class:`~context.Context`, optional)
+
+    """
+
+# ---------------------------------------------------------------------------
+class MappedConversionRegister(_MappedFile,TableConversionRegister):
+
+    """
+    A read-only, memory-mapped alternative to
+    :class:`~conversion_register.ConversionRegister`
+
+    Args:
+        path (str): the register file
+        context (:class:`~context.Context`, optional)
+
+    """
+
+# ---------------------------------------------------------------------------
+class MappedCastingRegister(_MappedFile,TableCastingRegister):
+
+    """
+    A read-only, memory-mapped alternative to
+    :class:`~casting_register.CastingRegister`
+
+    Args:
+        path (str): the register file
+        context (:class:`~context.Context`, optional)
+
+    """
+
+# ---------------------------------------------------------------------------
+class MappedScalesForAspectRegister(_MappedFile,TableScalesForAspectRegister):
+
+    """
+    A read-only, memory-mapped alternative to
+    :class:`~scales_for_aspect_register.ScalesForAspectRegister`
+
+    Args:
+        path (str): the register file
+        context (:class:`~context.Context`, optional)
+
+    The functions in this register are indexed by
+    an aspect and a pair of scales.
+
+    """
+
+# ---------------------------------------------------------------------------
+# The context attribute, file name and class for each type of entry
+_files = {
+    "Reference": ('reference_reg','reference.mlr',MappedRegister),
+    "Aspect": ('aspect_reg','aspect.mlr',MappedRegister),
+    "Scale": ('scale_reg','scale.mlr',MappedRegister),
+    "UnitSystem": ('system_reg','system.mlr',MappedRegister),
+    "Conversion": ('conversion_reg','conversion.mlr',MappedConversionRegister),
+    "Cast": ('casting_reg','cast.mlr',MappedCastingRegister),
+    "ScalesForAspect": (
+        'scales_for_aspect_reg','scales_for_aspect.mlr',
+        MappedScalesForAspectRegister
+    ),
+}
+
+# ---------------------------------------------------------------------------
+def write_files(directory,paths):
+    """
+    Create register files from M-layer JSON files
+
+    Args:
+        directory (str): where the register files are written
+        paths: a sequence of expressions to glob M-layer JSON files
+
+    """
+    entries = { entity_type: [] for entity_type in _files }
+    for path in paths:
+        for f_json in glob.glob(path):
+            for entity in iter_entities(f_json):
+                entity_type = entity['__entry__']
+                if entity_type not in entries:
+                    raise RuntimeError(
+                       "unknown type: {}".format(entity_type)
+                    )
+                entries[entity_type].append(entity)
+
+    os.makedirs(directory,exist_ok=True)
+    for entity_type,(name,file_name,cls) in _files.items():
+        cls.write(
+            os.path.join(directory,file_name),
+            entries[entity_type]
+        )
+
+# ---------------------------------------------------------------------------
+def mapped_registers(directory):
+    """
+    Return a mapping of :class:`~context.Context` attribute 
+    names to the registers for the files in ``directory``
+    
+    Args:
+        directory (str): where the register files are kept
+        
+    The mapping can be passed as keyword arguments to 
+    :class:`~context.Context`.
+
+    """
+    return {
+        name: cls( os.path.join(directory,file_name) )
+            for name,file_name,cls in _files.values()
+    }
+
+# ---------------------------------------------------------------------------
+def mapped_context(directory,no_aspect_uid=None):
+    """
+    Return a :class:`~context.Context` that uses register files
+
+    Args:
+        directory (str): where the register files are kept
+        no_aspect_uid (:class:`~uid.UID`, optional): the
+            UID of the `no aspect` entry
+
+    """
+    from m_layer.context import Context, global_context
+
+    cxt = Context( **mapped_registers(directory) )
+
+    if no_aspect_uid is None:
+        no_aspect_uid = global_context.no_aspect_uid
+    cxt.no_aspect_uid = no_aspect_uid
+
+    return cxt
@@ -17,6 +17,7 @@ import re
 from m_layer import si_constants
 from m_layer import math_constants
 from m_layer import ml_math 
+from m_layer.affine import affine_form
 
 ml_dict = dict(
     __builtins__= {},   # to improve security using eval
@@ -40,32 +41,154 @@ re_mixed_ratio = re.compile(
     r'$'
 )
 
-def ml_eval(txt,d={}):
+# ---------------------------------------------------------------------------
+# Many register entries share the same function text, e.g., "lambda x: x".
+# So, each distinct function text (with its parameter names) is compiled 
+# once, as the body of a factory function that takes the parameters as  
+# arguments. An instance is then obtained by calling the factory with 
+# parameter values, which are bound in a closure. All instances share
+# the compiled code and the global namespace `ml_dict`.
+#
+class _Template(object):
+
+    __slots__ = ('factory','count')
+    
+    def __init__(self,txt,names):
+        self.factory = eval( 
+            "lambda {}: ({})".format( ",".join(names), txt ), 
+            ml_dict 
+        )
+        self.count = 0 
+        
+_templates = {}
+
+# Functions of an affine form are not compiled, 
+# but are counted in the same way
+_affine_counts = {}
+
+# Objects evaluated without parameters are immutable,
+# so they can be shared
+_values = {}
+
+def ml_eval(txt,d=None):
     """
     Return a Python object evaluated from ``txt``
     
+    Args:
+        txt (str): the text to evaluate
+        d (dict, optional): parameters used by ``txt``
+        
     """
-    # Unfortunately, during the construction of a lambda function 
-    # only global scope can be seen inside the function body.
-    # So, if there are parameters to the function,
-    # it is necessary to update the dictionary here each time. 
-    if len(d):
-        d.update(ml_dict)
-    else:
-        d = ml_dict
-       
-
+    if d:
+        return ml_bind(txt,d)
+        
+    try:
+        return _values[txt]
+    except KeyError:
+        pass
+        
     # Regular expressions handle the various formats that `txt` may take:
-    txt = txt.strip()
+    _txt = txt.strip()
     
-    token = re_int_ratio.search(txt)
+    token = re_int_ratio.search(_txt)
     if token is not None:
-        txt = "ml_math.Fraction( {} )".format( token.group() )
+        _txt = "ml_math.Fraction( {} )".format( token.group() )
         
     else:         
-        token = re_mixed_ratio.search(txt)
+        token = re_mixed_ratio.search(_txt)
         if token is not None:
             num, den = token.group().split('/')
-            txt = "ml_math.Fraction( {}, {} )".format( int(float(num)), int(float(den)) )      
+            _txt = "ml_math.Fraction( {}, {} )".format( int(float(num)), int(float(den)) )      
      
-    return eval(txt,d)
+    _values[txt] = value = eval(_txt,ml_dict)
+    return value 
+
+def ml_bind(txt,parameters):
+    """
+    Return a function evaluated from ``txt`` with ``parameters``
+    
+    The text is compiled once for all functions that  
+    have the same text and parameter names.
+    
+    Args:
+        txt (str): the function text, e.g., "lambda x: ml_math.ratio_convert(x,a)"
+        parameters (dict): parameter names and values, e.g., ``{'a': 1000}``
+        
+    """
+    names = tuple( sorted(parameters) )
+    key = (txt,names)
+    try:
+        template = _templates[key]
+    except KeyError:
+        template = _templates[key] = _Template(txt.strip(),names)
+        
+        if not names:
+            # One instance can be shared
+            template.factory = template.factory()
+            
+    template.count += 1 
+    
+    if names:
+        return template.factory(**parameters)
+    else:
+        return template.factory
+    
+def templates():
+    """
+    Return a mapping of function templates 
+    to the number of instances obtained from each
+    
+    The keys are pairs of function text and parameter names.
+    Functions recognised as affine, which are held as 
+    :class:`~affine.Affine` objects rather than compiled, 
+    are included. 
+    
+    """
+    counts = { 
+        key : template.count 
+            for key,template in _templates.items() 
+    }
+    for key,count in _affine_counts.items():
+        counts[key] = counts.get(key,0) + count
+        
+    return counts
+ 
+def ml_parameters(parameters):
+    """
+    Return a dict of Python objects evaluated from the 
+    string values in ``parameters``
+    
+    Parameter values are stored as strings in register entries,
+    e.g., ``{ "a": "1", "b": "+273.15" }``, and may take the 
+    form of arithmetic expressions, e.g., ``{ "c": "si.h*si.c/si.e/si.nano" }``.
+    
+    """
+    return { 
+        k : ml_eval(v) 
+            for (k,v) in parameters.items() 
+    }
+
+def ml_function(entry,parameters=None):
+    """
+    Return a Python function evaluated from the ``function`` 
+    and ``parameters`` of a register entry 
+    
+    An :class:`~affine.Affine` object is returned for 
+    functions of a recognised affine form. 
+    
+    Args:
+        entry: an M-layer record for a transformation
+        parameters (dict, optional): evaluated function parameters
+        
+    """
+    if parameters is None:
+        parameters = ml_parameters( entry['parameters'] )
+        
+    # Conversions of a known form are held as coefficients
+    fn = affine_form( entry['function'], parameters )
+    if fn is not None:
+        key = ( entry['function'], tuple( sorted(parameters) ) )
+        _affine_counts[key] = _affine_counts.get(key,0) + 1
+        return fn 
+        
+    return ml_bind( entry['function'], parameters )
@@ -6,8 +6,11 @@ __all__ = (
     'bounded_convert',
     'interval_convert',
     'ratio_convert',
+    'coefficient',
     'Fraction',
 )
+import sys
+
 # The environment used by ml_eval needs Fraction available 
 from fractions import Fraction
 
@@ -27,6 +30,48 @@ try:
 except ImportError:
     import math
 
+# Tokens may be NumPy arrays, when NumPy is available.
+# An array is transformed in one vectorised operation.
+# NumPy is slow to import, so it is only imported when needed.
+_numpy = False
+
+def numpy_module():
+    """
+    Return the NumPy module, or ``None`` if NumPy is not installed
+    
+    NumPy is imported when this is first called.
+    """
+    global _numpy
+    if _numpy is False:
+        try:
+            import numpy as _numpy
+        except ImportError:
+            _numpy = None
+    return _numpy
+
+def is_array(x):
+    """
+    ``True`` when ``x`` is a NumPy array
+    """
+    # There can be no array unless the application 
+    # has already imported NumPy 
+    numpy = sys.modules.get('numpy')
+    return numpy is not None and isinstance(x,numpy.ndarray)
+
+# ---------------------------------------------------------------------------
+def coefficient(a,x):
+    """
+    Return the coefficient ``a`` in a form suitable for operations with ``x``
+    
+    A ``Fraction`` is converted to ``float`` when ``x`` is an array, 
+    otherwise NumPy would create an array of Python objects.  
+    
+    """
+    if is_array(x) and isinstance(a,Fraction):
+        return float(a)
+    else:
+        return a 
+
 # ---------------------------------------------------------------------------
 def bounded_convert(x,a,y_lb,y_ub):
     """
@@ -46,6 +91,11 @@ def bounded_convert(x,a,y_lb,y_ub):
         Untested assumptions are that ``y_ub - y_lb > 0`` and ``a > 0``
     
     """
+    if is_array(x):
+        numpy = sys.modules['numpy']
+        z = numpy.fmod(coefficient(a,x)*x - y_lb, y_ub - y_lb) 
+        return numpy.where(z < 0.0, z + y_ub, z + y_lb)
+        
     z = math.fmod(a*x - y_lb, y_ub - y_lb) 
     return z + y_ub if z < 0.0 else z + y_lb  
  
@@ -67,6 +117,9 @@ def interval_convert(x,a,b):
         An untested assumption is that ``a > 0``
 
     """
+    if is_array(x):
+        return coefficient(a,x)*x + coefficient(b,x)
+
     return a*x + b
    
 # ---------------------------------------------------------------------------
@@ -86,4 +139,7 @@ def ratio_convert(x,a):
         An untested assumption is that ``a > 0``
 
     """
+    if is_array(x):
+        return coefficient(a,x)*x
+        
     return a*x
\ No newline at end of file
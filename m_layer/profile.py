@@ -0,0 +1,287 @@
+"""
+A profile selects the part of the M-layer register that an application needs.
+
+A :class:`Profile` is declared with the aspects, unit systems and scales
+of interest. The register entries needed to use these are found by
+following cross-references in the JSON records:
+
+    * an aspect brings in the scales that it is paired with in
+      aspect-specific conversions and in casts (an aspect that 
+      has neither, like length, must be declared with some scales)
+    * a unit system brings in the scales for its references
+    * a scale brings in the other scales it can be converted to
+    * a scale brings in its reference, a reference brings in its
+      unit system and a unit system brings in its basis references
+
+Conversion, casting and aspect-specific conversion entries are
+selected when the scales and aspects at both ends are selected.
+The `no aspect` entry is always selected. For example, ::
+
+    cxt = Context()
+    cxt.load_profile(
+        Profile('ml_thermodynamic_temperature','ml_energy'),
+        _json_paths
+    )
+
+The environment variable ``M_LAYER_PROFILE`` may be set to a
+comma-separated list of names, to load a profile in the global context.
+
+"""
+import glob
+
+from m_layer.uid import UID
+from m_layer.json_reader import iter_entities
+
+__all__ = (
+    'Profile',
+    'Selection',
+)
+
+NO_ASPECT = 'ml_no_aspect'
+
+# ---------------------------------------------------------------------------
+class Selection(object):
+
+    """
+    The sets of UIDs selected from a register by a :class:`Profile`
+
+    ``entity in selection`` is ``True`` when the JSON record
+    ``entity`` should be loaded.
+    """
+
+    __slots__ = ('references','scales','aspects','systems')
+
+    def __init__(self,references,scales,aspects,systems):
+        self.references = frozenset(references)
+        self.scales = frozenset(scales)
+        self.aspects = frozenset(aspects)
+        self.systems = frozenset(systems)
+
+    def __contains__(self,entity):
+        entity_type = entity['__entry__']
+
+        if entity_type == "Reference":
+            return UID( entity['uid'] ) in self.references
+        elif entity_type == "Scale":
+            return UID( entity['uid'] ) in self.scales
+        elif entity_type == "Aspect":
+            return UID( entity['uid'] ) in self.aspects
+        elif entity_type == "UnitSystem":
+            return UID( entity['uid'] ) in self.systems
+        elif entity_type == "Conversion":
+            return (
+                UID( entity['src'] ) in self.scales
+            and
+                UID( entity['dst'] ) in self.scales
+            )
+        elif entity_type == "Cast":
+            return all(
+                UID( s ) in self.scales and UID( a ) in self.aspects
+                    for s,a in ( entity['src'], entity['dst'] )
+            )
+        elif entity_type == "ScalesForAspect":
+            return (
+                UID( entity['aspect'] ) in self.aspects
+            and
+                UID( entity['src'] ) in self.scales
+            and
+                UID( entity['dst'] ) in self.scales
+            )
+        else:
+            raise RuntimeError(
+               "unknown type: {}".format(entity_type)
+            )
+
+# ---------------------------------------------------------------------------
+class _Index(object):
+
+    # The cross-references between register entries,
+    # which are much smaller than the entries themselves
+
+    def __init__(self):
+        self.names = {}                 # UID name -> (type, UID)
+        self.scale_reference = {}       # scale -> reference
+        self.reference_system = {}      # reference -> system
+        self.system_basis = {}          # system -> basis references
+        self.conversions = []           # scale pairs
+        self.casts = []                 # (scale, aspect) pairs
+        self.scales_for = []            # (aspect, scale, scale)
+
+    def add(self,entity):
+        entity_type = entity['__entry__']
+
+        if entity_type in ("Reference","Scale","Aspect","UnitSystem"):
+            uid = UID( entity['uid'] )
+            self.names[uid.name] = (entity_type,uid)
+
+        if entity_type == "Reference":
+            if 'system' in entity:
+                self.reference_system[uid] = UID( entity['system']['uid'] )
+        elif entity_type == "Scale":
+            self.scale_reference[uid] = UID( entity['reference'] )
+        elif entity_type == "UnitSystem":
+            self.system_basis[uid] = [ UID(r_i) for r_i in entity['basis'] ]
+        elif entity_type == "Conversion":
+            self.conversions.append(
+                ( UID( entity['src'] ), UID( entity['dst'] ) )
+            )
+        elif entity_type == "Cast":
+            self.casts.append( tuple(
+                ( UID(s), UID(a) ) for s,a in ( entity['src'], entity['dst'] )
+            ) )
+        elif entity_type == "ScalesForAspect":
+            self.scales_for.append( (
+                UID( entity['aspect'] ),
+                UID( entity['src'] ),
+                UID( entity['dst'] )
+            ) )
+
+# ---------------------------------------------------------------------------
+class Profile(object):
+
+    """
+    A ``Profile`` declares the aspects, unit systems and scales needed
+
+    Args:
+        *items: UIDs, or UID names, of aspects, unit systems or scales
+
+    """
+
+    def __init__(self,*items):
+        self._items = tuple(
+            UID(i) if isinstance(i,(list,tuple)) else i
+                for i in items
+        )
+
+    @property
+    def items(self):
+        "The aspects, unit systems and scales declared"
+        return self._items
+
+    def __repr__(self):
+        return "Profile{!r}".format(self._items)
+
+    def select(self,paths):
+        """
+        Return the :class:`Selection` of register entries for this profile
+
+        Args:
+            paths: a sequence of expressions to glob M-layer JSON files
+
+        """
+        return self.selection(
+            entity
+                for path in paths
+                    for f_json in glob.glob(path)
+                        for entity in iter_entities(f_json)
+        )
+
+    def selection(self,entities):
+        """
+        Return the :class:`Selection` of register entries for this profile
+
+        Args:
+            entities: an iterable of M-layer JSON records, 
+                or register records
+
+        ``RuntimeError`` is raised if an item is not in the register, 
+        or if no scales can be selected for it. 
+        
+        """
+        index = _Index()
+        for entity in entities:
+            index.add(entity)
+
+        scales, aspects, systems = set(), set(), set()
+
+        if NO_ASPECT in index.names:
+            aspects.add( index.names[NO_ASPECT][1] )
+
+        for item in self._items:
+            name = item.name if isinstance(item,UID) else item
+            try:
+                entity_type, uid = index.names[name]
+            except KeyError:
+                raise RuntimeError(
+                    "not in the register: {!r}".format(item)
+                )
+            if isinstance(item,UID) and item != uid:
+                raise RuntimeError(
+                    "not in the register: {!r}".format(item)
+                )
+
+            if entity_type == "Scale":
+                scales.add(uid)
+            elif entity_type == "Aspect":
+                aspects.add(uid)
+            elif entity_type == "UnitSystem":
+                systems.add(uid)
+            else:
+                raise RuntimeError(
+                    "a profile needs aspects, systems or scales: {!r}".format(item)
+                )
+
+        requested = set(aspects)
+        requested.discard( index.names.get(NO_ASPECT,(None,None))[1] )
+
+        # The items that have brought in scales 
+        found = set(scales)
+        declared = bool(scales) or bool(systems)
+        
+        # Scales paired with the aspects
+        for aspect,src,dst in index.scales_for:
+            if aspect in requested:
+                scales.add(src)
+                scales.add(dst)
+                found.add(aspect)
+
+        for ends in index.casts:
+            if any( a in requested for s,a in ends ):
+                for s,a in ends:
+                    if a in aspects: 
+                        scales.add(s)
+                        found.add(a)
+
+        # Scales for the references of the unit systems
+        for scale,reference in index.scale_reference.items():
+            system = index.reference_system.get(reference)
+            if system in systems:
+                scales.add(scale)
+                found.add(system)
+
+        # An aspect only brings in scales through aspect-specific  
+        # conversions and casts, so it may not bring in any. That 
+        # is an error, unless the profile also declares scales or
+        # unit systems.
+        for item in self._items:
+            name = item.name if isinstance(item,UID) else item
+            entity_type, uid = index.names[name]
+            if not (
+                uid in found or ( entity_type == "Aspect" and declared )
+            ):
+                raise RuntimeError(
+                    "no scales are selected for {!r}, "
+                    "add scales or a unit system to the profile".format(item)
+                )
+
+        # Scales that may be converted to the selected scales
+        changed = True
+        while changed:
+            changed = False
+            for src,dst in index.conversions:
+                if (src in scales) != (dst in scales):
+                    scales.update( (src,dst) )
+                    changed = True
+
+        references = set(
+            index.scale_reference[s]
+                for s in scales if s in index.scale_reference
+        )
+        systems.update(
+            index.reference_system[r]
+                for r in references if r in index.reference_system
+        )
+        for system in systems:
+            references.update( index.system_basis.get(system,()) )
+
+        return Selection(references,scales,aspects,systems)
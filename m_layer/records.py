@@ -0,0 +1,381 @@
+"""
+The entries for references, scales, aspects and unit systems are parsed
+once, when they are added to a register, into typed records. The fields
+used by the library are then read as attributes: UIDs are interned
+:class:`~uid.UID` objects, dimensional exponents are tuples and
+prefixes are ``Fraction`` objects.
+
+A record only keeps the parsed fields, and any fields that the library 
+does not use (e.g., ``UCUM``). It can still be used like the JSON entry 
+it was made from, e.g., ``record['locale']`` or ``'system' in record``: 
+the JSON values are rebuilt from the fields when they are requested. 
+A record compares equal to an entry with the same content.
+
+"""
+from ast import literal_eval
+from fractions import Fraction
+
+from m_layer.uid import UID
+
+__all__ = (
+    'Record',
+    'ReferenceRecord',
+    'ScaleRecord',
+    'AspectRecord',
+    'SystemRecord',
+    'UnitSystemTerm',
+    'record',
+)
+
+def _uid_json(uid):
+    return [uid.name,uid.uuid]
+    
+# ---------------------------------------------------------------------------
+class Record(object):
+
+    """
+    A register entry with its UID parsed
+
+    Args:
+        entry (dict): the JSON entry
+
+    Fields in ``_fields`` are parsed by the record class, 
+    other fields are kept as they are. 
+    
+    """
+
+    __slots__ = ('_uid','_other')
+    
+    _fields = ('uid',)
+    _entry_type = None
+
+    def __init__(self,entry):
+        self._uid = UID( entry['uid'] )
+        self._other = {
+            k: v for k,v in entry.items() if k not in self._fields
+        } or None
+
+    @property
+    def uid(self):
+        "The M-layer identifier"
+        return self._uid
+
+    @property
+    def entry(self):
+        "A JSON entry with the content of the record"
+        return { k: self[k] for k in self.keys() }
+
+    def _json(self,key):
+        # The JSON value of a parsed field, or None when it is absent
+        if key == '__entry__':
+            return self._entry_type
+        else:
+            return _uid_json(self._uid)
+        
+    def _state(self):
+        # The parsed fields and the other fields, for comparison 
+        return (self._uid,self._other)
+        
+    def __getitem__(self,key):
+        if key in self._fields:
+            value = self._json(key)
+            if value is not None:
+                return value
+        elif self._other is not None and key in self._other:
+            return self._other[key]
+            
+        raise KeyError(key)
+
+    def __contains__(self,key):
+        try:
+            self[key]
+            return True
+        except KeyError:
+            return False
+
+    def get(self,key,default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        keys = [ k for k in self._fields if self._json(k) is not None ]
+        if self._other is not None:
+            keys.extend( self._other )
+        return keys
+
+    def __eq__(self,other):
+        if isinstance(other,dict):
+            try:
+                other = record(other)
+            except (KeyError,TypeError,ValueError,SyntaxError):
+                return False
+        elif not isinstance(other,Record):
+            return NotImplemented
+            
+        return (
+            type(self) is type(other) 
+        and 
+            self._state() == other._state()
+        )
+
+    def __ne__(self,other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+        
+    __hash__ = None
+
+    def __repr__(self):
+        return "{}({!r})".format(self.__class__.__name__,self.entry)
+
+# ---------------------------------------------------------------------------
+def _locale(entry):
+    # Map each locale to a (name, symbol) pair
+    return {
+        k: ( v.get('name'), v.get('symbol') )
+            for k,v in entry['locale'].items()
+    }
+
+def _locale_json(locale):
+    return {
+        k: { 
+            tag: v for tag,v in zip( ('name','symbol'), pair ) 
+                if v is not None 
+        }
+            for k,pair in locale.items()
+    }
+
+# ---------------------------------------------------------------------------
+class UnitSystemTerm(object):
+
+    """
+    The part of a reference entry that relates it to a unit system
+
+    The JSON prefix is a pair of string-formatted integers, for the
+    numerator and denominator, and the dimensions are a string-formatted
+    list of exponents.
+    """
+
+    __slots__ = ('_system_uid','_dimensions','_prefix')
+
+    def __init__(self,json_sys):
+        self._system_uid = UID( json_sys['uid'] )
+        self._dimensions = tuple( literal_eval( json_sys['dimensions'] ) )
+        self._prefix = Fraction( *(
+            int( literal_eval(i) ) for i in json_sys['prefix']
+        ) )
+
+    @property
+    def system_uid(self):
+        "The UID of the unit system"
+        return self._system_uid
+
+    @property
+    def dimensions(self):
+        "The tuple of dimensional exponents"
+        return self._dimensions
+
+    @property
+    def prefix(self):
+        "The prefix, as a ``Fraction``"
+        return self._prefix
+
+    def key(self):
+        """
+        Return the tuple of system UID, dimensions and prefix
+        """
+        return (self._system_uid,self._dimensions,self._prefix)
+
+    def json(self):
+        "Return the JSON form of the term"
+        return {
+            'uid': _uid_json(self._system_uid),
+            'dimensions': str( list(self._dimensions) ),
+            'prefix': [ 
+                str(self._prefix.numerator), 
+                str(self._prefix.denominator) 
+            ],
+        }
+
+# ---------------------------------------------------------------------------
+class ReferenceRecord(Record):
+
+    """
+    The entry for a reference
+    """
+
+    __slots__ = ('_locale','_system')
+
+    _fields = ('__entry__','uid','locale','system')
+    _entry_type = 'Reference'
+
+    def __init__(self,entry):
+        Record.__init__(self,entry)
+        self._locale = _locale(entry)
+        self._system = UnitSystemTerm( entry['system'] ) if (
+            'system' in entry
+        ) else None
+
+    @property
+    def symbol(self):
+        "The default symbol"
+        return self._locale['default'][1]
+
+    @property
+    def system(self):
+        "The :class:`UnitSystemTerm`, or ``None``"
+        return self._system
+
+    def text(self,locale,short=False):
+        """
+        Return the name, or symbol when ``short`` is ``True``, for ``locale``
+        """
+        return self._locale[locale][1 if short else 0]
+
+    def _json(self,key):
+        if key == 'locale':
+            return _locale_json(self._locale)
+        elif key == 'system':
+            return None if self._system is None else self._system.json()
+        else:
+            return Record._json(self,key)
+
+    def _state(self):
+        return Record._state(self) + (
+            self._locale,
+            None if self._system is None else self._system.key()
+        )
+
+# ---------------------------------------------------------------------------
+class ScaleRecord(Record):
+
+    """
+    The entry for a scale
+    """
+
+    __slots__ = ('_reference','_scale_type','_systematic')
+
+    _fields = ('__entry__','uid','reference','scale_type','systematic')
+    _entry_type = 'Scale'
+
+    def __init__(self,entry):
+        Record.__init__(self,entry)
+        self._reference = UID( entry['reference'] )
+        self._scale_type = entry['scale_type']
+        self._systematic = 'systematic' in entry
+
+    @property
+    def reference(self):
+        "The UID of the reference"
+        return self._reference
+
+    @property
+    def scale_type(self):
+        "The type of scale, e.g., 'ratio'"
+        return self._scale_type
+
+    @property
+    def systematic(self):
+        "``True`` for a systematically named scale"
+        return self._systematic
+
+    def _json(self,key):
+        if key == 'reference':
+            return _uid_json(self._reference)
+        elif key == 'scale_type':
+            return self._scale_type
+        elif key == 'systematic':
+            return 1 if self._systematic else None
+        else:
+            return Record._json(self,key)
+
+    def _state(self):
+        return Record._state(self) + (
+            self._reference,self._scale_type,self._systematic
+        )
+
+# ---------------------------------------------------------------------------
+class AspectRecord(Record):
+
+    """
+    The entry for an aspect
+    """
+
+    __slots__ = ('_locale',)
+
+    _fields = ('__entry__','uid','locale')
+    _entry_type = 'Aspect'
+
+    def __init__(self,entry):
+        Record.__init__(self,entry)
+        self._locale = _locale(entry)
+
+    text = ReferenceRecord.text
+
+    def _json(self,key):
+        if key == 'locale':
+            return _locale_json(self._locale)
+        else:
+            return Record._json(self,key)
+
+    def _state(self):
+        return Record._state(self) + (self._locale,)
+
+# ---------------------------------------------------------------------------
+class SystemRecord(Record):
+
+    """
+    The entry for a unit system
+    """
+
+    __slots__ = ('_name','_basis')
+
+    _fields = ('__entry__','uid','name','basis')
+    _entry_type = 'UnitSystem'
+
+    def __init__(self,entry):
+        Record.__init__(self,entry)
+        self._name = entry['name']
+        self._basis = tuple( UID(r_i) for r_i in entry['basis'] )
+
+    @property
+    def name(self):
+        "The name of the system"
+        return self._name
+
+    @property
+    def basis(self):
+        "The tuple of reference UIDs for the base units"
+        return self._basis
+
+    def _json(self,key):
+        if key == 'name':
+            return self._name
+        elif key == 'basis':
+            return [ _uid_json(r_i) for r_i in self._basis ]
+        else:
+            return Record._json(self,key)
+
+    def _state(self):
+        return Record._state(self) + (self._name,self._basis)
+
+# ---------------------------------------------------------------------------
+_record_types = {
+    "Reference": ReferenceRecord,
+    "Scale": ScaleRecord,
+    "Aspect": AspectRecord,
+    "UnitSystem": SystemRecord,
+}
+
+def record(entry):
+    """
+    Return a record for the JSON ``entry``
+
+    ``entry`` is returned unchanged if it is already a :class:`Record`.
+
+    """
+    if isinstance(entry,Record):
+        return entry
+    else:
+        return _record_types.get(entry['__entry__'],Record)(entry)
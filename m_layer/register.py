@@ -1,7 +1,9 @@
 # !!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!!! 
-from ast import literal_eval 
+from collections import OrderedDict
 
 from m_layer.uid import UID
+from m_layer.ml_eval import ml_function
+from m_layer.records import record
 
 # ---------------------------------------------------------------------------
 class Register(object):
@@ -17,6 +19,15 @@ class Register(object):
     def __getitem__(self,uid):
         return self._objects[ uid ]
         
+    def __contains__(self,uid):
+        return uid in self._objects 
+        
+    def items(self):
+        """
+        Return an iterable of UID and entry pairs
+        """
+        return self._objects.items()
+        
     def get(self,uid,default=None):
         """
         """
@@ -33,15 +44,448 @@ class Register(object):
             # assert False
             # uid = tuple( literal_eval(entry['uid']) )
         # else:
-        # Encapsulate the JSON uid
+        # The JSON entry is parsed into a record
         
-        uid = UID( entry['uid'] )
+        entry = record(entry)
+        uid = entry.uid
         
         if uid in self._objects:
             raise RuntimeError(
                 "existing register entry: {}".format(uid)
             )
         else:
-            self._objects[uid] = entry 
-                          
-                
\ No newline at end of file
+            self._objects[uid] = entry
+
+# ---------------------------------------------------------------------------
+class LazyFunction(object):
+
+    """
+    A transformation function that is compiled from its 
+    M-layer record when it is first needed
+    """
+    
+    __slots__ = ( '_entry', '_parameters', '_function' )
+    
+    def __init__(self,entry,parameters=None):
+        self._entry = entry 
+        self._parameters = parameters
+        
+    @property 
+    def entry(self):
+        "The M-layer record"
+        return self._entry 
+        
+    @property 
+    def function(self):
+        "The Python function"
+        try:
+            return self._function
+        except AttributeError:
+            self._function = ml_function(self._entry,self._parameters)
+            # Evaluated parameters are no longer needed
+            self._parameters = None
+            return self._function
+            
+    @property 
+    def compiled(self):
+        "``True`` when the function has been compiled"
+        return hasattr(self,'_function')
+        
+    def __repr__(self):
+        return "LazyFunction({!r})".format( self._entry['function'] )
+        
+    def __reduce__(self):
+        # A compiled function is not pickled, it is compiled again 
+        return ( LazyFunction, ( self._entry, self._parameters ) )
+        
+# ---------------------------------------------------------------------------
+class FunctionTable(object):
+
+    """
+    A ``FunctionTable`` maps keys to transformation functions. 
+    
+    Register records are held until a function is requested,  
+    then the function is compiled and retained. 
+    """
+    
+    def __init__(self):
+        self._functions = {}
+        
+    def __contains__(self,key):
+        return key in self._functions 
+        
+    def __len__(self):
+        return len(self._functions)
+        
+    def __iter__(self):
+        return iter(self._functions)
+        
+    def keys(self):
+        return self._functions.keys()
+        
+    def __getitem__(self,key):
+        return self._functions[key].function
+        
+    def get(self,key,default=None):
+        """
+        Return the function for ``key``, or ``default``
+        
+        """
+        try:
+            return self._functions[key].function
+        except KeyError:
+            return default
+            
+    def lazy(self,key):
+        """
+        Return the :class:`LazyFunction` for ``key``
+        
+        """
+        return self._functions[key]
+            
+    def set(self,key,entry,parameters=None):
+        """
+        Record a transformation function 
+        
+        Args:
+            key: the table key
+            entry: the M-layer record for the transformation
+            parameters (dict, optional): evaluated function parameters
+            
+        """
+        self._functions[key] = LazyFunction(entry,parameters)
+        
+    def validate(self):
+        """
+        Compile every function in the table
+        
+        Returns:
+            a list of (key, exception) pairs for 
+            functions that could not be compiled
+            
+        """
+        errors = []
+        for key,fn in self._functions.items():
+            try:
+                fn.function
+            except Exception as e:
+                errors.append( (key,e) )
+                
+        return errors
+
+# ---------------------------------------------------------------------------
+class AspectFunctions(object):
+
+    """
+    The conversion functions for one aspect in a register that  
+    is indexed by (aspect, scale pair) keys and provides a 
+    ``scale_pairs`` method. 
+    
+    This behaves like the mapping of scale pairs to functions
+    held for each aspect by a 
+    :class:`~scales_for_aspect_register.ScalesForAspectRegister`.
+    """
+    
+    __slots__ = ('_register','_aspect')
+
+    def __init__(self,register,aspect):
+        self._register = register
+        self._aspect = aspect
+
+    def __contains__(self,scale_uid_pair):
+        return (self._aspect,scale_uid_pair) in self._register
+
+    def __getitem__(self,scale_uid_pair):
+        return self._register[ (self._aspect,scale_uid_pair) ]
+
+    def get(self,scale_uid_pair,default=None):
+        return self._register.get( (self._aspect,scale_uid_pair), default )
+
+    def lazy(self,scale_uid_pair):
+        return self._register.lazy( (self._aspect,scale_uid_pair) )
+
+    def keys(self):
+        return self._register.scale_pairs(self._aspect)
+
+    def __iter__(self):
+        return iter( self.keys() )
+
+# ---------------------------------------------------------------------------
+# The registers below hold their entries in a table indexed by a sequence 
+# of UIDs, like an SQLite database or a memory-mapped register file. 
+# A table provides `get(uids)`, `contains(uids)`, `keys(uids=())` and 
+# `count()`. The subclasses for each kind of storage set `_table`, and 
+# `_cache`, which holds the entries that have been used. 
+#
+class LRUCache(object):
+
+    """
+    A mapping that holds no more than ``size`` items, 
+    discarding the least recently used. There is no 
+    limit when ``size`` is ``None``.
+    """
+
+    __slots__ = ('_size','_items')
+
+    def __init__(self,size=None):
+        self._size = size
+        self._items = OrderedDict()
+
+    def __len__(self):
+        return len(self._items)
+
+    def get(self,key):
+        try:
+            self._items.move_to_end(key)
+        except KeyError:
+            return None
+        return self._items[key]
+
+    def put(self,key,value):
+        self._items[key] = value
+        if self._size is not None and len(self._items) > self._size:
+            self._items.popitem(last=False)
+
+# ---------------------------------------------------------------------------
+class TableRegister(object):
+
+    """
+    Common behaviour of registers of references, 
+    scales, aspects or unit systems that are held in a table
+    """
+
+    _n = 1
+
+    @staticmethod
+    def _entry_uids(entry):
+        return ( UID( entry['uid'] ), )
+
+    def __getitem__(self,uid):
+        entry = self.get(uid)
+        if entry is None:
+            raise KeyError(uid)
+        return entry
+
+    def __contains__(self,uid):
+        return self._cache.get(uid) is not None or self._table.contains( 
+            (uid,) 
+        )
+
+    def __len__(self):
+        return self._table.count()
+
+    def get(self,uid,default=None):
+        """
+        Return the entry for ``uid``, or ``default``
+        """
+        entry = self._cache.get(uid)
+        if entry is None:
+            entry = self._table.get( (uid,) )
+            if entry is None:
+                return default
+            entry = record(entry)
+            self._cache.put(uid,entry)
+
+        return entry
+
+    def items(self):
+        """
+        Return an iterable of UID and entry pairs
+        """
+        for (uid,) in self._table.keys():
+            yield uid, self[uid]
+
+# ---------------------------------------------------------------------------
+class TableFunctionRegister(object):
+
+    """
+    Common behaviour of registers that map a key 
+    to a transformation function held in a table
+    """
+
+    _n = None
+
+    def _key(self,uids):
+        # The key used by the in-memory register
+        raise NotImplementedError
+
+    def _uids(self,key):
+        # The sequence of UIDs stored in the table for `key`
+        raise NotImplementedError
+
+    @staticmethod
+    def _entry_uids(entry):
+        raise NotImplementedError
+
+    def __contains__(self,key):
+        return self._cache.get(key) is not None or self._table.contains(
+            self._uids(key)
+        )
+
+    def __getitem__(self,key):
+        return self.lazy(key).function
+
+    def __len__(self):
+        return self._table.count()
+
+    def keys(self):
+        for uids in self._table.keys():
+            yield self._key(uids)
+
+    __iter__ = keys
+
+    def get(self,key,default=None):
+        """
+        Return the function for ``key``, or ``default``
+        """
+        try:
+            return self.lazy(key).function
+        except KeyError:
+            return default
+
+    def lazy(self,key):
+        """
+        Return the :class:`LazyFunction` for ``key``
+        """
+        fn = self._cache.get(key)
+        if fn is None:
+            entry = self._table.get( self._uids(key) )
+            if entry is None:
+                raise KeyError(key)
+            fn = LazyFunction(entry)
+            self._cache.put(key,fn)
+
+        return fn
+
+    def validate(self):
+        """
+        Compile all the functions in the register
+
+        Returns:
+            a list of (key, exception) pairs for
+            functions that could not be compiled
+
+        """
+        errors = []
+        for key in self.keys():
+            try:
+                # Functions are not cached here
+                LazyFunction( self._table.get( self._uids(key) ) ).function
+            except Exception as e:
+                errors.append( (key,e) )
+
+        return errors
+
+# ---------------------------------------------------------------------------
+class TableConversionRegister(TableFunctionRegister):
+
+    """
+    Conversion functions held in a table, indexed by a pair of scales
+    """
+
+    _n = 2
+
+    def _key(self,uids):
+        return uids
+
+    def _uids(self,uid_pair):
+        return uid_pair
+
+    @staticmethod
+    def _entry_uids(entry):
+        return ( UID( entry['src'] ), UID( entry['dst'] ) )
+
+# ---------------------------------------------------------------------------
+class TableCastingRegister(TableFunctionRegister):
+
+    """
+    Casting functions held in a table, indexed by a pair of scale-aspects
+    """
+
+    _n = 4
+
+    def _key(self,uids):
+        return ( uids[:2], uids[2:] )
+
+    def _uids(self,uid_pair):
+        return uid_pair[0] + uid_pair[1]
+
+    @staticmethod
+    def _entry_uids(entry):
+        return (
+            tuple( UID(i) for i in entry['src'] )
+        +   tuple( UID(i) for i in entry['dst'] )
+        )
+
+# ---------------------------------------------------------------------------
+class TableScalesForAspectRegister(TableFunctionRegister):
+
+    """
+    Conversion functions held in a table, 
+    indexed by an aspect and a pair of scales
+    """
+
+    _n = 3
+
+    def _key(self,uids):
+        return ( uids[0], uids[1:] )
+
+    def _uids(self,key):
+        if isinstance(key,UID):
+            # Just the aspect
+            return (key,)
+        else:
+            return (key[0],) + key[1]
+
+    @staticmethod
+    def _entry_uids(entry):
+        return (
+            UID( entry['aspect'] ), UID( entry['src'] ), UID( entry['dst'] )
+        )
+
+    def __contains__(self,key):
+        # `key` may be an aspect or an (aspect, scale pair)
+        if isinstance(key,UID):
+            return self._table.contains( (key,) )
+        else:
+            return TableFunctionRegister.__contains__(self,key)
+
+    def __getitem__(self,key):
+        # `key` may be an aspect or an (aspect, scale pair)
+        if isinstance(key,UID):
+            if key not in self:
+                raise KeyError(key)
+            return AspectFunctions(self,key)
+        else:
+            return TableFunctionRegister.__getitem__(self,key)
+
+    def get(self,key,default=None):
+        """
+        Return a mapping of scale-pairs to conversion functions
+        for an aspect, or a function for an (aspect, scale pair)
+
+        """
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def scale_pairs(self,aspect):
+        """
+        Return an iterable of the scale pairs registered for ``aspect``
+        """
+        for uids in self._table.keys( (aspect,) ):
+            yield uids[1:]
+
+    def get_fn(self,aspect,scale_uid_pair,default=None):
+        """
+        Return a conversion function
+
+        Args:
+            aspect: an aspect UID
+            scale_uid_pair: a pair of M-layer scale uids
+
+        """
+        return TableFunctionRegister.get(
+            self, (aspect,scale_uid_pair), default
+        )
@@ -4,8 +4,8 @@ Conversions can be declared for specific aspects. The
 these records.
 
 """
-from m_layer.ml_eval import ml_eval 
 from m_layer.uid import UID
+from m_layer.register import FunctionTable
 
 # ---------------------------------------------------------------------------
 class ScalesForAspectRegister(object):
@@ -20,7 +20,8 @@ class ScalesForAspectRegister(object):
         
         # Table indexed by aspect with entries that are 
         # mapping scale-pairs to conversion functions
-        # (same format as conversion_register entries)
+        # (same format as conversion_register entries).
+        # Functions are compiled when they are first requested.
         
         self._table = {}
  
@@ -53,13 +54,29 @@ class ScalesForAspectRegister(object):
             
         """        
         return self._table.get( aspect, {} ).get( scale_uid_pair, default ) 
+        
+    def validate(self):
+        """
+        Compile all conversion functions
+        
+        Returns:
+            a list of ((aspect, scale_uid_pair), exception) pairs 
+            for functions that could not be compiled
+            
+        """
+        return [
+            ( (aspect,key), e )
+                for aspect,table in self._table.items()
+                    for key,e in table.validate()
+        ]
                 
-    def set(self,entry):
+    def set(self,entry,parameters=None):
         # keys: aspect, src, dst, factors
+        # `parameters` may hold already evaluated function parameters
         uid_aspect = UID( entry['aspect'] )
 
         if uid_aspect not in self._table:
-            self._table[uid_aspect] = {}
+            self._table[uid_aspect] = FunctionTable()
                     
         uid_ml_ref_src = UID( entry['src'] )        
         uid_ml_ref_dst = UID( entry['dst'] )
@@ -68,11 +85,15 @@ class ScalesForAspectRegister(object):
         self._set_conversion_fn(
             entry,
             self._table[uid_aspect],
-            scale_uid_pair
+            scale_uid_pair,
+            parameters
         )
+        
+        # The context may already have resolved a generic conversion
+        self._context._discard_resolved(uid_aspect,scale_uid_pair)
        
     # ---------------------------------------------------------------------------
-    def _set_conversion_fn(self,entry,_tbl, uid_pair):
+    def _set_conversion_fn(self,entry,_tbl,uid_pair,parameters=None):
         """
         Utility function to take one JSON entry for conversion between scales 
         and enter it into a mapping, indexed by the pair of ML scale uids
@@ -89,15 +110,5 @@ class ScalesForAspectRegister(object):
         src_type = _scales[ uid_pair[0] ]['scale_type']
         dst_type = _scales[ uid_pair[1] ]['scale_type']
 
-        # Parameter values are stored as strings in a dictionary
-        # E.g., { "a": "1", "b": "+273.15" }
-        # They may take the form of arithmetic expressions
-        # E.g., { "c": "si.h*si.c/si.e/si.nano" }
-        parameters_dict = { 
-            k : ml_eval(v) 
-                for (k,v) in entry['parameters'].items() 
-        }
-                
-        # Set the casting function
-        _tbl[uid_pair] = ml_eval(entry['function'],parameters_dict)
-                                   
\ No newline at end of file
+        # The function is compiled when it is first requested
+        _tbl.set(uid_pair,entry,parameters)
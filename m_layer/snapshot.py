@@ -0,0 +1,347 @@
+"""
+A snapshot is a binary image of the M-layer records held in JSON files.
+
+Reading the JSON files and evaluating the parameters of the transformation
+functions takes time. A snapshot holds the populated registers, with the 
+parsed records and evaluated parameters, and the index of systematic 
+scale dimensions, so a :class:`~context.Context` can be restored with 
+a single read.
+
+Snapshots are identified by a hash of the content of the JSON files,
+so a new snapshot is created automatically when the register changes.
+The content is only hashed when the names, sizes or modification 
+times of the files have changed since the snapshot was last used.
+
+The environment variable ``M_LAYER_SNAPSHOT=0`` disables snapshots
+and ``M_LAYER_CACHE_DIR`` selects the directory where they are kept.
+Older snapshots are removed when a new one is written. Snapshots are 
+not used when the directory, or a snapshot file, could be changed by 
+another user.
+
+"""
+import glob
+import hashlib
+import json
+import os
+import pickle
+import stat
+
+from m_layer.json_reader import read_records
+from m_layer.register import Register
+from m_layer.conversion_register import ConversionRegister
+from m_layer.casting_register import CastingRegister
+from m_layer.scales_for_aspect_register import ScalesForAspectRegister
+
+__all__ = (
+    'enabled',
+    'cache_dir',
+    'content_hash',
+    'load_context',
+)
+
+# Change this when the layout of snapshot data changes
+FORMAT = 3
+
+_here = os.path.dirname(__file__)
+
+# Parameter values are evaluated using definitions in these modules,
+# and the registers are defined in others, so a change to 
+# them must also invalidate a snapshot
+_sources = tuple(
+    os.path.join(_here,f_i)
+        for f_i in (
+            'ml_eval.py','ml_math.py','si_constants.py','math_constants.py',
+            'uid.py','records.py','register.py','affine.py',
+            'conversion_register.py','casting_register.py',
+            'scales_for_aspect_register.py',
+        )
+)
+
+# The registers of a context that are held in a snapshot
+_registers = (
+    ('reference_reg', Register),
+    ('scale_reg', Register),
+    ('aspect_reg', Register),
+    ('system_reg', Register),
+    ('conversion_reg', ConversionRegister),
+    ('casting_reg', CastingRegister),
+    ('scales_for_aspect_reg', ScalesForAspectRegister),
+)
+
+# ---------------------------------------------------------------------------
+def enabled():
+    """
+    ``True`` unless the environment variable
+    ``M_LAYER_SNAPSHOT`` is set to '0'
+
+    """
+    return os.environ.get('M_LAYER_SNAPSHOT','1') != '0'
+
+# ---------------------------------------------------------------------------
+def cache_dir():
+    """
+    Return the directory where snapshot files are kept
+
+    This is ``M_LAYER_CACHE_DIR``, when it is set, otherwise
+    ``m_layer`` in the user's cache directory.
+
+    """
+    path = os.environ.get('M_LAYER_CACHE_DIR')
+    if path: return path
+
+    root = os.environ.get('XDG_CACHE_HOME') or os.path.join(
+        os.path.expanduser('~'), '.cache'
+    )
+    return os.path.join(root,'m_layer')
+
+# ---------------------------------------------------------------------------
+def _json_files(paths):
+    # The glob order is retained, so that records are restored
+    # in the order they would be loaded from the JSON files
+    return [
+        f_json
+            for path in paths
+                for f_json in glob.glob(path)
+    ]
+
+# ---------------------------------------------------------------------------
+def content_hash(paths):
+    """
+    Return a hexadecimal digest of the JSON files matching ``paths``
+
+    Args:
+        paths: a sequence of expressions to glob M-layer JSON files
+
+    """
+    h = hashlib.sha256()
+    h.update( "m_layer snapshot {}".format(FORMAT).encode() )
+
+    for f_i in _sources + tuple( sorted( _json_files(paths) ) ):
+        # Include the parent directory, because
+        # file names are repeated in different folders
+        name = os.path.join(
+            os.path.basename( os.path.dirname(f_i) ),
+            os.path.basename(f_i)
+        )
+        h.update( name.encode() )
+        with open(f_i,'rb') as f:
+            h.update( f.read() )
+
+    return h.hexdigest()
+
+def _stamp(files):
+    # A digest of the names, sizes and modification times of 
+    # the files, which is much faster to find than `content_hash` 
+    h = hashlib.sha256()
+    h.update( "m_layer snapshot {}".format(FORMAT).encode() )
+
+    for f_i in _sources + tuple( sorted(files) ):
+        st = os.stat(f_i)
+        h.update( "{}|{}|{}\n".format(
+            os.path.abspath(f_i), st.st_size, st.st_mtime_ns
+        ).encode() )
+
+    return h.hexdigest()
+
+# ---------------------------------------------------------------------------
+def _register_state(reg):
+    # The content of a register, without its reference to the context
+    return { k: v for k,v in vars(reg).items() if k != '_context' }
+
+def _trusted(path):
+    # Only files and directories that belong to this user, and that 
+    # other users cannot write to, are trusted. Unpickling data 
+    # written by someone else could execute arbitrary code.
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+        
+    getuid = getattr(os,'getuid',None)
+    if getuid is not None and st.st_uid != getuid():
+        return False
+        
+    return not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+def _restorable(context):
+    # Only empty in-memory registers can be restored from a snapshot
+    for name,cls in _registers:
+        reg = getattr(context,name)
+        if type(reg) is not cls:
+            return False
+        if any( len(v) for v in _register_state(reg).values() ):
+            return False
+            
+    return True 
+
+# ---------------------------------------------------------------------------
+def _read_json(paths):
+    # Return a list of (entity, parameters) pairs
+    records = []
+    for f_json in _json_files(paths):
+        try:
+            records.extend( read_records(f_json) )
+        except json.decoder.JSONDecodeError as e:
+            # Report errors but do not stop execution
+            print("json.decoder.JSONDecodeError",e, 'in:',f_json)
+
+    return records
+
+# ---------------------------------------------------------------------------
+def _read_snapshot(file_path,digest):
+    # A missing, stale or unreadable snapshot is simply rebuilt
+    if not _trusted(file_path):
+        return None
+        
+    try:
+        with open(file_path,'rb') as f:
+            data = pickle.load(f)
+    except Exception:
+        return None
+
+    if isinstance(data,dict) and data.get('hash') == digest:
+        return data
+    else:
+        return None
+
+# ---------------------------------------------------------------------------
+def _read_digest(stamp_path):
+    # The content hash recorded for a stamp, or `None` 
+    if not _trusted(stamp_path):
+        return None
+        
+    try:
+        with open(stamp_path,'rb') as f:
+            return f.read().decode('ascii')
+    except (OSError,UnicodeDecodeError):
+        return None
+        
+# ---------------------------------------------------------------------------
+def _write_snapshot(file_path,data):
+    # Write to a temporary file first, so that concurrent
+    # processes never see a partially written snapshot.
+    # Failure is not an error, the snapshot is only a cache.
+    import tempfile 
+    
+    if not isinstance(data,bytes):
+        data = pickle.dumps(data,protocol=pickle.HIGHEST_PROTOCOL)
+        
+    directory = os.path.dirname(file_path)
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=directory,suffix='.tmp')
+        try:
+            with os.fdopen(fd,'wb') as f:
+                f.write(data)
+            os.replace(tmp_path,file_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    except OSError:
+        pass
+
+# ---------------------------------------------------------------------------
+def _prune(directory,keep):
+    # Remove the snapshots and stamps, other than those in `keep`, 
+    # that were made for earlier versions of the files
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return
+        
+    for name in names:
+        if name in keep: continue
+        if (
+            name.startswith('register-') and name.endswith('.pickle')
+        or
+            name.startswith('stamp-')
+        ):
+            try:
+                os.remove( os.path.join(directory,name) )
+            except OSError:
+                pass
+        
+# ---------------------------------------------------------------------------
+def load_context(context,paths,directory=None):
+    """
+    Load M-layer records into ``context``
+
+    The registers are restored from a snapshot of the JSON files
+    matching ``paths``. The snapshot is created if necessary.
+
+    Args:
+        context (:class:`~context.Context`): the context to load
+        paths: a sequence of expressions to glob M-layer JSON files
+        directory (str, optional): where snapshot files are kept
+
+    Returns:
+        the path to the snapshot file, or ``None`` 
+        
+    Only the empty in-memory registers of a new context can be 
+    restored. Otherwise, or when ``directory`` can be written 
+    by other users, the JSON files are read and ``None`` is returned.
+
+    """
+    if directory is None: directory = cache_dir()
+    
+    if _restorable(context):
+        try:
+            os.makedirs(directory,mode=0o700,exist_ok=True)
+        except OSError:
+            pass
+            
+    if not ( _restorable(context) and _trusted(directory) ):
+        for entity,parameters in _read_json(paths):
+            context._load_entity(entity,parameters)
+        return None
+
+    # The content is hashed again only when a file has changed
+    stamp_path = os.path.join(
+        directory,
+        "stamp-{}".format( _stamp( _json_files(paths) )[:32] )
+    )
+    stamped = digest = _read_digest(stamp_path)
+    data = None if digest is None else _read_snapshot( 
+        _snapshot_path(directory,digest), digest 
+    )
+    
+    if data is None:
+        digest = content_hash(paths)
+        data = _read_snapshot( _snapshot_path(directory,digest), digest )
+        
+    file_path = _snapshot_path(directory,digest)
+    
+    if data is None:
+        for entity,parameters in _read_json(paths):
+            context._load_entity(entity,parameters)
+
+        data = dict(
+            hash = digest,
+            registers = { 
+                name: _register_state( getattr(context,name) )
+                    for name,_ in _registers
+            },
+            dimensions = context.systematic_dimensions()
+        )
+        _write_snapshot(file_path,data)
+
+    else:
+        for name,state in data['registers'].items():
+            vars( getattr(context,name) ).update(state)
+
+        context._systematic_dimensions = data['dimensions']
+        context._discard_paths()
+
+    if digest != stamped:
+        _write_snapshot(stamp_path,digest.encode('ascii'))
+        _prune( 
+            directory, 
+            { os.path.basename(file_path), os.path.basename(stamp_path) } 
+        )
+        
+    return file_path
+    
+def _snapshot_path(directory,digest):
+    return os.path.join(
+        directory,
+        "register-{}.pickle".format(digest[:32])
+    )
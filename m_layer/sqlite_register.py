@@ -0,0 +1,325 @@
+"""
+Registers that keep M-layer records in an SQLite database file.
+
+These classes have the same interface as the in-memory registers, so
+they can be passed to a :class:`~context.Context` when it is created.
+Records stay in the database and only the most recently used ones are
+held in memory, which allows very large registers to be used without
+loading them into every process. For example, ::
+
+    store = SQLiteStore('register.db')
+    cxt = Context(
+        scale_reg = SQLiteRegister(store,'scale'),
+        conversion_reg = SQLiteConversionRegister(store),
+    )
+    cxt.load( 'json/scales/*.json' )
+    cxt.load( 'json/conversion/*.json' )
+    store.commit()
+
+"""
+import json
+import sqlite3
+
+from m_layer.uid import UID
+from m_layer.register import (
+    LRUCache, TableRegister, TableConversionRegister, 
+    TableCastingRegister, TableScalesForAspectRegister
+)
+
+__all__ = (
+    'SQLiteStore',
+    'SQLiteRegister',
+    'SQLiteConversionRegister',
+    'SQLiteCastingRegister',
+    'SQLiteScalesForAspectRegister',
+)
+
+# ---------------------------------------------------------------------------
+class SQLiteStore(object):
+
+    """
+    An SQLite database that holds register tables
+    """
+
+    def __init__(self,path=':memory:'):
+        self._connection = sqlite3.connect(path)
+
+    @property
+    def connection(self):
+        return self._connection
+
+    def commit(self):
+        "Save new entries in the database"
+        self._connection.commit()
+
+    def close(self):
+        self._connection.close()
+
+# ---------------------------------------------------------------------------
+class _UIDTable(object):
+
+    # An SQLite table of JSON entries indexed by a sequence of `n` UIDs.
+    # A UID is stored as a name and a 16-byte UUID.
+
+    def __init__(self,store,name,n):
+        self._db = store.connection
+        self._name = name
+        self._n = n
+
+        columns = ", ".join(
+            "name{0} TEXT NOT NULL, uuid{0} BLOB NOT NULL".format(i)
+                for i in range(n)
+        )
+        key = ", ".join( "uuid{0}, name{0}".format(i) for i in range(n) )
+
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS {} ({}, entry TEXT NOT NULL)".format(
+                name,columns
+            )
+        )
+        self._db.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS {0}_uid ON {0} ({1})".format(
+                name,key
+            )
+        )
+
+        self._where = [
+            " AND ".join(
+                "uuid{0}=? AND name{0}=?".format(i) for i in range(m)
+            )
+                for m in range(n+1)
+        ]
+        self._select = "SELECT {} FROM {}".format(
+            ", ".join( "name{0}, uuid{0}".format(i) for i in range(n) ),
+            name
+        )
+        self._insert = "INSERT INTO {} VALUES ({}, ?)".format(
+            name, ", ".join( "?" for i in range(2*n) )
+        )
+
+    @staticmethod
+    def _values(uids):
+        values = []
+        for uid in uids:
+            values.append( uid.uuid.to_bytes(16,'big') )
+            values.append( uid.name )
+        return values
+
+    def get(self,uids):
+        row = self._db.execute(
+            "SELECT entry FROM {} WHERE {}".format(
+                self._name,self._where[self._n]
+            ),
+            self._values(uids)
+        ).fetchone()
+        return None if row is None else json.loads( row[0] )
+
+    def contains(self,uids):
+        # `uids` may be the first elements of a key
+        return self._db.execute(
+            "SELECT 1 FROM {} WHERE {} LIMIT 1".format(
+                self._name,self._where[ len(uids) ]
+            ),
+            self._values(uids)
+        ).fetchone() is not None
+
+    def insert(self,uids,entry):
+        values = []
+        for uid in uids:
+            values.append( uid.name )
+            values.append( uid.uuid.to_bytes(16,'big') )
+        values.append( json.dumps(entry) )
+        try:
+            self._db.execute(self._insert,values)
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def keys(self,uids=()):
+        # All keys, or those beginning with `uids`
+        if uids:
+            cursor = self._db.execute(
+                "{} WHERE {}".format(self._select,self._where[ len(uids) ]),
+                self._values(uids)
+            )
+        else:
+            cursor = self._db.execute(self._select)
+
+        for row in cursor:
+            yield tuple(
+                UID( (row[2*i], int.from_bytes(row[2*i+1],'big')) )
+                    for i in range(self._n)
+            )
+
+    def count(self):
+        return self._db.execute(
+            "SELECT COUNT(*) FROM {}".format(self._name)
+        ).fetchone()[0]
+
+# ---------------------------------------------------------------------------
+class SQLiteRegister(TableRegister):
+
+    """
+    An SQLite alternative to :class:`~register.Register`
+
+    Args:
+        store (:class:`SQLiteStore`): the database
+        table (str): the name of the database table, e.g., 'scale'
+        context (:class:`~context.Context`, optional)
+        cache_size (int): the number of entries held in memory
+
+    """
+
+    def __init__(self,store,table,context=None,cache_size=1024):
+        self._context = context
+        self._table = _UIDTable(store,table,self._n)
+        self._cache = LRUCache(cache_size)
+
+    def set(self,entry):
+        """
+        Add an entry to the register
+        """
+        uids = self._entry_uids(entry)
+
+        if not self._table.insert( uids, entry ):
+            raise RuntimeError(
+                "existing register entry: {}".format(uids[0])
+            )
+
+# ---------------------------------------------------------------------------
+class _SQLiteFunctions(object):
+
+    # Common behaviour of SQLite registers of transformation functions
+
+    def __init__(self,store,table,context=None,cache_size=1024):
+        self._context = context
+        self._table = _UIDTable(store,table,self._n)
+        self._cache = LRUCache(cache_size)
+
+    def _check_scales(self,uid_pair):
+        # Raise KeyError if the scales are unknown
+        if self._context is not None:
+            _scales = self._context.scale_reg
+            _scales[ uid_pair[0] ]
+            _scales[ uid_pair[1] ]
+
+# ---------------------------------------------------------------------------
+class SQLiteConversionRegister(_SQLiteFunctions,TableConversionRegister):
+
+    """
+    An SQLite alternative to :class:`~conversion_register.ConversionRegister`
+
+    Args:
+        store (:class:`SQLiteStore`): the database
+        table (str): the name of the database table
+        context (:class:`~context.Context`, optional)
+        cache_size (int): the number of functions held in memory
+
+    """
+
+    def __init__(self,store,table='conversion',context=None,cache_size=1024):
+        _SQLiteFunctions.__init__(self,store,table,context,cache_size)
+
+    def set(self,entry,parameters=None):
+        """
+        Create an entry for a conversion function
+
+        Args:
+            entry: the M-layer record for a conversion
+            parameters: ignored, parameters are
+                evaluated when the function is compiled
+
+        """
+        uid_pair = self._entry_uids(entry)
+
+        self._check_scales(uid_pair)
+
+        if not self._table.insert(uid_pair,entry):
+            raise RuntimeError(
+                "existing conversion entry: {}".format(uid_pair)
+            )
+
+        # The context may have composed a longer conversion
+        if self._context is not None:
+            self._context._discard_paths()
+
+# ---------------------------------------------------------------------------
+class SQLiteCastingRegister(_SQLiteFunctions,TableCastingRegister):
+
+    """
+    An SQLite alternative to :class:`~casting_register.CastingRegister`
+
+    Args:
+        store (:class:`SQLiteStore`): the database
+        table (str): the name of the database table
+        context (:class:`~context.Context`, optional)
+        cache_size (int): the number of functions held in memory
+
+    """
+
+    def __init__(self,store,table='cast',context=None,cache_size=1024):
+        _SQLiteFunctions.__init__(self,store,table,context,cache_size)
+
+    def set(self,entry,parameters=None):
+        """
+        Create an entry for a casting function
+
+        Args:
+            entry: the M-layer record for a casting
+            parameters: ignored, parameters are
+                evaluated when the function is compiled
+
+        """
+        uids = self._entry_uids(entry)
+
+        if not self._table.insert(uids,entry):
+            raise RuntimeError(
+                "existing cast entry: {}".format( self._key(uids) )
+            )
+
+# ---------------------------------------------------------------------------
+class SQLiteScalesForAspectRegister(
+    _SQLiteFunctions,TableScalesForAspectRegister
+):
+
+    """
+    An SQLite alternative to
+    :class:`~scales_for_aspect_register.ScalesForAspectRegister`
+
+    Args:
+        store (:class:`SQLiteStore`): the database
+        table (str): the name of the database table
+        context (:class:`~context.Context`, optional)
+        cache_size (int): the number of functions held in memory
+
+    The functions in this register are indexed by
+    an aspect and a pair of scales.
+
+    """
+
+    def __init__(self,store,table='scales_for_aspect',context=None,cache_size=1024):
+        _SQLiteFunctions.__init__(self,store,table,context,cache_size)
+
+    def set(self,entry,parameters=None):
+        """
+        Create an entry for a conversion function
+
+        Args:
+            entry: the M-layer record for a conversion
+            parameters: ignored, parameters are
+                evaluated when the function is compiled
+
+        """
+        uids = self._entry_uids(entry)
+        uid_aspect, scale_uid_pair = self._key(uids)
+
+        self._check_scales(scale_uid_pair)
+
+        if not self._table.insert(uids,entry):
+            raise RuntimeError(
+                "existing conversion entry: {}".format(scale_uid_pair)
+            )
+
+        # The context may already have resolved a generic conversion
+        if self._context is not None:
+            self._context._discard_resolved(uid_aspect,scale_uid_pair)
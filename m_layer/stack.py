@@ -1,6 +1,7 @@
 """
 """
 import numbers
+import weakref
 from fractions import Fraction 
 
 from collections import ChainMap
@@ -131,6 +132,10 @@ def normal_form(rpn):
         
     """
     assert isinstance(rpn,Stack), repr(rpn)
+    
+    # The result is found once for each stack, then retained
+    if rpn._pops is not None:
+        return rpn._pops
         
     stk = []    
     for o_i in rpn._obj:
@@ -165,8 +170,24 @@ def normal_form(rpn):
     assert len(stk) == 1,\
         "residual stack elements: {!r}".format(stk)
     
-    return stk.pop() 
+    rpn._pops = stk.pop() 
+    return rpn._pops
         
+# ---------------------------------------------------------------------------
+# Stack cells are hash-consed: a cell is identified by the cell below it 
+# and its element, so stacks with the same elements are the same object.
+# Numbers and operations are identified by value, other objects 
+# (e.g., Scale) by identity, because different objects with the same 
+# M-layer UID may have different roles in an expression.
+#
+_cells = weakref.WeakValueDictionary()
+
+def _cell_key(below,top):
+    if isinstance(top,(str,numbers.Integral)):
+        return (id(below),top)
+    else:
+        return (id(below),None,id(top))
+
 # ---------------------------------------------------------------------------
 class Stack(object):
 
@@ -174,16 +195,61 @@ class Stack(object):
     A Stack holds numbers and tokens for simple arithmetic operations.
     Operations like `mul, `div`, etc., return a new Stack object.
     
+    A Stack is immutable. Each element is held in a cell that refers 
+    to the Stack below it, so a new Stack shares the cells of the 
+    Stack it was made from and pushing one element does not copy.
+    Stacks with the same elements are the same object, so they share
+    the result of :func:`normal_form`.
+    
     """
     
-    def __init__(self,obj=list()):  
-        if isinstance(obj,list):
-            self._obj = obj
+    __slots__ = ('_top','_below','_len','_tuple','_pops','__weakref__')
+    
+    def __new__(cls,obj=()):  
+        if isinstance(obj,(list,tuple)):
+            return _empty._append(obj)
         else:
             assert False
+            
+    def __reduce__(self):
+        return ( Stack, ( list(self._obj), ) )
+            
+    @classmethod
+    def _cell(cls,below,top):
+        key = _cell_key(below,top)
+        try:
+            return _cells[key]
+        except KeyError:
+            pass
+            
+        stk = object.__new__(cls)
+        stk._top = top 
+        stk._below = below
+        stk._len = below._len + 1
+        stk._tuple = None 
+        stk._pops = None
+        
+        _cells[key] = stk
+        return stk
+        
+    @property 
+    def _obj(self):
+        # The elements, bottom first, as a tuple. 
+        # This is found once, then retained.
+        if self._tuple is None:
+            tops = []
+            stk = self
+            while stk._tuple is None:
+                tops.append(stk._top)
+                stk = stk._below
+            tops.reverse()
+            self._tuple = stk._tuple + tuple(tops)
+            
+        return self._tuple
               
     def copy(self):
-        return Stack( self._obj.copy() )
+        # A Stack is immutable
+        return self
 
     def _render_str(self):
 
@@ -229,19 +295,25 @@ class Stack(object):
         return stk.pop() 
 
     def __len__(self):
-        return len(self._obj)
+        return self._len
         
     def __getitem__(self,i):
         return self._obj[i]
         
+    def __iter__(self):
+        return iter(self._obj)
+        
     def __str__(self):
         return self._render_str()
         
     def __repr__(self):
-        return "Stack({!r})".format(self._obj)
+        return "Stack({!r})".format( list(self._obj) )
 
     def _append(self,obj):
-        return Stack(self._obj + list(obj))
+        stk = self
+        for o_i in obj:
+            stk = Stack._cell(stk,o_i)
+        return stk 
         
     def push(self,x):
         """
@@ -252,29 +324,36 @@ class Stack(object):
         are used to extend the current stack. 
         
         """
-        
         if hasattr(x,'stack'):
-            return self._append( x.stack._obj )     
+            x = x.stack 
             
-        elif isinstance(x,Stack):
-            return self._append( x._obj )
-        
+        if isinstance(x,Stack):
+            # The cells of `x` can be shared when this stack is empty 
+            return x if self._len == 0 else self._append( x._obj )
         else:
-            return self._append([x])
+            return Stack._cell(self,x)
         
     def rmul(self):       
-        return self._append(['rmul'])
+        return Stack._cell(self,'rmul')
         
     def mul(self):
-        return self._append(['mul'])
+        return Stack._cell(self,'mul')
  
     def div(self):
-        return self._append(['div'])
+        return Stack._cell(self,'div')
             
     def pow(self):
-        return self._append(['pow'])
+        return Stack._cell(self,'pow')
  
   
+# The bottom of every stack 
+_empty = object.__new__(Stack)
+_empty._top = None 
+_empty._below = None 
+_empty._len = 0
+_empty._tuple = ()
+_empty._pops = None 
+
 # ===========================================================================
 if __name__ == '__main__':
 
@@ -1,4 +1,5 @@
 import json
+import weakref
 from collections import defaultdict
 from fractions import Fraction
 
@@ -15,41 +16,77 @@ __all__ = (
 #
 fmt_key = lambda k: "[{0[0]}, {0[1]}]".format(k)
 
+def _sort_key(k):
+    # The uid key for a Scale or Aspect is a UID,
+    # for a ScaleAspect it is a pair of UIDs 
+    if isinstance(k,UID):
+        return k._m_layer_uuid
+    else:
+        return tuple( k_i._m_layer_uuid for k_i in k )
+
+def _term_key(term):
+    # Terms are (uid, role, exponent) triplets, and 
+    # the role may be `None` or a string 
+    uid, role, exp = term
+    return ( _sort_key(uid), role is not None, role or '', exp )
+
 # ---------------------------------------------------------------------------
 # Encapsulate the format of M-layer UIDs
 # So this becomes a point of adaptation.
 #
 class UID(object):
 
-    __slots__ = ('_m_layer_uuid',)
+    __slots__ = ('_m_layer_uuid','_hash','__weakref__')
     
     """
     M = UID( [
         'ml_imp_pound_ratio', 
         188380796861507506602975683857494523991
     ] )
+    
+    UIDs are interned: there is only one object for each 
+    identifier, so equality is normally an identity check. 
+    A UID is discarded when it is no longer used. 
     """
     
-    def __init__(self,uid):
-        if isinstance(uid,self.__class__):
-            self._m_layer_uuid = uid._m_layer_uuid
+    _interned = weakref.WeakValueDictionary()
+    
+    def __new__(cls,uid):
+        if isinstance(uid,UID):
+            return uid
         elif isinstance(uid,tuple):
-            self._m_layer_uuid = uid
+            key = uid
         elif isinstance(uid,list):
-            self._m_layer_uuid = tuple(uid)
+            key = tuple(uid)
         else:
             assert False, repr(uid)
+            
+        try:
+            return cls._interned[key]
+        except KeyError:
+            pass
+            
+        self = object.__new__(cls)
+        self._m_layer_uuid = key
+        self._hash = hash(key)
+        return cls._interned.setdefault(key,self)
+
+    def __reduce__(self):
+        return ( UID, ( self._m_layer_uuid, ) )
 
     def __hash__(self):
-        return hash( self._m_layer_uuid )
+        return self._hash
         
     def __eq__(self,other):
-        return (
-            isinstance(other,self.__class__)
+        return self is other or (
+            isinstance(other,UID)
         and
             self._m_layer_uuid == other._m_layer_uuid
         )
         
+    def __ne__(self,other):
+        return not self.__eq__(other)
+        
     @property 
     def name(self):
         return self._m_layer_uuid[0]
@@ -74,7 +111,7 @@ class UID(object):
 # ---------------------------------------------------------------------------
 class CompoundUID(object):
 
-    __slots__ = ('prefactor','factors','_stack')
+    __slots__ = ('prefactor','factors','_stack','_canonical','_hash')
 
     def __init__(self,stack):
     
@@ -100,6 +137,20 @@ class CompoundUID(object):
             k : frozenset(v) 
                 for k,v in factors.items()
         }
+        
+        # The canonical form keeps every term, with its role, 
+        # so objects with the same M-layer UID are not merged.
+        # It does not depend on the order of terms in the 
+        # expression, so neither does the hash.
+        self._canonical = tuple( sorted( 
+            ( 
+                ( k.uid, getattr(k,'role',None), v ) 
+                    for k,v in pops.factors.items() 
+                        if v != 0 
+            ),
+            key = _term_key
+        ) )
+        self._hash = hash( (self._canonical,self.prefactor) )
 
     def __contains__(self,item):
         return item in self.factors 
@@ -108,20 +159,25 @@ class CompoundUID(object):
         return (
             isinstance(other,self.__class__)
         and
-            # Mappings are equal if they have the same 
-            # key-value pairs regardless of ordering
-            # The frozenset values compare equal 
-            # by membership, not ordering of elements.
-            self.factors == other.factors
+            # The canonical forms are sorted, so the 
+            # order of terms in the expressions is irrelevant 
+            self._canonical == other._canonical
         and
             self.prefactor == other.prefactor
         )
 
     def __hash__(self):
-        return hash( (
-            tuple( self.factors.items() ),
-            self.prefactor
-        ) )
+        return self._hash
+        
+    @property 
+    def canonical(self):
+        """
+        The terms as a sorted tuple of (uid, role, exponent) triplets
+        
+        Each object in the expression is a separate term, so 
+        objects with the same uid and different roles are distinct.
+        """
+        return self._canonical 
  
     def __str__(self):
         factors = ", ".join(
@@ -133,7 +133,7 @@ setup(
     setup_requires=sphinx + pytest_runner,
     tests_require=tests_require,
     install_requires=install_requires,
-    extras_require={'tests': tests_require},
+    extras_require={'tests': tests_require, 'numpy': ['numpy']},
     cmdclass={'docs': BuildDocs, 'apidocs': ApiDocs},
     packages=find_packages( include=('m_layer*',) ),
     include_package_data=True,
@@ -0,0 +1,77 @@
+import unittest
+
+from fractions import Fraction
+
+from m_layer.affine import *
+from m_layer.ml_eval import ml_function, ml_eval, ml_bind, ml_parameters
+from m_layer.context import global_context as cxt 
+
+#----------------------------------------------------------------------------
+class TestAffine(unittest.TestCase):
+
+    def test_forms(self):
+        entry = lambda f,**p: dict( function=f, parameters=p )
+        
+        fn = ml_function( entry("lambda x: ml_math.ratio_convert(x,a)",a="1/1000") )
+        self.assertEqual( Affine( ml_eval("1/1000") ), fn )
+        self.assertEqual( ml_eval("1/1000")*0.5, fn(0.5) )
+        
+        fn = ml_function( entry("lambda x: ml_math.interval_convert(x,a,b)",a="1",b="-273.15") )
+        self.assertEqual( Affine(1,-273.15), fn )
+        self.assertEqual( 300.0*1 - 273.15, fn(300.0) )
+        
+        fn = ml_function( entry("lambda x: x") )
+        self.assertTrue( fn.is_identity )
+        self.assertTrue( fn is ml_function( entry("lambda x:  x") ) )
+        
+        self.assertEqual( Affine(None,2), ml_function( entry("lambda x: x + b",b="2") ) )
+        self.assertEqual( Affine(3), ml_function( entry("lambda x: a*x",a="3") ) )
+        
+        # Other functions are opaque 
+        fn = ml_function( entry("lambda x: c/x",c="2") )
+        self.assertFalse( isinstance(fn,Affine) )
+        self.assertEqual( 0.5, fn(4) )
+        
+        fn = ml_function( 
+            entry("lambda x: ml_math.bounded_convert(x,a,y_lb,y_ub)",a="1",y_lb="0",y_ub="360") 
+        )
+        self.assertFalse( isinstance(fn,Affine) )
+        
+        self.assertTrue( affine_form("lambda x: a*x",dict(a=1,b=2)) is None )
+        
+    def test_register(self):
+        # Conversions in the register have the same values as before 
+        for uid_pair in cxt.conversion_reg.keys():
+            entry = cxt.conversion_reg._table.lazy(uid_pair).entry
+            fn = cxt.conversion_reg[uid_pair]
+            if "".join( entry['function'].split() ) in (
+                "lambdax:ml_math.ratio_convert(x,a)",
+                "lambdax:ml_math.interval_convert(x,a,b)",
+            ):
+                self.assertTrue( isinstance(fn,Affine) )
+                
+            opaque = ml_bind( 
+                entry['function'], ml_parameters( entry['parameters'] )
+            )
+            for x in (-3.5, 0.0, 1.0, 12.125, 1E7):
+                self.assertEqual( opaque(x), fn(x) )
+                
+    def test_fold(self):
+        f1 = Affine( Fraction(9,5), 32 )    # C to F 
+        f2 = f1.inverse()                   # F to C 
+        self.assertEqual( Affine( Fraction(5,9), Fraction(-160,9) ), f2 )
+        self.assertTrue( f1.then(f2).is_identity )
+        
+        self.assertEqual( Affine(2).then( Affine(None,1) ), Affine(2,1) )
+        self.assertEqual( Affine(None,1).then( Affine(2) ), Affine(2,2) )
+        self.assertEqual( Affine(0.5).inverse(), Affine(2.0) )
+        
+        fn = compose( [Affine(2),Affine(3,1),Affine(None,-1)] )
+        self.assertEqual( Affine(6,0), fn )
+        
+        fn = compose( [Affine(2),abs,Affine(3)] )
+        self.assertEqual( 6, fn(-1) )
+        
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()
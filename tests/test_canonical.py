@@ -0,0 +1,107 @@
+import unittest
+
+from m_layer import * 
+from m_layer.lib import no_aspect
+
+kg = Scale( ('ml_si_kilogram_ratio', 12782167041499057092439851237297548539) )
+m = Scale( ('ml_si_metre_ratio', 17771593641054934856197983478245767638) )
+nm = Scale( ("ml_si_nm_ratio", 257091757625055920788370123828667027186) )
+ft = Scale( ('ml_foot_ratio', 150280610960339969789551668292960104920) )
+s = Scale( ('ml_si_second_ratio', 276296348539283398608930897564542275037) )
+length = Aspect( ('ml_length', 993853592179723568440264076369400241) )
+mass = Aspect( ('ml_mass', 321881801928222308627062904049725548287) )
+
+#----------------------------------------------------------------------------
+class TestCanonical(unittest.TestCase):
+
+    """
+    Equivalent compound expressions compare and hash equal, 
+    regardless of the order of terms 
+    """
+    
+    def test_compound_scale(self):
+        a = kg*m**2/s**2
+        b = s**-2*m**2*kg
+        
+        self.assertEqual( a.uid, b.uid )
+        self.assertEqual( hash(a.uid), hash(b.uid) )
+        self.assertEqual( a.uid.canonical, b.uid.canonical )
+        self.assertEqual( a, b )
+        self.assertEqual( hash(a), hash(b) )
+        self.assertEqual( 1, len( set([a,b]) ) )
+        
+        self.assertNotEqual( a, kg*m/s**2 )
+        self.assertNotEqual( a, 2*b )
+        
+    def test_compound_scale_aspect(self):
+        kg_ = kg.to_scale_aspect(mass)
+        m_ = m.to_scale_aspect(length)
+        s_ = s.to_scale_aspect()
+        
+        a = kg_*m_/s_
+        b = m_/s_*kg_
+        self.assertEqual( a, b )
+        self.assertEqual( hash(a), hash(b) )
+        
+        # The aspects are part of the identity 
+        self.assertNotEqual( a, kg_*m.to_scale_aspect()/s_ )
+        
+    def test_compound_aspect(self):
+        a = length/mass
+        b = mass**-1*length
+        self.assertEqual( a, b )
+        self.assertEqual( hash(a), hash(b) )
+        
+    def test_roles(self):
+        # Terms with the same uid and different roles are not merged
+        mh = Scale( m.uid, role='h' )
+        a = m*mh
+        b = m*s/s
+        
+        self.assertNotEqual( a.uid, b.uid )
+        self.assertNotEqual( a.uid.canonical, b.uid.canonical )
+        self.assertNotEqual( a, b )
+        self.assertEqual( 2, len( set([a,b]) ) )
+        self.assertNotEqual( a, m**2 )
+        self.assertEqual( a, mh*m )
+        self.assertEqual( b, m*kg/kg )
+        
+        self.assertEqual( 
+            ( (m.uid,None,1), (m.uid,'h',1) ), 
+            a.uid.canonical 
+        )
+        
+        m_ = m.to_scale_aspect(length)
+        mh_ = mh.to_scale_aspect(length)
+        s_ = s.to_scale_aspect()
+        self.assertNotEqual( m_*mh_, m_*s_/s_ )
+        self.assertEqual( m_*mh_, mh_*m_ )
+        
+    def test_conversion(self):
+        # Terms are matched regardless of their order
+        x = expr(1.5,kg*m**2/s**2)
+        
+        y = x.convert( kg*nm**2/s**2 )
+        z = x.convert( s**-2*nm**2*kg )
+        self.assertEqual( y.token, z.token )
+        
+        x = expr(1.5,m/s)
+        y = x.convert( s**-1*ft )
+        self.assertEqual( x.convert(ft/s).token, y.token )
+        
+        # Terms that cannot be matched 
+        self.assertRaises(RuntimeError, x.convert, m/s**2 )
+        self.assertRaises(RuntimeError, x.convert, m*kg/s )
+        
+    def test_conversion_scale_aspect(self):
+        m_ = m.to_scale_aspect(length)
+        ft_ = ft.to_scale_aspect(length)
+        s_ = s.to_scale_aspect()
+        
+        x = expr(1.5,m_/s_)
+        y = x.convert( s_**-1*ft_ )
+        self.assertEqual( x.convert(ft_/s_).token, y.token )
+        
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()
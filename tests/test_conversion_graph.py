@@ -0,0 +1,115 @@
+import unittest
+
+from m_layer import * 
+from m_layer.context import Context, _json_paths, global_context
+from m_layer.conversion_graph import ConversionGraph
+from m_layer.affine import Affine
+
+#----------------------------------------------------------------------------
+class TestConversionGraph(unittest.TestCase):
+
+    """
+    Conversions may be composed from registered conversions
+    """
+    
+    def setUp(self):
+        self.cxt = Context(transitive=True)
+        for path in _json_paths:
+            self.cxt.load(path)
+        self.cxt.no_aspect_uid = global_context.no_aspect_uid
+        
+        self.names = {
+            uid.name: uid 
+                for reg in (self.cxt.scale_reg,self.cxt.aspect_reg)
+                    for uid,_ in reg.items()
+        }
+        
+    def test_path(self):
+        cxt = self.cxt 
+        n = self.names 
+        none = cxt.no_aspect_uid 
+        ft, m, nm = n['ml_foot_ratio'], n['ml_si_metre_ratio'], n['ml_si_nm_ratio']
+        
+        self.assertFalse( (ft,nm) in cxt.conversion_reg )
+        self.assertEqual( (ft,m,nm), cxt.conversion_graph.path(ft,none,nm) )
+        self.assertTrue( cxt.conversion_graph.path(nm,none,ft) is None )
+        
+        # The steps are folded into one affine conversion 
+        fn = cxt.conversion_from_scale_aspect(ft,none,nm)
+        self.assertTrue( isinstance(fn,Affine) )
+        self.assertAlmostEqual( 
+            cxt.conversion_reg[(m,nm)]( cxt.conversion_reg[(ft,m)](2.0) ), 
+            fn(2.0),
+            delta = 1E-6
+        )
+        self.assertTrue( fn is cxt.conversion_from_scale_aspect(ft,none,nm) )
+        self.assertTrue( cxt.convertible(ft,none,nm) )
+        
+        # A direct conversion is used when one is registered 
+        direct = cxt.conversion_from_scale_aspect(ft,none,m)
+        self.assertTrue( direct is cxt.conversion_reg[(ft,m)] )
+        
+        self.assertRaises(
+            RuntimeError,
+            cxt.conversion_from_scale_aspect,nm,none,ft
+        )
+        
+        # The global context does not compose conversions 
+        self.assertFalse( global_context.transitive )
+        self.assertRaises(
+            RuntimeError,
+            global_context.conversion_from_scale_aspect,ft,none,nm
+        )
+        
+    def test_aspect(self):
+        cxt = self.cxt 
+        n = self.names 
+        T = n['ml_thermodynamic_temperature']
+        K, F = n['ml_si_kelvin_ratio'], n['ml_imp_fahrenheit_interval']
+        C = n['ml_si_celsius_interval']
+        
+        # Only aspect-specific conversions connect kelvin to celsius 
+        self.assertTrue( cxt.conversion_graph.path(K,cxt.no_aspect_uid,F) is None )
+        self.assertEqual( (K,C,F), cxt.conversion_graph.path(K,T,F) )
+        self.assertEqual(
+            cxt.conversion_from_scale_aspect(C,T,F)( 
+                cxt.conversion_from_scale_aspect(K,T,C)(300.0) 
+            ),
+            cxt.conversion_from_scale_aspect(K,T,F)(300.0)
+        )
+        
+    def test_closure(self):
+        cxt = self.cxt 
+        n = self.names 
+        ft, nm = n['ml_foot_ratio'], n['ml_si_nm_ratio']
+        
+        graph = ConversionGraph(cxt)
+        closure = graph.closure(cxt.no_aspect_uid)
+        self.assertEqual( 3, len( closure[(ft,nm)] ) )
+        for (src,dst),path in closure.items():
+            self.assertEqual( path, graph.path(src,cxt.no_aspect_uid,dst) )
+            self.assertEqual( (src,dst), (path[0],path[-1]) )
+            
+    def test_new_entry(self):
+        # Registering a conversion discards composed functions
+        cxt = self.cxt 
+        n = self.names 
+        none = cxt.no_aspect_uid 
+        ft, nm = n['ml_foot_ratio'], n['ml_si_nm_ratio']
+        
+        cxt.conversion_from_scale_aspect(ft,none,nm)
+        cxt.conversion_reg.set( 
+            dict(
+                __entry__ = "Conversion",
+                src = list( ft._m_layer_uuid ),
+                dst = list( nm._m_layer_uuid ),
+                function = "lambda x: a*x",
+                parameters = dict( a="2" )
+            )
+        )
+        self.assertEqual( 2, cxt.conversion_from_scale_aspect(ft,none,nm)(1) )
+        self.assertEqual( (ft,nm), cxt.conversion_graph.path(ft,none,nm) )
+        
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+
+from m_layer import * 
+from m_layer import ml_math
+from m_layer.lib import no_aspect
+from m_layer.expression import ExpressionArray 
+
+ft = Scale( ('ml_foot_ratio', 150280610960339969789551668292960104920) )
+m = Scale( ('ml_si_metre_ratio', 17771593641054934856197983478245767638) )
+length = Aspect( ('ml_length', 993853592179723568440264076369400241) )
+
+fahrenheit = Scale( ('ml_imp_fahrenheit_interval', 22817745368296240233220712518826840767) )
+celsius = Scale( ('ml_si_celsius_interval', 245795086332095731716589481707012001072) )
+kelvin = Scale( ('ml_si_kelvin_ratio', 302952256288207449238881076502466548054) )
+temperature = Aspect( ('ml_thermodynamic_temperature', 227327310217856015944698060802418784871) )
+
+#----------------------------------------------------------------------------
+class TestConvertBatch(unittest.TestCase):
+
+    """
+    Each row gives the same result as Expression.convert 
+    """
+    
+    def _check(self,values,scales,dst,result,aspect=no_aspect):
+        self.assertTrue( isinstance(result,ExpressionArray) )
+        self.assertEqual( len(values), len(result) )
+        for v_i,s_i,y_i in zip(values,scales,result):
+            y = expr(v_i,s_i,aspect).convert(dst)
+            self.assertEqual( y.token, y_i.token )
+            self.assertEqual( y.scale_aspect, y_i.scale_aspect )
+            
+    def test_scales(self):
+        values = [1.0,2.0,3.0,4.0]
+        scales = [ft,m,m,ft]
+        
+        result = convert_batch(values,scales,m)
+        self._check(values,scales,m,result)
+        self.assertEqual( m.to_scale_aspect(), result.scale_aspect )
+        
+    def test_scale_aspects(self):
+        values = [-40.0,300.0,20.0,212.0]
+        scales = [
+            fahrenheit.to_scale_aspect(temperature),
+            kelvin.to_scale_aspect(temperature),
+            celsius.to_scale_aspect(temperature),
+            fahrenheit.to_scale_aspect(temperature),
+        ]
+        dst = celsius.to_scale_aspect(temperature)
+        self._check(values,scales,dst,convert_batch(values,scales,dst))
+        
+        # The aspect is applied to rows that are just scales 
+        scales = [fahrenheit,kelvin,celsius,fahrenheit]
+        self._check(
+            values,scales,celsius,
+            convert_batch(values,scales,celsius,temperature),
+            temperature
+        )
+        
+    def test_errors(self):
+        # Different lengths
+        self.assertRaises(RuntimeError,convert_batch,[1.0,2.0],[m],m)
+        
+        # Aspects must match the destination
+        self.assertRaises(
+            RuntimeError,
+            convert_batch, [1.0,2.0], 
+            [m.to_scale_aspect(length),m], m.to_scale_aspect(length)
+        )
+        
+        # Different aspects would be carried into the result
+        self.assertRaises(
+            RuntimeError,
+            convert_batch, [1.0,2.0], 
+            [m.to_scale_aspect(length),m], m
+        )
+        
+    def test_empty(self):
+        result = convert_batch([],[],m)
+        self.assertEqual( 0, len(result) )
+        self.assertEqual( m.to_scale_aspect(), result.scale_aspect )
+
+#----------------------------------------------------------------------------
+class TestConvertBatchBuffer(TestConvertBatch):
+
+    """
+    The same tests using ``array.array`` when NumPy is not used 
+    """
+    
+    def setUp(self):
+        self._numpy = ml_math._numpy 
+        ml_math._numpy = None 
+        
+    def tearDown(self):
+        ml_math._numpy = self._numpy
+        
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()
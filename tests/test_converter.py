@@ -0,0 +1,73 @@
+import unittest
+
+from m_layer import * 
+from m_layer.lib import no_aspect
+from m_layer.expression import Converter 
+
+fahrenheit = Scale( ('ml_imp_fahrenheit_interval', 22817745368296240233220712518826840767) )
+celsius = Scale( ('ml_si_celsius_interval', 245795086332095731716589481707012001072) )
+kelvin = Scale( ('ml_si_kelvin_ratio', 302952256288207449238881076502466548054) )
+temperature = Aspect( ('ml_thermodynamic_temperature', 227327310217856015944698060802418784871) )
+radian_ratio = Scale( ('ml_si_radian_ratio', 273301153578020696303516833405033923738) )
+degree_360 = Scale( ('ml_imp_degree_bounded_360', 125066222841962802760576607996391537405) )
+plane_angle = Aspect( ('ml_plane_angle', 95173225557230344956477808929590724690) )
+
+kg = Scale( ('ml_si_kilogram_ratio', 12782167041499057092439851237297548539) )
+m = Scale( ('ml_si_metre_ratio', 17771593641054934856197983478245767638) )
+nm = Scale( ("ml_si_nm_ratio", 257091757625055920788370123828667027186) )
+s = Scale( ('ml_si_second_ratio', 276296348539283398608930897564542275037) )
+
+#----------------------------------------------------------------------------
+class TestConverter(unittest.TestCase):
+
+    """
+    A Converter gives the same results as Expression.convert 
+    and Expression.cast
+    """
+    
+    def test_converter(self):
+        cases = [
+            (fahrenheit, celsius),
+            (kelvin.to_scale_aspect(temperature), celsius),
+            (
+                kelvin.to_scale_aspect(temperature), 
+                celsius.to_scale_aspect(temperature)
+            ),
+            (kg*m**2/s**2, kg*nm**2/s**2),
+        ]
+        for src,dst in cases:
+            c = converter(src,dst)
+            self.assertTrue( isinstance(c,Converter) )
+            for x in (-40.0,0.0,300.0):
+                y = expr(x,src).convert(dst)
+                self.assertEqual( y.token, c(x) )
+                self.assertEqual( str(y.scale_aspect), str(c.scale_aspect) )
+                self.assertEqual( c(x), c.function(x) )
+                
+                y_c = c.expression( expr(x,src) )
+                self.assertEqual( y.token, y_c.token )
+                self.assertTrue( y_c.scale_aspect is c.scale_aspect )
+                
+    def test_caster(self):
+        c = caster(radian_ratio,degree_360,plane_angle)
+        self.assertEqual( 
+            ScaleAspect(degree_360,plane_angle), 
+            c.scale_aspect 
+        )
+        for x in (-7.0,0.0,2.0,7.0):
+            y = expr(x,radian_ratio).cast(degree_360,plane_angle)
+            self.assertEqual( y.token, c(x) )
+            
+    def test_errors(self):
+        # The checks are made when the Converter is created
+        self.assertRaises(
+            RuntimeError,
+            converter,
+            kelvin.to_scale_aspect(temperature), 
+            celsius.to_scale_aspect(no_aspect)
+        )
+        self.assertRaises(RuntimeError,converter,kelvin,celsius)
+        
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+
+from m_layer import * 
+from m_layer.lib import System 
+from m_layer.dimension import Dimension, CompoundDimension, commensurate
+
+si = System( ('si_system', 88156805987886421108624908988601219537) )
+
+kg = Scale( ('ml_si_kilogram_ratio', 12782167041499057092439851237297548539) )
+m = Scale( ('ml_si_metre_ratio', 17771593641054934856197983478245767638) )
+nm = Scale( ("ml_si_nm_ratio", 257091757625055920788370123828667027186) )
+s = Scale( ('ml_si_second_ratio', 276296348539283398608930897564542275037) )
+J = Scale( ('ml_si_joule_ratio', 165050666678496469850612022016789737781) )
+N = Scale( ('ml_si_newton_ratio', 189557404890962043877029120197866874763) )
+degree = Scale( ('ml_imp_degree_ratio', 124567088583703716502057160299542649451) )
+
+#----------------------------------------------------------------------------
+class TestDimension(unittest.TestCase):
+
+    """
+    Dimensional exponents are held in a packed integer
+    """
+    
+    def test_arithmetic(self):
+        dims = [
+            (1,2,-3,0,0,0,0),
+            (0,-1,1,4,0,-2,0),
+            (-7,0,0,0,0,0,12),
+        ]
+        for x in dims:
+            d_x = Dimension(si,x,prefix=[1,1000])
+            self.assertEqual( x, d_x.dim )
+            self.assertEqual( 
+                tuple( 3*i for i in x ), 
+                (d_x**3).dim 
+            )
+            self.assertEqual( 
+                tuple( -2*i for i in x ), 
+                (d_x**-2).dim 
+            )
+            
+            for y in dims:
+                d_y = Dimension(si,y)
+                self.assertEqual( 
+                    tuple( i + j for i,j in zip(x,y) ), 
+                    (d_x*d_y).dim 
+                )
+                self.assertEqual( 
+                    tuple( i - j for i,j in zip(x,y) ), 
+                    (d_x/d_y).dim 
+                )
+                self.assertEqual( 
+                    d_x.prefix/d_y.prefix, 
+                    (d_x/d_y).prefix 
+                )
+                
+    def test_equality(self):
+        d1 = Dimension(si,[1,2,3],prefix=[100,10])
+        d2 = Dimension(si,(1,2,3),prefix=10)
+        self.assertEqual( d1, d2 )
+        self.assertEqual( hash(d1), hash(d2) )
+        self.assertTrue( d1.commensurate( Dimension(si,(1,2,3)) ) )
+        self.assertNotEqual( d1, Dimension(si,(1,2,3)) )
+        self.assertFalse( d1.commensurate( Dimension(si,(1,2,3,0)) ) )
+        self.assertFalse( d1.commensurate( Dimension(si,(1,2,-3)) ) )
+        
+    def test_range(self):
+        self.assertRaises(RuntimeError,Dimension,si,(1,64,0))
+        self.assertEqual( (1,-64,63), Dimension(si,(1,-64,63)).dim )
+        
+        d = Dimension(si,(1,-40,0))
+        self.assertRaises(RuntimeError,d.__pow__,2)
+        self.assertRaises(RuntimeError,d.__mul__,d)
+        self.assertRaises(RuntimeError,d.__truediv__,d**-1)
+        
+    def test_compound(self):
+        x = (kg*m**2/s**2).dimension
+        self.assertTrue( x.simplify is x.simplify )
+        self.assertEqual( J.dimension, x.simplify )
+        
+        y = (s**-2*kg*m**2).dimension
+        self.assertEqual( x, y )
+        self.assertEqual( hash(x), hash(y) )
+        self.assertTrue( 
+            str( (1000*(kg*m)).dimension ).endswith("prefactor = 1000 }")
+        )
+
+    def test_commensurate(self):
+        objects = [
+            kg*m**2/s**2,
+            N*m,
+            kg*nm**2/s**2,      # different prefix
+            J,
+            J.to_scale_aspect(),
+            N,
+            degree,             # not in a unit system 
+            N*m,
+        ]
+        expect = [True,True,True,True,True,False,False,True]
+        self.assertEqual( expect, commensurate(objects,J) )
+        self.assertEqual( expect, commensurate(objects,J.dimension) )
+        self.assertEqual( expect, commensurate(objects,(N*m).dimension) )
+        
+        self.assertEqual( [], commensurate([],J) )
+        self.assertRaises(RuntimeError,commensurate,objects,degree)
+
+        # Dimensions of a different length 
+        x = Dimension(si,(1,)*9)
+        y = Dimension(si,(2,)*9)
+        self.assertEqual( 
+            [True,False,True,False], 
+            commensurate([x,y,x,J],Dimension(si,(1,)*9)) 
+        )
+
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()
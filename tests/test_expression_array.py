@@ -0,0 +1,147 @@
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None 
+
+from m_layer import * 
+from m_layer import ml_math
+from m_layer.expression import ExpressionArray, Expression, concatenate 
+
+fahrenheit = Scale( ('ml_imp_fahrenheit_interval', 22817745368296240233220712518826840767) )
+celsius = Scale( ('ml_si_celsius_interval', 245795086332095731716589481707012001072) )
+kelvin = Scale( ('ml_si_kelvin_ratio', 302952256288207449238881076502466548054) )
+temperature = Aspect( ('ml_thermodynamic_temperature', 227327310217856015944698060802418784871) )
+radian_ratio = Scale( ('ml_si_radian_ratio', 273301153578020696303516833405033923738) )
+degree_360 = Scale( ('ml_imp_degree_bounded_360', 125066222841962802760576607996391537405) )
+plane_angle = Aspect( ('ml_plane_angle', 95173225557230344956477808929590724690) )
+
+kg = Scale( ('ml_si_kilogram_ratio', 12782167041499057092439851237297548539) )
+m = Scale( ('ml_si_metre_ratio', 17771593641054934856197983478245767638) )
+nm = Scale( ("ml_si_nm_ratio", 257091757625055920788370123828667027186) )
+s = Scale( ('ml_si_second_ratio', 276296348539283398608930897564542275037) )
+
+#----------------------------------------------------------------------------
+class TestExpressionArray(unittest.TestCase):
+
+    """
+    An ExpressionArray gives the same results as 
+    a sequence of Expression objects
+    """
+    
+    def _check(self,xa,result,method,*args):
+        self.assertEqual( len(xa), len(result) )
+        for x_i,y_i in zip(xa,result):
+            y = getattr(x_i,method)(*args)
+            self.assertEqual( y.token, y_i.token )
+            self.assertEqual( str(y), str(y_i) )
+        
+    def test_convert(self):
+        values = [-40.0,32.0,72.0,212.0]
+        xa = expr_array( values, fahrenheit )
+        ya = xa.convert(celsius)
+        self.assertTrue( isinstance(ya,ExpressionArray) )
+        self._check(xa,ya,'convert',celsius)
+        self.assertEqual( list(xa.values), values )
+        
+        xa = expr_array( [250.0,300.0], kelvin, temperature )
+        self._check( xa, xa.convert(celsius), 'convert', celsius ) 
+        
+        xa = expr_array( [1.0,2.5,1E3], kg*m**2/s**2 )
+        dst = kg*nm**2/s**2
+        self._check( xa, xa.convert(dst), 'convert', dst ) 
+        
+        # Converting to the same scale copies the numbers
+        ya = xa.convert( kg*m**2/s**2 ) 
+        self.assertFalse( ya.values is xa.values )
+        
+        self.assertRaises(RuntimeError,expr_array([1.0],kelvin).convert,celsius)
+        
+    def test_cast(self):
+        xa = expr_array( [-7.0,-1.0,0.0,2.0,7.0], radian_ratio )
+        ya = xa.cast(degree_360,plane_angle)
+        self._check(xa,ya,'cast',degree_360,plane_angle)
+        self.assertEqual( plane_angle, ya.scale_aspect.aspect )
+        
+    def test_sequence(self):
+        xa = expr_array( [1.0,2.0,3.0,4.0], celsius )
+        
+        self.assertTrue( isinstance(xa[1],Expression) )
+        self.assertEqual( 2.0, xa[1].token )
+        self.assertEqual( 4.0, xa[-1].token )
+        
+        ya = xa[1:3]
+        self.assertTrue( isinstance(ya,ExpressionArray) )
+        self.assertEqual( [2.0,3.0], list(ya.values) )
+        self.assertTrue( ya.scale_aspect is xa.scale_aspect )
+        
+        za = concatenate( [xa,ya] )
+        self.assertEqual( [1.0,2.0,3.0,4.0,2.0,3.0], list(za.values) )
+        
+    def test_index(self):
+        xa = expr_array( [1.0,2.0,3.0,4.0], celsius )
+        
+        # A boolean mask or a sequence of indices gives an array
+        ya = xa[ [True,False,True,False] ]
+        self.assertTrue( isinstance(ya,ExpressionArray) )
+        self.assertEqual( [1.0,3.0], list(ya.values) )
+        self.assertTrue( ya.scale_aspect is xa.scale_aspect )
+        
+        ya = xa[ [3,0] ]
+        self.assertEqual( [4.0,1.0], list(ya.values) )
+        self.assertEqual( 0, len( xa[ [] ] ) )
+        
+        if numpy is not None:
+            ya = xa[ numpy.array([False,True,True,False]) ]
+            self.assertEqual( [2.0,3.0], list(ya.values) )
+            ya = xa[ numpy.array([2,1]) ]
+            self.assertEqual( [3.0,2.0], list(ya.values) )
+            self.assertEqual( 3.0, xa[ numpy.int64(2) ].token )
+        
+        self.assertRaises(
+            RuntimeError,
+            concatenate, [xa, expr_array([1.0],fahrenheit)]
+        )
+        self.assertRaises(
+            RuntimeError,
+            concatenate, [xa, expr_array([1.0],celsius,temperature)]
+        )
+        
+        # Compound scales are compared by identifier
+        za = concatenate( [expr_array([1.0],kg*m), expr_array([2.0],kg*m)] )
+        self.assertEqual( 2, len(za) )
+        
+    def test_reductions(self):
+        xa = expr_array( [1.0,2.0,3.0,6.0], celsius )
+        self.assertEqual( 12.0, xa.sum().token )
+        self.assertEqual( 3.0, xa.mean().token )
+        self.assertEqual( 1.0, xa.min().token )
+        self.assertEqual( 6.0, xa.max().token )
+        self.assertTrue( xa.sum().scale_aspect is xa.scale_aspect )
+        
+        self.assertEqual( "[1.0, 2.0, 3.0, 6.0] degree C", str(xa) )
+        
+#----------------------------------------------------------------------------
+class TestExpressionArrayBuffer(TestExpressionArray):
+
+    """
+    The same tests using ``array.array`` when NumPy is not used 
+    """
+    
+    def setUp(self):
+        self._numpy = ml_math._numpy 
+        ml_math._numpy = None 
+        
+    def tearDown(self):
+        ml_math._numpy = self._numpy
+        
+    def test_buffer(self):
+        from array import array 
+        xa = expr_array( [1.0,2.0], celsius )
+        self.assertTrue( isinstance(xa.values,array) )
+        self.assertTrue( isinstance(xa.convert(fahrenheit).values,array) )
+        
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()
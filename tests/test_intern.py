@@ -0,0 +1,80 @@
+import unittest
+import pickle
+
+from m_layer import * 
+from m_layer.lib import no_aspect, Reference
+from m_layer.uid import UID
+from m_layer.context import global_context as cxt
+
+m_uid = ('ml_si_metre_ratio', 17771593641054934856197983478245767638)
+s_uid = ('ml_si_second_ratio', 276296348539283398608930897564542275037)
+length_uid = ('ml_length', 993853592179723568440264076369400241)
+
+#----------------------------------------------------------------------------
+class TestIntern(unittest.TestCase):
+
+    """
+    There is one object for each M-layer identifier 
+    """
+    
+    def test_scale(self):
+        m = Scale(m_uid)
+        self.assertTrue( m is Scale(m_uid) )
+        self.assertTrue( m is Scale( list(m_uid) ) )
+        self.assertTrue( m is Scale( UID(m_uid) ) )
+        self.assertEqual( hash(m), hash( Scale(m_uid) ) )
+        self.assertNotEqual( m, Scale(s_uid) )
+        
+        # A role gives a distinct object 
+        m_height = Scale(m_uid,role='height')
+        self.assertTrue( m_height is Scale(m_uid,role='height') )
+        self.assertFalse( m_height is m )
+        self.assertNotEqual( m_height, m )
+        self.assertEqual( m_height.uid, m.uid )
+        self.assertEqual( 'height', m_height.role )
+        self.assertEqual( None, m.role )
+        self.assertEqual( 2, len( set([m,m_height,Scale(m_uid)]) ) )
+        self.assertEqual( 
+            "Scale( {!s}, role='height' )".format( m.uid ), 
+            repr(m_height) 
+        )
+        
+        # Distinct roles do not cancel 
+        self.assertEqual( 1, len( (m/Scale(s_uid)/m).uid.factors ) )
+        self.assertEqual( 2, len( (m/Scale(s_uid)/m_height).uid.factors ) )
+        
+    def test_aspect(self):
+        length = Aspect(length_uid)
+        self.assertTrue( length is Aspect(length_uid) )
+        self.assertTrue( Aspect(cxt.no_aspect_uid) is no_aspect )
+        self.assertEqual( hash(length), hash( Aspect( list(length_uid) ) ) )
+        
+    def test_scale_aspect(self):
+        m, length = Scale(m_uid), Aspect(length_uid)
+        
+        m_l = ScaleAspect(m,length)
+        self.assertTrue( m_l is m.to_scale_aspect(length) )
+        self.assertTrue( m_l is ScaleAspect( Scale(m_uid), Aspect(length_uid) ) )
+        self.assertTrue( ScaleAspect(m) is m.to_scale_aspect() )
+        self.assertFalse( ScaleAspect(m) is m_l )
+        self.assertEqual( 2, len( set([m_l,ScaleAspect(m),m_l]) ) )
+        
+    def test_reference(self):
+        m = Scale(m_uid)
+        r = Reference( cxt.scale_reg[m.uid]['reference'] )
+        self.assertTrue( r is m._reference )
+        self.assertFalse( hasattr(r,'__dict__') )
+        
+    def test_pickle(self):
+        m, length = Scale(m_uid), Aspect(length_uid)
+        for obj in ( 
+            m, length, no_aspect, 
+            Scale(m_uid,role='height'), 
+            ScaleAspect(m,length),
+            m._reference 
+        ):
+            self.assertTrue( obj is pickle.loads( pickle.dumps(obj) ) )
+        
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import unittest
+import glob
+import json
+import os
+import shutil
+import tempfile
+
+from m_layer.context import Context, _json_paths
+from m_layer.json_reader import *
+
+#----------------------------------------------------------------------------
+class TestJSONReader(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+        
+    def _write(self,name,text):
+        path = os.path.join(self.tmp,name)
+        with open(path,'w') as f:
+            f.write(text)
+        return path
+        
+    def test_array(self):
+        data = [ 
+            dict( a=i, b=[1.5,"x"*i,None], c={"d":-i} ) 
+                for i in range(50) 
+        ]
+        text = json.dumps(data,indent=4)
+        path = self._write('a.json',text)
+        
+        # Small chunks split the elements 
+        for chunk_size in (1,3,7,64,len(text)+1):
+            self.assertEqual( 
+                data, 
+                list( iter_entities(path,chunk_size=chunk_size) ) 
+            )
+        
+        path = self._write('b.json',' [ 1 , 22,333 ,\n4444 ] \n')
+        self.assertEqual( [1,22,333,4444], list( iter_entities(path,chunk_size=2) ) )
+        
+        path = self._write('c.json','[]')
+        self.assertEqual( [], list( iter_entities(path) ) )
+        
+        path = self._write('d.json',' { "a": [1,2] } ')
+        self.assertEqual( [{"a":[1,2]}], list( iter_entities(path,chunk_size=2) ) )
+        
+    def test_kwargs(self):
+        path = self._write('a.json','[1.5, {"a": 2.5}]')
+        self.assertEqual( 
+            ['1.5',{"a":'2.5'}], 
+            list( iter_entities(path,chunk_size=4,parse_float=str) ) 
+        )
+        
+    def test_errors(self):
+        for text in ('','[1,2','[1,,2]','[1 2]','[1,2] 3','{"a":'):
+            path = self._write('a.json',text)
+            with self.assertRaises(json.decoder.JSONDecodeError):
+                list( iter_entities(path,chunk_size=2) ) 
+                
+    def test_json_lines(self):
+        data = [ dict(a=i) for i in range(5) ]
+        path = self._write(
+            'a.jsonl', "\n".join( json.dumps(d) for d in data ) + "\n\n" 
+        )
+        self.assertEqual( data, list( iter_entities(path) ) )
+        
+    def test_context(self):
+        # Load all the records from a JSON Lines file
+        ref = Context()
+        for path in _json_paths:
+            ref.load(path)
+            
+        with open( os.path.join(self.tmp,'all.jsonl'), 'w' ) as f:
+            for path in _json_paths:
+                for f_json in glob.glob(path):
+                    for entity in iter_entities(f_json):
+                        f.write( json.dumps(entity) + "\n" )
+                        
+        cxt = Context()
+        cxt.load( os.path.join(self.tmp,'*.jsonl') )
+        
+        self.assertEqual( 
+            dict( cxt.scale_reg.items() ), 
+            dict( ref.scale_reg.items() )
+        )
+        self.assertEqual( 
+            set( cxt.conversion_reg._table.keys() ), 
+            set( ref.conversion_reg._table.keys() )
+        )
+        self.assertEqual( 
+            cxt.systematic_dimensions(), 
+            ref.systematic_dimensions() 
+        )
+        
+        records = read_records( os.path.join(self.tmp,'all.jsonl') )
+        self.assertEqual( 
+            len(records), 
+            sum( 
+                len( read_records(f_json) ) 
+                    for path in _json_paths 
+                        for f_json in glob.glob(path) 
+            )
+        )
+        
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from m_layer import * 
+
+m = Scale( ('ml_si_metre_ratio', 17771593641054934856197983478245767638) )
+s = Scale( ('ml_si_second_ratio', 276296348539283398608930897564542275037) )
+length = Aspect( ('ml_length', 993853592179723568440264076369400241) )
+
+#----------------------------------------------------------------------------
+class TestLabel(unittest.TestCase):
+
+    """
+    Labels for compound objects are created when first used 
+    """
+    
+    def test_compound_scale(self):
+        x = m**2/s
+        self.assertFalse( hasattr(x,'_str') )
+        self.assertEqual( "s-1.m2", x.label )
+        self.assertTrue( x.label is x.label )
+        
+        # The string form does not need a label
+        self.assertEqual( "m^2/(s)", str(x) )
+        
+        # Terms may cancel  
+        self.assertEqual( "", (m/m).label )
+        
+    def test_compound_scale_aspect(self):
+        m_l = m.to_scale_aspect(length)
+        x = m_l/s.to_scale_aspect()
+        self.assertFalse( hasattr(x,'_str') )
+        self.assertEqual( "s-1.(m, length)", x.label )
+        self.assertTrue( x.label is x.label )
+        
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()
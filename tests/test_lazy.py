@@ -0,0 +1,171 @@
+import unittest
+import os
+import sys
+import subprocess
+import threading
+import time
+
+from m_layer import * 
+from m_layer.context import Context, _json_registers, _json_paths
+
+#----------------------------------------------------------------------------
+class TestLazyContext(unittest.TestCase):
+
+    """
+    Registers that are deferred must not be loaded until they are used 
+    """
+    
+    def test_defer(self):
+        cxt = Context()
+        for (name,_),path in zip(_json_registers,_json_paths):
+            cxt.defer(name,lambda c, path=path: c.load(path))
+            self.assertFalse( name in vars(cxt) )
+        
+        # Conversion entries refer to the scale register, 
+        # which is loaded as a consequence 
+        self.assertTrue( len(cxt.conversion_reg._table) )
+        self.assertTrue( 'scale_reg' in vars(cxt) )
+        self.assertFalse( 'aspect_reg' in vars(cxt) )
+        
+        ref = Context()
+        for path in _json_paths:
+            ref.load(path)
+            
+        self.assertEqual(cxt.scale_reg._objects,ref.scale_reg._objects)
+        self.assertEqual(cxt.aspect_reg._objects,ref.aspect_reg._objects)
+        
+        self.assertRaises(AttributeError,getattr,cxt,'undefined_reg')
+        
+    def test_threads(self):
+        # Other threads wait until loading has finished  
+        cxt = Context()
+        started = threading.Event()
+        
+        def loader(c):
+            self.assertTrue( c.scale_reg is not None )
+            started.set()
+            time.sleep(0.1)
+            c.load( _json_paths[1] )
+            
+        cxt.defer('scale_reg',loader)
+        
+        sizes = []
+        worker = lambda: sizes.append( len(cxt.scale_reg._objects) )
+        t1 = threading.Thread(target=worker)
+        t1.start()
+        started.wait()
+        self.assertFalse( 'scale_reg' in vars(cxt) )
+        
+        t2 = threading.Thread(target=worker)
+        t2.start()
+        t1.join()
+        t2.join()
+        
+        self.assertEqual( 2, len(sizes) )
+        self.assertTrue( sizes[0] > 0 )
+        self.assertEqual( sizes[0], sizes[1] )
+        self.assertEqual( {}, cxt._loading )
+        
+    def test_loader_fails(self):
+        # Nothing is published when a loader fails, so it is called again
+        cxt = Context()
+        calls = []
+        
+        def loader(c):
+            calls.append(c.aspect_reg)
+            if len(calls) == 1:
+                raise RuntimeError("failed")
+            
+        cxt.defer('scale_reg',loader)
+        cxt.defer('aspect_reg',lambda c: c.load( _json_paths[4] ))
+        
+        self.assertRaises(RuntimeError,getattr,cxt,'scale_reg')
+        self.assertFalse( 'scale_reg' in vars(cxt) )
+        self.assertFalse( 'aspect_reg' in vars(cxt) )
+        self.assertEqual( {}, cxt._loading )
+        
+        self.assertTrue( cxt.scale_reg is not None )
+        self.assertEqual( 2, len(calls) )
+        self.assertTrue( 'aspect_reg' in vars(cxt) )
+        self.assertEqual( {}, cxt._deferred )
+        
+    def test_profile_fails(self):
+        code = "\n".join([
+            "from m_layer.context import global_context as cxt",
+            "for i in range(2):",
+            "    try:",
+            "        cxt.scale_reg",
+            "    except RuntimeError: pass",
+            "    else: raise AssertionError",
+            "assert 'scale_reg' not in vars(cxt)",
+        ])
+        env = dict(os.environ, M_LAYER_LAZY='1', M_LAYER_PROFILE='ml_nonexistent')
+        subprocess.check_call([sys.executable,'-c',code],env=env)
+        
+    def test_lazy_import(self):
+        # Only the UID and Dimension classes are used
+        code = "\n".join([
+            "from m_layer.uid import UID",
+            "from m_layer.context import global_context as cxt",
+            "uid = UID( ('ml_si_metre_ratio', 1) )",
+            "assert 'scale_reg' not in vars(cxt)",
+            "assert 'dimension_conversion_reg' not in vars(cxt)",
+        ])
+        env = dict(os.environ, M_LAYER_LAZY='1')
+        subprocess.check_call([sys.executable,'-c',code],env=env)
+        
+    def test_no_numpy(self):
+        # NumPy is only imported when arrays are used 
+        code = "\n".join([
+            "import sys",
+            "from m_layer import *",
+            "m = Scale( ('ml_si_metre_ratio', 17771593641054934856197983478245767638) )",
+            "ft = Scale( ('ml_foot_ratio', 150280610960339969789551668292960104920) )",
+            "expr(1.0,m).convert(ft)",
+            "assert 'numpy' not in sys.modules",
+        ])
+        env = dict(os.environ, M_LAYER_LAZY='1')
+        subprocess.check_call([sys.executable,'-c',code],env=env)
+        subprocess.check_call([sys.executable,'-c',code])
+
+#----------------------------------------------------------------------------
+class TestLazyFunctions(unittest.TestCase):
+
+    """
+    Transformation functions are compiled when they are first used 
+    """
+    
+    def setUp(self):
+        self.cxt = Context()
+        for path in _json_paths:
+            self.cxt.load(path)
+    
+    def test_compile_on_use(self):
+        table = self.cxt.conversion_reg._table 
+        self.assertFalse( any( table.lazy(k).compiled for k in table ) )
+        
+        uid_pair = next( iter(table) )
+        fn = self.cxt.conversion_reg[uid_pair]
+        self.assertTrue( table.lazy(uid_pair).compiled )
+        self.assertTrue( fn is self.cxt.conversion_reg.get(uid_pair) )
+        self.assertEqual( 
+            1, sum( table.lazy(k).compiled for k in table ) 
+        )
+        
+    def test_validate(self):
+        self.cxt.validate()
+        
+        # Add an entry that cannot be compiled, 
+        # for a conversion from a scale to itself
+        uid_pair = next( iter(self.cxt.conversion_reg._table) )
+        entry = dict( self.cxt.conversion_reg._table.lazy(uid_pair).entry )
+        entry['dst'] = entry['src']
+        entry['function'] = "lambda x: x +"
+        self.cxt.conversion_reg.set(entry)
+        
+        self.assertRaises(RuntimeError,self.cxt.validate)
+        self.assertEqual( 1, len( self.cxt.conversion_reg.validate() ) )
+
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()
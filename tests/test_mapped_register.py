@@ -0,0 +1,135 @@
+import unittest
+import os
+import sys
+import shutil
+import subprocess
+import tempfile
+
+from m_layer import * 
+from m_layer.context import Context, _json_paths, global_context
+from m_layer.mapped_register import *
+from m_layer.uid import UID
+
+#----------------------------------------------------------------------------
+class TestMappedRegister(unittest.TestCase):
+
+    """
+    Memory-mapped registers must behave like the in-memory registers 
+    """
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        write_files(self.tmp,_json_paths)
+        
+        self.ref = Context()
+        for path in _json_paths:
+            self.ref.load(path)
+        self.ref.no_aspect_uid = global_context.no_aspect_uid
+        
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+        
+    def test_context(self):
+        ref = self.ref 
+        cxt = mapped_context(self.tmp)
+        
+        for uid,entry in ref.scale_reg.items():
+            self.assertEqual( cxt.scale_reg[uid], entry )
+            self.assertTrue( uid in cxt.scale_reg )
+            
+        self.assertEqual( 
+            dict( cxt.reference_reg.items() ), 
+            dict( ref.reference_reg.items() )
+        )
+        self.assertEqual( 
+            cxt.systematic_dimensions(), 
+            ref.systematic_dimensions() 
+        )
+        
+        self.assertEqual( 
+            set( cxt.conversion_reg.keys() ),
+            set( ref.conversion_reg._table.keys() )
+        )
+        for uid_pair in ref.conversion_reg._table.keys():
+            self.assertEqual(
+                cxt.conversion_reg[uid_pair](10.0),
+                ref.conversion_reg[uid_pair](10.0)
+            )
+            
+        for uid_pair in ref.casting_reg._table.keys():
+            self.assertEqual(
+                cxt.casting_reg[uid_pair](10.0),
+                ref.casting_reg[uid_pair](10.0)
+            )
+            
+        for aspect,table in ref.scales_for_aspect_reg._table.items():
+            self.assertTrue( aspect in cxt.scales_for_aspect_reg )
+            self.assertEqual( 
+                set( cxt.scales_for_aspect_reg[aspect].keys() ),
+                set( table.keys() )
+            )
+            for scale_pair in table.keys():
+                self.assertEqual(
+                    cxt.conversion_from_scale_aspect(
+                        scale_pair[0],aspect,scale_pair[1]
+                    )(10.0),
+                    ref.conversion_from_scale_aspect(
+                        scale_pair[0],aspect,scale_pair[1]
+                    )(10.0)
+                )
+                
+        cxt.validate()
+        
+        # Only functions that were used are held 
+        cxt = mapped_context(self.tmp)
+        uid_pair = next( iter( cxt.conversion_reg.keys() ) )
+        cxt.conversion_reg[uid_pair]
+        self.assertEqual( 1, len(cxt.conversion_reg._cache) )
+        
+    def test_lookup(self):
+        cxt = mapped_context(self.tmp)
+        uid = next( iter( self.ref.scale_reg.items() ) )[0]
+        
+        # The name is part of the UID
+        other = UID( ('not_a_name',uid.uuid) )
+        self.assertFalse( other in cxt.scale_reg )
+        self.assertTrue( cxt.scale_reg.get(other) is None )
+        self.assertRaises(KeyError,cxt.scale_reg.__getitem__,other)
+        
+        self.assertTrue( cxt.conversion_reg.get( (uid,uid) ) is None )
+        self.assertFalse( (uid,uid) in cxt.conversion_reg )
+        
+        # Register files are read-only 
+        self.assertRaises(RuntimeError,cxt.load,_json_paths[0])
+        
+    def test_global_context(self):
+        # The global context of a process can use the register files 
+        code = "\n".join([
+            "from m_layer import *",
+            "from m_layer.context import global_context as cxt",
+            "from m_layer.mapped_register import MappedRegister",
+            "from m_layer.mapped_register import MappedConversionRegister",
+            "assert type(cxt.scale_reg) is MappedRegister",
+            "assert type(cxt.conversion_reg) is MappedConversionRegister",
+            "m = Scale( ('ml_si_metre_ratio', 17771593641054934856197983478245767638) )",
+            "ft = Scale( ('ml_foot_ratio', 150280610960339969789551668292960104920) )",
+            "y = expr(1.0,m).convert(ft)",
+            "assert abs(y.token - 3.28084) < 1E-12, y.token",
+            "assert str(y) == '3.28084 ft', str(y)",
+        ])
+        env = dict(os.environ, M_LAYER_REGISTER_DIR=self.tmp)
+        subprocess.check_call([sys.executable,'-c',code],env=env)
+        
+    def test_bad_file(self):
+        path = os.path.join(self.tmp,'scale.mlr')
+        self.assertRaises(RuntimeError,MappedConversionRegister,path)
+        
+        entry = next( iter( self.ref.scale_reg.items() ) )[1]
+        self.assertRaises(
+            RuntimeError,
+            MappedRegister.write, path, [entry,entry]
+        )
+
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()
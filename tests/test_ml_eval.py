@@ -0,0 +1,54 @@
+import unittest
+
+from fractions import Fraction
+
+from m_layer.ml_eval import ml_eval, ml_bind, ml_function, templates
+from m_layer.affine import Affine
+
+#----------------------------------------------------------------------------
+class TestMLEval(unittest.TestCase):
+
+    def test_values(self):
+        self.assertTrue( isinstance( ml_eval("1/1000"), Fraction ) )
+        self.assertEqual( ml_eval("1E3/1"), Fraction(1000) )
+        self.assertEqual( ml_eval(" si.kilo "), 1E3 )
+        
+    def test_shared_template(self):
+        txt = "lambda x: ml_math.ratio_convert(x,a)"
+        f1 = ml_bind(txt,dict(a=2))
+        f2 = ml_bind(txt,dict(a=3))
+        
+        self.assertEqual( f1(5), 10 )
+        self.assertEqual( f2(5), 15 )
+        
+        # The compiled code and globals are shared
+        self.assertTrue( f1.__code__ is f2.__code__ )
+        self.assertTrue( f1.__globals__ is f2.__globals__ )
+        
+        self.assertTrue( templates()[ (txt,('a',)) ] >= 2 )
+        
+        # Parameter values are not seen by other instances
+        self.assertRaises(NameError, ml_bind("lambda x: a*x",{}), 1 )
+        
+    def test_affine_counted(self):
+        # Affine functions are not compiled, but are reported
+        entry = {
+            'function': "lambda x: ml_math.ratio_convert(x,a)",
+            'parameters': {'a': "2"},
+        }
+        key = ( entry['function'], ('a',) )
+        before = templates().get(key,0)
+        self.assertTrue( isinstance( ml_function(entry), Affine ) )
+        self.assertEqual( before + 1, templates()[key] )
+        
+    def test_no_parameters(self):
+        txt = "lambda x: x"
+        self.assertTrue( ml_bind(txt,{}) is ml_bind(txt,{}) )
+        self.assertTrue( ml_eval(txt) is ml_eval(txt) )
+        
+    def test_no_builtins(self):
+        self.assertRaises(NameError, ml_eval, "open('x')" )
+
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()
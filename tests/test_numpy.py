@@ -0,0 +1,82 @@
+import unittest
+
+from fractions import Fraction
+
+try:
+    import numpy
+except ImportError:
+    numpy = None 
+    
+from m_layer import * 
+from m_layer import ml_math 
+from m_layer.affine import Affine
+
+fahrenheit = Scale( ('ml_imp_fahrenheit_interval', 22817745368296240233220712518826840767) )
+celsius = Scale( ('ml_si_celsius_interval', 245795086332095731716589481707012001072) )
+degree_ratio = Scale( ('ml_imp_degree_ratio', 124567088583703716502057160299542649451) )
+radian_ratio = Scale( ('ml_si_radian_ratio', 273301153578020696303516833405033923738) )
+degree_180 = Scale( ('ml_imp_degree_bounded_180', 273805538217618733078298377573965188309) )
+degree_360 = Scale( ('ml_imp_degree_bounded_360', 125066222841962802760576607996391537405) )
+plane_angle = Aspect( ('ml_plane_angle', 95173225557230344956477808929590724690) )
+
+kg = Scale( ('ml_si_kilogram_ratio', 12782167041499057092439851237297548539) )
+m = Scale( ('ml_si_metre_ratio', 17771593641054934856197983478245767638) )
+nm = Scale( ("ml_si_nm_ratio", 257091757625055920788370123828667027186) )
+s = Scale( ('ml_si_second_ratio', 276296348539283398608930897564542275037) )
+
+#----------------------------------------------------------------------------
+@unittest.skipIf(numpy is None,"NumPy is not available")
+class TestNumPy(unittest.TestCase):
+
+    """
+    Array tokens are transformed in one operation, with the 
+    same results as for each element 
+    """
+    
+    def _check(self,x,dst,method='convert',*args):
+        values = x.token
+        result = getattr( expr(values,x.scale_aspect), method )(dst,*args)
+        
+        self.assertTrue( isinstance(result.token,numpy.ndarray) )
+        self.assertEqual( numpy.float64, result.token.dtype )
+        for x_i,y_i in zip(values,result.token):
+            y = getattr( expr(float(x_i),x.scale_aspect), method )(dst,*args)
+            self.assertAlmostEqual( y.token, y_i, 12 )
+            
+        return result 
+        
+    def test_kernels(self):
+        x = numpy.linspace(-720.0,720.0,97)
+        y = ml_math.bounded_convert(x,1,-180,180)
+        for x_i,y_i in zip(x,y):
+            self.assertEqual( ml_math.bounded_convert(float(x_i),1,-180,180), y_i )
+            
+        y = ml_math.ratio_convert(x,Fraction(1,3))
+        self.assertEqual( numpy.float64, y.dtype )
+        y = ml_math.interval_convert(x,Fraction(5,9),Fraction(-160,9))
+        self.assertEqual( numpy.float64, y.dtype )
+        y = Affine( Fraction(5,9), Fraction(-160,9) )(x)
+        self.assertEqual( numpy.float64, y.dtype )
+        
+        self.assertTrue( ml_math.coefficient(Fraction(1,3),1.0) == Fraction(1,3) )
+        
+    def test_convert(self):
+        x = expr( numpy.array([-40.0,32.0,72.0,212.0]), fahrenheit )
+        y = self._check(x,celsius)
+        self.assertEqual( -40.0, y.token[0] )
+        
+        x = expr( numpy.linspace(-400.0,400.0,81), degree_180 )
+        self._check(x,degree_360)
+        
+        x = expr( numpy.linspace(-7.0,7.0,29), radian_ratio )
+        y = self._check(x,degree_360,'cast',plane_angle)
+        self.assertTrue( numpy.all( y.token >= 0.0 ) )
+        self.assertTrue( numpy.all( y.token < 360.0 ) )
+        
+    def test_compound(self):
+        x = expr( numpy.array([1.0,2.5,1E3]), kg*m**2/s**2 )
+        self._check(x,kg*nm**2/s**2)
+        
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+
+from m_layer import * 
+from m_layer.context import Context, _json_paths
+
+#----------------------------------------------------------------------------
+class TestParallelLoad(unittest.TestCase):
+
+    """
+    Loading files in parallel must give the same registers 
+    """
+    
+    def _load(self,**kwargs):
+        cxt = Context()
+        for path in _json_paths:
+            cxt.load(path,**kwargs)
+        return cxt 
+        
+    def _compare(self,cxt,ref):
+        self.assertEqual(cxt.scale_reg._objects,ref.scale_reg._objects)
+        self.assertEqual(cxt.reference_reg._objects,ref.reference_reg._objects)
+        self.assertEqual(cxt.aspect_reg._objects,ref.aspect_reg._objects)
+        self.assertEqual(cxt.system_reg._objects,ref.system_reg._objects)
+        
+        for uid_pair in ref.conversion_reg._table.keys():
+            self.assertEqual(
+                cxt.conversion_reg[uid_pair](10.0),
+                ref.conversion_reg[uid_pair](10.0)
+            )
+        for uid_pair in ref.casting_reg._table.keys():
+            self.assertEqual(
+                cxt.casting_reg[uid_pair](10.0),
+                ref.casting_reg[uid_pair](10.0)
+            )
+            
+    def test_thread(self):
+        self._compare( self._load(parallel='thread'), self._load() )
+
+    def test_process(self):
+        self._compare( 
+            self._load(parallel='process',max_workers=2), 
+            self._load() 
+        )
+        
+    def test_duplicates(self):
+        cxt = self._load(parallel='thread')
+        self.assertRaises(
+            RuntimeError,
+            cxt.load,_json_paths[1],parallel='thread'
+        )
+        
+    def test_bad_option(self):
+        self.assertRaises(
+            RuntimeError,
+            Context().load,_json_paths[0],parallel='fibre'
+        )
+
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,152 @@
+import unittest
+import os
+import sys
+import subprocess
+
+from m_layer import * 
+from m_layer.uid import UID
+from m_layer.context import Context, _json_paths, global_context
+from m_layer.profile import *
+
+#----------------------------------------------------------------------------
+class TestProfile(unittest.TestCase):
+
+    """
+    A profile loads only the records that it needs
+    """
+    
+    def setUp(self):
+        self.ref = Context()
+        for path in _json_paths:
+            self.ref.load(path)
+        self.ref.no_aspect_uid = global_context.no_aspect_uid
+        
+    def _uid(self,name):
+        for reg in (
+            self.ref.scale_reg, self.ref.aspect_reg, 
+            self.ref.system_reg, self.ref.reference_reg
+        ):
+            for uid,_ in reg.items():
+                if uid.name == name: return uid 
+        
+    def _context(self,profile):
+        cxt = Context()
+        cxt.load_profile(profile,_json_paths)
+        cxt.no_aspect_uid = global_context.no_aspect_uid
+        return cxt 
+        
+    def test_aspect(self):
+        cxt = self._context( Profile('ml_thermodynamic_temperature') )
+        
+        K = self._uid('ml_si_kelvin_ratio')
+        C = self._uid('ml_si_celsius_interval')
+        F = self._uid('ml_imp_fahrenheit_interval')
+        T = self._uid('ml_thermodynamic_temperature')
+        
+        for uid in (K,C,F):
+            self.assertTrue( uid in cxt.scale_reg )
+        self.assertTrue( T in cxt.aspect_reg )
+        self.assertTrue( global_context.no_aspect_uid in cxt.aspect_reg )
+        
+        # References and their unit system follow the scales 
+        self.assertTrue( 
+            UID( cxt.scale_reg[K]['reference'] ) in cxt.reference_reg 
+        )
+        self.assertTrue( self._uid('si_system') in cxt.system_reg )
+        
+        self.assertFalse( self._uid('ml_si_metre_ratio') in cxt.scale_reg )
+        self.assertFalse( self._uid('ml_plane_angle') in cxt.aspect_reg )
+        
+        self.assertEqual( 
+            cxt.conversion_from_scale_aspect(K,T,C)(300.0),
+            self.ref.conversion_from_scale_aspect(K,T,C)(300.0),
+        )
+        self.assertEqual( 
+            cxt.conversion_reg[(C,F)](20.0),
+            self.ref.conversion_reg[(C,F)](20.0),
+        )
+        cxt.validate()
+        
+    def test_scale_and_system(self):
+        m = self._uid('ml_si_metre_ratio')
+        cxt = self._context( Profile( m ) )
+        
+        # Scales that can be converted are included
+        ft = self._uid('ml_foot_ratio')
+        self.assertTrue( ft in cxt.scale_reg )
+        self.assertEqual( 
+            cxt.conversion_reg[(m,ft)](1.0),
+            self.ref.conversion_reg[(m,ft)](1.0),
+        )
+        self.assertFalse( self._uid('ml_si_kelvin_ratio') in cxt.scale_reg )
+        
+        cxt = self._context( Profile('si_system') )
+        for uid,entry in cxt.scale_reg.items():
+            self.assertEqual( entry, self.ref.scale_reg[uid] )
+        self.assertTrue( self._uid('ml_si_kelvin_ratio') in cxt.scale_reg )
+        self.assertTrue( self._uid('ml_si_metre_ratio') in cxt.scale_reg )
+        self.assertTrue( 
+            len( cxt.systematic_dimensions() ) 
+        <=  len( self.ref.systematic_dimensions() )
+        )
+        
+    def test_errors(self):
+        self.assertRaises(
+            RuntimeError, Profile('no_such_name').select, _json_paths
+        )
+        self.assertRaises(
+            RuntimeError, Profile('si_metre').select, _json_paths
+        )
+        self.assertRaises(
+            RuntimeError, 
+            Profile( ('ml_si_metre_ratio',1) ).select, _json_paths
+        )
+        
+        # No scales are paired with length in the register 
+        self.assertRaises(
+            RuntimeError, Profile('ml_length').select, _json_paths
+        )
+        m = self._uid('ml_si_metre_ratio')
+        selection = Profile('ml_length',m).select(_json_paths)
+        self.assertTrue( m in selection.scales )
+        
+    def test_read_once(self):
+        # The JSON files are not read again to load the profile 
+        from m_layer import json_reader 
+        calls = []
+        iter_entities = json_reader.iter_entities
+        def counted(*args,**kwargs):
+            calls.append(args)
+            return iter_entities(*args,**kwargs)
+        
+        for enabled in ('0','1'):
+            saved = os.environ.get('M_LAYER_SNAPSHOT')
+            os.environ['M_LAYER_SNAPSHOT'] = enabled
+            json_reader.iter_entities = counted 
+            try:
+                cxt = self._context( Profile('ml_thermodynamic_temperature') )
+            finally:
+                json_reader.iter_entities = iter_entities
+                if saved is None:
+                    del os.environ['M_LAYER_SNAPSHOT']
+                else:
+                    os.environ['M_LAYER_SNAPSHOT'] = saved
+                    
+            self.assertTrue( len(calls) <= len( set(calls) ) )
+            self.assertTrue( self._uid('ml_si_kelvin_ratio') in cxt.scale_reg )
+            self.assertFalse( self._uid('ml_si_metre_ratio') in cxt.scale_reg )
+            del calls[:]
+        
+    def test_environment(self):
+        code = "\n".join([
+            "from m_layer.context import global_context as cxt",
+            "names = set( uid.name for uid,_ in cxt.scale_reg.items() )",
+            "assert 'ml_si_celsius_interval' in names, names",
+            "assert 'ml_si_metre_ratio' not in names, names",
+        ])
+        env = dict(os.environ, M_LAYER_PROFILE='ml_thermodynamic_temperature')
+        subprocess.check_call([sys.executable,'-c',code],env=env)
+
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()
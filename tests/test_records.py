@@ -0,0 +1,132 @@
+import unittest
+from fractions import Fraction
+
+from m_layer import * 
+from m_layer.lib import System, Reference
+from m_layer.uid import UID
+from m_layer.records import *
+from m_layer.sqlite_register import SQLiteStore, SQLiteRegister
+from m_layer.context import global_context as cxt
+
+m_uid = ('ml_si_metre_ratio', 17771593641054934856197983478245767638)
+length_uid = ('ml_length', 993853592179723568440264076369400241)
+si_uid = ('si_system', 88156805987886421108624908988601219537)
+
+km_entry = {
+    '__entry__': 'Reference', 
+    'uid': ['si_kilometre', 1], 
+    'locale': {'default': {'name': 'kilometre', 'symbol': 'km'}}, 
+    'system': {
+        'uid': list(si_uid), 
+        'dimensions': '[0, 1, 0, 0, 0, 0, 0]', 
+        'prefix': ['1000', '1']
+    }
+}
+
+#----------------------------------------------------------------------------
+class TestRecords(unittest.TestCase):
+
+    """
+    Register entries are parsed into records when they are loaded 
+    """
+    
+    def test_reference(self):
+        r = record(km_entry)
+        self.assertTrue( isinstance(r,ReferenceRecord) )
+        self.assertTrue( r.uid is UID( km_entry['uid'] ) )
+        self.assertEqual( 'km', r.symbol )
+        self.assertEqual( 'kilometre', r.text('default') )
+        self.assertEqual( 'km', r.text('default',short=True) )
+        
+        self.assertTrue( r.system.system_uid is UID(si_uid) )
+        self.assertEqual( (0, 1, 0, 0, 0, 0, 0), r.system.dimensions )
+        self.assertEqual( Fraction(1000), r.system.prefix )
+        self.assertEqual( 
+            (UID(si_uid),(0, 1, 0, 0, 0, 0, 0),Fraction(1000)),
+            r.system.key() 
+        )
+        
+    def test_json_access(self):
+        # A record behaves like its JSON entry 
+        r = record(km_entry)
+        self.assertFalse( hasattr(r,'__dict__') )
+        self.assertEqual( km_entry, r.entry )
+        self.assertEqual( km_entry['locale'], r['locale'] )
+        self.assertTrue( 'system' in r )
+        self.assertFalse( 'UCUM' in r )
+        self.assertEqual( None, r.get('UCUM') )
+        self.assertEqual( set(km_entry), set( r.keys() ) )
+        
+        self.assertEqual( r, km_entry )
+        self.assertEqual( r, record( dict(km_entry) ) )
+        self.assertTrue( r is record(r) )
+        self.assertRaises(TypeError,hash,r)
+        
+    def test_other_fields(self):
+        # Fields that are not parsed are kept as they are 
+        entry = dict(km_entry)
+        entry['UCUM'] = {'code': 'km', 'description': 'kilometre'}
+        r = record(entry)
+        self.assertEqual( entry['UCUM'], r['UCUM'] )
+        self.assertEqual( entry, r.entry )
+        self.assertNotEqual( r, km_entry )
+        
+        # The JSON is rebuilt from the parsed fields
+        entry = dict(km_entry)
+        entry['system'] = dict( km_entry['system'], prefix=['1E3','1'] )
+        self.assertEqual( r.system.key(), record(entry).system.key() )
+        self.assertEqual( record(km_entry), entry )
+        self.assertEqual( ['1000','1'], record(entry)['system']['prefix'] )
+        
+        self.assertNotEqual( r, {'uid': ['si_kilometre', 1]} )
+        
+        for reg in (cxt.reference_reg,cxt.aspect_reg,cxt.scale_reg,cxt.system_reg):
+            for uid,r in reg.items():
+                self.assertEqual( r, record(r.entry) )
+        
+    def test_no_system(self):
+        entry = dict(km_entry)
+        del entry['system']
+        self.assertEqual( None, record(entry).system )
+        
+    def test_registers(self):
+        m = cxt.scale_reg[ UID(m_uid) ]
+        self.assertTrue( isinstance(m,ScaleRecord) )
+        self.assertEqual( 'ratio', m.scale_type )
+        self.assertTrue( m.systematic )
+        self.assertTrue( 
+            isinstance( cxt.reference_reg[m.reference], ReferenceRecord ) 
+        )
+        
+        self.assertTrue( 
+            isinstance( cxt.aspect_reg[ UID(length_uid) ], AspectRecord ) 
+        )
+        self.assertEqual( 'length', str( Aspect(length_uid) ) )
+        
+        si = cxt.system_reg[ UID(si_uid) ]
+        self.assertTrue( isinstance(si,SystemRecord) )
+        self.assertEqual( 7, len(si.basis) )
+        self.assertTrue( all( isinstance(b_i,UID) for b_i in si.basis ) )
+        
+    def test_sqlite(self):
+        store = SQLiteStore()
+        reg = SQLiteRegister(store,'reference')
+        reg.set(km_entry)
+        r = reg[ UID( km_entry['uid'] ) ]
+        self.assertTrue( isinstance(r,ReferenceRecord) )
+        self.assertEqual( r, km_entry )
+        store.close()
+        
+    def test_system(self):
+        # There is one System object, with one basis type 
+        si = System(si_uid)
+        self.assertTrue( si is System( UID(si_uid) ) )
+        self.assertTrue( 
+            type(si.basis) is type( Scale(m_uid).dimension.system.basis ) 
+        )
+        m_ref = cxt.scale_reg[ UID(m_uid) ].reference
+        self.assertTrue( si.basis.m is Reference(m_ref).uid )
+        
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()
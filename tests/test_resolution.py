@@ -0,0 +1,199 @@
+import unittest
+
+from m_layer import * 
+from m_layer.uid import UID
+from m_layer.context import Context, _json_paths, global_context
+
+#----------------------------------------------------------------------------
+class TestResolution(unittest.TestCase):
+
+    """
+    Conversion and casting functions are resolved once and then indexed
+    """
+    
+    def setUp(self):
+        self.cxt = Context()
+        for path in _json_paths:
+            self.cxt.load(path)
+        self.cxt.no_aspect_uid = global_context.no_aspect_uid
+        
+        names = {
+            uid.name: uid 
+                for reg in (self.cxt.scale_reg,self.cxt.aspect_reg)
+                    for uid,_ in reg.items()
+        }
+        self.K = names['ml_si_kelvin_ratio']
+        self.C = names['ml_si_celsius_interval']
+        self.F = names['ml_imp_fahrenheit_interval']
+        self.T = names['ml_thermodynamic_temperature']
+        self.s_1 = names['ml_si_s-1_ratio']
+        self.Hz = names['ml_si_hertz_ratio']
+        self.f = names['ml_frequency']
+        
+    def test_conversion(self):
+        cxt = self.cxt 
+        K, C, F, T = self.K, self.C, self.F, self.T
+        
+        fn = cxt.conversion_from_scale_aspect(K,T,C)
+        self.assertTrue( fn is cxt.conversion_from_scale_aspect(K,T,C) )
+        self.assertTrue( fn is cxt.scales_for_aspect_reg[T][(K,C)] )
+        self.assertTrue( cxt.convertible(K,T,C) )
+        
+        # Failures are not retained and the message is unchanged
+        for i in range(2):
+            with self.assertRaisesRegex(RuntimeError,"no conversion from"):
+                cxt.conversion_from_scale_aspect(K,cxt.no_aspect_uid,C)
+        self.assertFalse( (K,cxt.no_aspect_uid,C) in cxt._conversions )
+        
+    def test_precedence(self):
+        cxt = self.cxt 
+        C, F, T = self.C, self.F, self.T
+        
+        generic = cxt.conversion_from_scale_aspect(C,T,F)
+        self.assertTrue( generic is cxt.conversion_reg[(C,F)] )
+        
+        # A new aspect-specific entry replaces the indexed function
+        cxt.scales_for_aspect_reg.set( 
+            dict(
+                __entry__ = "ScalesForAspect",
+                aspect = list( T._m_layer_uuid ),
+                src = list( C._m_layer_uuid ),
+                dst = list( F._m_layer_uuid ),
+                function = "lambda x: a*x",
+                parameters = dict( a="2" )
+            )
+        )
+        self.assertEqual( 20, cxt.conversion_from_scale_aspect(C,T,F)(10) )
+        self.assertTrue( 
+            generic is cxt.conversion_from_scale_aspect(C,cxt.no_aspect_uid,F) 
+        )
+        
+    def test_cast(self):
+        cxt = self.cxt 
+        s_1, Hz, f, none = self.s_1, self.Hz, self.f, cxt.no_aspect_uid
+        
+        fn = cxt.casting_from_scale_aspect(s_1,none,Hz,f)
+        self.assertTrue( fn is cxt.casting_from_scale_aspect(s_1,none,Hz,f) )
+        self.assertTrue( fn is cxt.casting_reg[ (s_1,none),(Hz,f) ] )
+        
+        for i in range(2):
+            self.assertRaises(
+                RuntimeError,
+                cxt.casting_from_scale_aspect,Hz,f,s_1,none
+            )
+        
+    def test_compound_discarded(self):
+        cxt = self.cxt 
+        names = {
+            uid.name: uid for uid,_ in cxt.scale_reg.items() 
+        }
+        nm, m = names['ml_si_nm_ratio'], names['ml_si_metre_ratio']
+        
+        # Compound conversions are discarded when a conversion is registered
+        cxt._compound_conversions['key'] = None 
+        cxt.conversion_reg.set( 
+            dict(
+                __entry__ = "Conversion",
+                src = list( nm._m_layer_uuid ),
+                dst = list( m._m_layer_uuid ),
+                function = "lambda x: a*x",
+                parameters = dict( a="1E-9" )
+            )
+        )
+        self.assertEqual( 0, len(cxt._compound_conversions) )
+        
+#----------------------------------------------------------------------------
+class TestCompoundResolution(unittest.TestCase):
+
+    """
+    Conversions between compound scales are resolved once 
+    """
+    
+    def setUp(self):
+        self.kg = Scale( ('ml_si_kilogram_ratio', 12782167041499057092439851237297548539) )
+        self.m = Scale( ('ml_si_metre_ratio', 17771593641054934856197983478245767638) )
+        self.nm = Scale( ("ml_si_nm_ratio", 257091757625055920788370123828667027186) )
+        self.s = Scale( ('ml_si_second_ratio', 276296348539283398608930897564542275037) )
+        self.length = Aspect( ('ml_length', 993853592179723568440264076369400241) )
+        
+    def test_compound_scale(self):
+        kg, m, nm, s = self.kg, self.m, self.nm, self.s 
+        cxt = global_context 
+        
+        src = kg*m**2/s**2
+        dst = kg*nm**2/s**2
+        y = expr(2.0,src).convert(dst)
+        
+        key = (src.uid,dst.uid)
+        self.assertTrue( key in cxt._compound_conversions )
+        fn = cxt._compound_conversions[key]
+        self.assertEqual( y.token, fn(2.0) )
+        
+        # New objects with the same identity use the same function
+        y2 = expr(2.0,kg*m**2/s**2).convert(kg*nm**2/s**2)
+        self.assertEqual( y.token, y2.token )
+        self.assertEqual( 1, len( [ 
+            k for k in cxt._compound_conversions if k == key
+        ] ) )
+        
+        # A numerical prefactor is part of the identity 
+        y3 = expr(2.0,src).convert(1000*dst)
+        self.assertEqual( y.token/1000, y3.token )
+        
+    def test_caller_dst(self):
+        # The result is expressed in the destination given, 
+        # not the one used when the conversion was first found 
+        m, s = self.m, self.s 
+        ft = Scale( ('ml_foot_ratio', 150280610960339969789551668292960104920) )
+        
+        x = expr(1.0,m/s)
+        y1 = x.convert( ft/s )
+        y2 = x.convert( s**-1*ft )
+        self.assertEqual( y1.token, y2.token )
+        self.assertEqual( 
+            str( (s**-1*ft).to_compound_scale_aspect() ), 
+            str( y2.scale_aspect ) 
+        )
+        self.assertNotEqual( str( y1.scale_aspect ), str( y2.scale_aspect ) )
+        
+    def test_roles(self):
+        # Terms with the same scale and different roles 
+        # are not confused with cancelled terms 
+        m, s = self.m, self.s 
+        ft = Scale( ('ml_foot_ratio', 150280610960339969789551668292960104920) )
+        mh = Scale( m.uid, role='h' )
+        fth = Scale( ft.uid, role='h' )
+        
+        y = expr(1.0,m*mh).convert(ft*fth)
+        y2 = expr(1.0,m*s/s).convert(ft*s/s)
+        self.assertAlmostEqual( y.token, y2.token**2 )
+        self.assertAlmostEqual( 3.28084, y2.token )
+        
+    def test_compound_scale_aspect(self):
+        kg, m, nm, s, length = self.kg, self.m, self.nm, self.s, self.length
+        
+        kg, s = kg.to_scale_aspect(), s.to_scale_aspect()
+        m_l = m.to_scale_aspect(length)
+        nm_l = nm.to_scale_aspect(length)
+        src = kg*m_l/s**2
+        
+        # The destination object is returned when it is a scale-aspect
+        values = []
+        for i in range(2):
+            dst = kg*nm_l/s**2
+            y = expr(2.0,src).convert(dst)
+            values.append( y.token )
+            self.assertTrue( y.scale_aspect is dst )
+        self.assertEqual( values[0], values[1] )
+            
+        # The aspects of the source are applied  
+        for i in range(2):
+            y = expr(2.0,src).convert(self.kg*nm/self.s**2)
+            self.assertEqual( values[0], y.token )
+            self.assertEqual( src.to_compound_scales_and_aspects()[1].uid, 
+                y.scale_aspect.to_compound_scales_and_aspects()[1].uid
+            )
+        
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,169 @@
+import unittest
+import os
+import json
+import shutil
+import tempfile
+
+from m_layer import * 
+from m_layer.context import Context, _json_paths
+from m_layer import snapshot
+
+#----------------------------------------------------------------------------
+class TestSnapshot(unittest.TestCase):
+
+    """
+    A context restored from a snapshot must match one loaded from JSON
+    """
+    
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _from_json(self,paths):
+        cxt = Context()
+        for path in paths:
+            cxt.load(path)
+        return cxt 
+        
+    def _compare(self,cxt,ref):
+        self.assertEqual(cxt.scale_reg._objects,ref.scale_reg._objects)
+        self.assertEqual(cxt.reference_reg._objects,ref.reference_reg._objects)
+        self.assertEqual(cxt.aspect_reg._objects,ref.aspect_reg._objects)
+        self.assertEqual(cxt.system_reg._objects,ref.system_reg._objects)
+        self.assertEqual(
+            set( cxt.conversion_reg._table.keys() ),
+            set( ref.conversion_reg._table.keys() )
+        )
+        self.assertEqual(
+            set( cxt.casting_reg._table.keys() ),
+            set( ref.casting_reg._table.keys() )
+        )
+        self.assertEqual(
+            cxt.systematic_dimensions(),
+            ref.systematic_dimensions()
+        )
+        
+        for uid_pair in ref.conversion_reg._table.keys():
+            self.assertEqual(
+                cxt.conversion_reg[uid_pair](10.0),
+                ref.conversion_reg[uid_pair](10.0)
+            )
+            
+    def test_build_and_restore(self):
+        ref = self._from_json(_json_paths)
+
+        built = Context()
+        file_path = snapshot.load_context(built,_json_paths,self.tmp)
+        self.assertTrue( os.path.isfile(file_path) )
+        self._compare(built,ref)
+        
+        restored = Context()
+        self.assertEqual(
+            file_path,
+            snapshot.load_context(restored,_json_paths,self.tmp)
+        )
+        self._compare(restored,ref)
+
+    def test_restore_registers(self):
+        # The registers are restored without entering records 
+        # or hashing the content of unchanged files 
+        file_path = snapshot.load_context(Context(),_json_paths,self.tmp)
+        
+        def fail(*args):
+            raise AssertionError("not expected")
+            
+        restored = Context()
+        restored._load_entity = fail 
+        content_hash = snapshot.content_hash
+        snapshot.content_hash = fail 
+        try:
+            self.assertEqual(
+                file_path,
+                snapshot.load_context(restored,_json_paths,self.tmp)
+            )
+        finally:
+            snapshot.content_hash = content_hash
+            
+        self._compare(restored,self._from_json(_json_paths))
+        self.assertTrue( restored.conversion_reg._context is restored )
+        
+    def test_not_restorable(self):
+        # A register that is not empty is not replaced 
+        cxt = Context()
+        cxt.load(_json_paths[0])
+        self.assertEqual( 
+            None, 
+            snapshot.load_context(cxt,_json_paths[1:],self.tmp) 
+        )
+        self._compare(cxt,self._from_json(_json_paths))
+        self.assertEqual( [], os.listdir(self.tmp) )
+        
+    def test_content_change(self):
+        # Copy the register, so a change can be made 
+        json_dir = os.path.join(self.tmp,'json')
+        shutil.copytree(
+            os.path.dirname( os.path.dirname(_json_paths[0]) ),
+            json_dir
+        )
+        paths = [
+            os.path.join( json_dir, *p_i.split(os.sep)[-2:] ) 
+                for p_i in _json_paths 
+        ]
+        cache = os.path.join(self.tmp,'cache')
+
+        digest = snapshot.content_hash(paths)
+        file_path = snapshot.load_context(Context(),paths,cache)
+        
+        # Change the name of a reference
+        f_json = os.path.join(json_dir,'references','length.json')
+        with open(f_json,'r') as f:
+            data = json.load(f)
+        data[0]['locale']['default']['name'] = 'changed'
+        with open(f_json,'w') as f:
+            json.dump(data,f)
+        
+        self.assertNotEqual(digest,snapshot.content_hash(paths))
+        
+        cxt = Context()
+        self.assertNotEqual(
+            file_path,
+            snapshot.load_context(cxt,paths,cache)
+        )
+        self.assertEqual(
+            cxt.reference_reg._objects,
+            self._from_json(paths).reference_reg._objects
+        )
+        
+        # The old snapshot and stamp have been removed 
+        self.assertFalse( os.path.exists(file_path) )
+        names = os.listdir(cache)
+        self.assertEqual( 1, sum( n.startswith('stamp-') for n in names ) )
+        self.assertEqual( 1, sum( n.endswith('.pickle') for n in names ) )
+
+    @unittest.skipIf( not hasattr(os,'getuid'), "POSIX permissions" )
+    def test_untrusted(self):
+        # Snapshots are not read from a directory other users can write 
+        file_path = snapshot.load_context(Context(),_json_paths,self.tmp)
+        
+        os.chmod(self.tmp,0o777)
+        try:
+            cxt = Context()
+            self.assertEqual( 
+                None, 
+                snapshot.load_context(cxt,_json_paths,self.tmp) 
+            )
+        finally:
+            os.chmod(self.tmp,0o700)
+        self._compare(cxt,self._from_json(_json_paths))
+        
+        # Nor are snapshot files that other users can write 
+        digest = snapshot.content_hash(_json_paths)
+        self.assertTrue( snapshot._read_snapshot(file_path,digest) )
+        os.chmod(file_path,0o666)
+        self.assertEqual( None, snapshot._read_snapshot(file_path,digest) )
+
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()
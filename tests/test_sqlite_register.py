@@ -0,0 +1,120 @@
+import unittest
+import os
+import shutil
+import tempfile
+
+from m_layer import * 
+from m_layer.context import Context, _json_paths, global_context
+from m_layer.sqlite_register import *
+
+#----------------------------------------------------------------------------
+def sqlite_context(store,cache_size=1024):
+    return Context(
+        scale_reg = SQLiteRegister(store,'scale',cache_size=cache_size),
+        reference_reg = SQLiteRegister(store,'reference',cache_size=cache_size),
+        aspect_reg = SQLiteRegister(store,'aspect',cache_size=cache_size),
+        system_reg = SQLiteRegister(store,'system',cache_size=cache_size),
+        conversion_reg = SQLiteConversionRegister(store,cache_size=cache_size),
+        casting_reg = SQLiteCastingRegister(store,cache_size=cache_size),
+        scales_for_aspect_reg = SQLiteScalesForAspectRegister(store,cache_size=cache_size),
+    )
+    
+#----------------------------------------------------------------------------
+class TestSQLiteRegister(unittest.TestCase):
+
+    """
+    SQLite registers must behave like the in-memory registers 
+    """
+    
+    def setUp(self):
+        self.ref = Context()
+        for path in _json_paths:
+            self.ref.load(path)
+        self.ref.no_aspect_uid = global_context.no_aspect_uid
+            
+    def _load(self,cxt):
+        for path in _json_paths:
+            cxt.load(path)
+        cxt.no_aspect_uid = global_context.no_aspect_uid
+        return cxt
+        
+    def _compare(self,cxt):
+        ref = self.ref 
+        
+        for uid,entry in ref.scale_reg.items():
+            self.assertEqual( cxt.scale_reg[uid], entry )
+            self.assertTrue( uid in cxt.scale_reg )
+            
+        self.assertEqual( 
+            dict( cxt.reference_reg.items() ), 
+            dict( ref.reference_reg.items() )
+        )
+        self.assertEqual( 
+            cxt.systematic_dimensions(), 
+            ref.systematic_dimensions() 
+        )
+        
+        self.assertEqual( 
+            set( cxt.conversion_reg.keys() ),
+            set( ref.conversion_reg._table.keys() )
+        )
+        for uid_pair in ref.conversion_reg._table.keys():
+            self.assertEqual(
+                cxt.conversion_reg[uid_pair](10.0),
+                ref.conversion_reg[uid_pair](10.0)
+            )
+            
+        for uid_pair in ref.casting_reg._table.keys():
+            self.assertEqual(
+                cxt.casting_reg[uid_pair](10.0),
+                ref.casting_reg[uid_pair](10.0)
+            )
+            
+        for aspect,table in ref.scales_for_aspect_reg._table.items():
+            self.assertTrue( aspect in cxt.scales_for_aspect_reg )
+            for scale_pair in table.keys():
+                self.assertEqual(
+                    cxt.conversion_from_scale_aspect(
+                        scale_pair[0],aspect,scale_pair[1]
+                    )(10.0),
+                    ref.conversion_from_scale_aspect(
+                        scale_pair[0],aspect,scale_pair[1]
+                    )(10.0)
+                )
+                
+        cxt.validate()
+        
+    def test_in_memory(self):
+        cxt = self._load( sqlite_context( SQLiteStore(), cache_size=4 ) )
+        self._compare(cxt)
+        self.assertEqual( 4, len(cxt.scale_reg._cache) )
+        
+        # Duplicate entries are not allowed
+        self.assertRaises(RuntimeError,cxt.load,_json_paths[1])
+        self.assertRaises(RuntimeError,cxt.load,_json_paths[2])
+        
+        uid = next( iter( cxt.scale_reg.items() ) )[0]
+        self.assertTrue( cxt.conversion_reg.get( (uid,uid) ) is None )
+        self.assertFalse( (uid,uid) in cxt.conversion_reg )
+        
+    def test_file(self):
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp,'register.db')
+            
+            store = SQLiteStore(path)
+            self._load( sqlite_context(store) )
+            store.commit()
+            store.close()
+            
+            store = SQLiteStore(path)
+            cxt = sqlite_context(store)
+            cxt.no_aspect_uid = global_context.no_aspect_uid
+            self._compare(cxt)
+            store.close()
+        finally:
+            shutil.rmtree(tmp)
+
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()
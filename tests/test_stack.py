@@ -0,0 +1,104 @@
+import unittest
+import pickle
+
+from fractions import Fraction
+
+from m_layer.stack import Stack, normal_form
+
+#----------------------------------------------------------------------------
+class TestStack(unittest.TestCase):
+
+    """
+    Stack objects are immutable and share elements
+    """
+    
+    def test_api(self):
+        s = Stack().push("l")
+        s2 = Stack().push("km").push(100).rmul()
+        s = s.push(s2).div()
+        
+        self.assertEqual( 5, len(s) )
+        self.assertEqual( "l/(100.km)", str(s) )
+        self.assertEqual( "Stack(['l', 'km', 100, 'rmul', 'div'])", repr(s) )
+        self.assertEqual( ['l', 'km', 100, 'rmul', 'div'], list(s) )
+        self.assertEqual( 'km', s[1] )
+        self.assertEqual( 'div', s[-1] )
+        
+        pops = normal_form(s)
+        self.assertEqual( {'l':1,'km':-1}, pops.factors )
+        self.assertEqual( Fraction(1,100), pops.prefactor )
+        
+        # Construction from a list 
+        self.assertEqual( s, Stack(['l', 'km', 100, 'rmul', 'div']) )
+        self.assertEqual( 0, len( Stack() ) )
+        
+    def test_immutable(self):
+        base = Stack().push("m")
+        s1 = base.push("s").div()
+        s2 = base.push("kg").mul()
+        
+        self.assertEqual( ['m'], list(base) )
+        self.assertEqual( ['m','s','div'], list(s1) )
+        self.assertEqual( ['m','kg','mul'], list(s2) )
+        
+        self.assertTrue( base.copy() is base )
+        
+        # Pushing a stack onto an empty stack shares it
+        self.assertTrue( Stack().push(s1) is s1 )
+        
+        # A list used for construction is not shared 
+        lst = ['m','s','div']
+        s3 = Stack(lst)
+        lst.append('x')
+        self.assertEqual( 3, len(s3) )
+        self.assertEqual( s1, s3 )
+        
+    def test_hash(self):
+        s1 = Stack().push("m").push("s").div()
+        s2 = Stack(['m','s','div'])
+        self.assertEqual( hash(s1), hash(s2) )
+        self.assertEqual( 1, len( set([s1,s2]) ) )
+        self.assertNotEqual( s1, Stack(['m','s','mul']) )
+        
+    def test_shared(self):
+        # Stacks with the same elements are the same object
+        s1 = Stack().push("m").push("s").div()
+        s2 = Stack().push("m").push("s").div()
+        self.assertTrue( s1 is s2 )
+        self.assertTrue( Stack(['m','s','div']) is s1 )
+        self.assertTrue( Stack() is Stack([]) )
+        
+        # The normal form is found once 
+        self.assertTrue( normal_form(s1) is normal_form(s2) )
+        
+        # Objects other than numbers and operations are 
+        # distinguished by identity (like Scale)
+        class Token(object):
+            def __init__(self,name): self.name = name 
+            def __eq__(self,other): 
+                return isinstance(other,Token) and self.name == other.name
+            def __hash__(self): return id(self)
+            
+        m, m_height, t = Token('m'), Token('m'), Token('s')
+        s3 = Stack().push(m).push(t).div().push(m).div()
+        s4 = Stack().push(m).push(t).div().push(m_height).div()
+        self.assertFalse( s3 is s4 )
+        self.assertEqual( 2, len( normal_form(s3).factors ) )
+        self.assertEqual( 0, normal_form(s3).factors[m] )
+        self.assertEqual( 3, len( normal_form(s4).factors ) )
+        
+    def test_pickle(self):
+        s1 = Stack().push("m").push("s").div()
+        s2 = pickle.loads( pickle.dumps(s1) )
+        self.assertTrue( s1 is s2 )
+        
+    def test_long(self):
+        s = Stack().push("x0")
+        for i in range(1,500):
+            s = s.push( "x{}".format(i) ).mul()
+        self.assertEqual( 999, len(s) )
+        self.assertEqual( 500, len( normal_form(s).factors ) )
+
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()
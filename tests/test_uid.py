@@ -0,0 +1,58 @@
+import unittest
+import pickle
+import gc
+
+from m_layer.uid import UID
+from m_layer.context import global_context as cxt
+
+m_uid = ('ml_si_metre_ratio', 17771593641054934856197983478245767638)
+s_uid = ('ml_si_second_ratio', 276296348539283398608930897564542275037)
+length_uid = ('ml_length', 993853592179723568440264076369400241)
+
+#----------------------------------------------------------------------------
+class TestUID(unittest.TestCase):
+
+    """
+    There is one UID object for each M-layer identifier 
+    """
+    
+    def test_intern(self):
+        m = UID(m_uid)
+        self.assertTrue( m is UID(m_uid) )
+        self.assertTrue( m is UID( list(m_uid) ) )
+        self.assertTrue( m is UID(m) )
+        self.assertEqual( hash(m_uid), hash(m) )
+        self.assertEqual( m, UID(m_uid) )
+        self.assertNotEqual( m, UID(s_uid) )
+        self.assertNotEqual( m, m_uid )
+        
+        self.assertEqual( m_uid[0], m.name )
+        self.assertEqual( m_uid[1], m.uuid )
+        self.assertEqual( "UID( {} )".format( list(m_uid) ), repr(m) )
+        
+    def test_register_keys(self):
+        # The register keys are the same objects 
+        m = UID(m_uid)
+        self.assertTrue( any( k is m for k,v in cxt.scale_reg.items() ) )
+        
+    def test_pickle(self):
+        m = UID(m_uid)
+        self.assertTrue( m is pickle.loads( pickle.dumps(m) ) )
+        
+    def test_discard(self):
+        # Interned UIDs are not kept when they are no longer used 
+        uid = ('ml_unused',1)
+        UID(uid)
+        gc.collect()
+        self.assertFalse( uid in UID._interned )
+        
+        m = UID(m_uid)
+        gc.collect()
+        self.assertTrue( UID._interned[m_uid] is m )
+        
+    def test_bad_uid(self):
+        self.assertRaises(AssertionError,UID,'ml_si_metre_ratio')
+        
+#============================================================================
+if __name__ == '__main__':
+    unittest.main()